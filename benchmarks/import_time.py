@@ -0,0 +1,53 @@
+"""
+Measures the cold start of the `dbdeclare` command: how long a fresh interpreter takes to import everything a typical
+command needs before it connects to a cluster, over and above starting Python itself.
+
+    python benchmarks/import_time.py --runs 20 --budget-ms 600
+
+Exits with code 1 if the median is over budget, or if `sqlalchemy.orm` gets imported along the way.
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+# what `dbdeclare apply` imports before it runs a declarations file that doesn't use DatabaseContent
+COMMAND_IMPORTS = (
+    "import sys\n"
+    "import dbdeclare.cli\n"
+    "import dbdeclare.controller\n"
+    "from dbdeclare.entities import Database, Role, Schema\n"
+    "sys.exit(3 if 'sqlalchemy.orm' in sys.modules else 0)\n"
+)
+
+
+def _time(code: str) -> tuple[float, int]:
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, "-c", code])
+    return (time.perf_counter() - start) * 1000, completed.returncode
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=600.0)
+    args = parser.parse_args()
+
+    baseline = statistics.median(_time("pass")[0] for _ in range(args.runs))
+    timings = []
+    for _ in range(args.runs):
+        milliseconds, returncode = _time(COMMAND_IMPORTS)
+        if returncode == 3:
+            print("sqlalchemy.orm was imported")
+            return 1
+        timings.append(milliseconds - baseline)
+
+    median = statistics.median(timings)
+    print(f"cold start: median {median:.0f}ms, min {min(timings):.0f}ms over {args.runs} runs")
+    print(f"budget: {args.budget_ms:.0f}ms")
+    return 0 if median <= args.budget_ms else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,5 @@
+import sys
+
+from dbdeclare.cli import main
+
+sys.exit(main())
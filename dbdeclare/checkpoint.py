@@ -0,0 +1,181 @@
+import json
+import os
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+from sqlalchemy import Engine, text
+
+from dbdeclare.mixins.sql import SQLBase
+
+
+class Checkpoint(ABC):
+    """
+    Records the steps of a :class:`dbdeclare.controller.Controller` run as they complete, so a run that fails part
+    way can be resumed without redoing them. Steps are recorded per declaration and cluster, under a key the
+    controller derives from both.
+    """
+
+    @abstractmethod
+    def load(self, key: str) -> set[str]:
+        """
+        Reads the steps completed so far.
+        :param key: Identifies the declaration and cluster.
+        :return: A set of completed steps.
+        """
+        pass
+
+    @abstractmethod
+    def record(self, key: str, step: str) -> None:
+        """
+        Records that a step completed. Must be durable by the time it returns.
+        :param key: Identifies the declaration and cluster.
+        :param step: The step that completed.
+        """
+        pass
+
+    @abstractmethod
+    def clear(self, key: str) -> None:
+        """
+        Forgets every step recorded, typically once a run completes.
+        :param key: Identifies the declaration and cluster.
+        """
+        pass
+
+
+class FileCheckpoint(Checkpoint):
+    """
+    Keeps the checkpoint in a local JSON Lines file, one line per completed step.
+    """
+
+    def __init__(self, path: str | Path):
+        """
+        :param path: Path to the checkpoint file. It is created if it doesn't exist.
+        """
+        self.path = Path(path)
+
+    def load(self, key: str) -> set[str]:
+        return {record["step"] for record in self._records() if record["key"] == key}
+
+    def record(self, key: str, step: str) -> None:
+        with self.path.open("a") as file:
+            file.write(json.dumps({"key": key, "step": step}) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+
+    def clear(self, key: str) -> None:
+        others = [record for record in self._records() if record["key"] != key]
+        if others:
+            self.path.write_text("".join(json.dumps(record) + "\n" for record in others))
+        else:
+            self.path.unlink(missing_ok=True)
+
+    def _records(self) -> list[dict[str, str]]:
+        """
+        Reads every record in the file. A partly written last line, from a process that died mid-write, is ignored.
+        :return: A list of dicts with a key and a step.
+        """
+        if not self.path.exists():
+            return []
+        records = []
+        for line in self.path.read_text().splitlines():
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+        return records
+
+
+class TableCheckpoint(Checkpoint, SQLBase):
+    """
+    Keeps the checkpoint in a table in the cluster, so any machine can resume the run. The table is created in the
+    database the engine connects to when it is first needed.
+    """
+
+    def __init__(self, engine: Engine, table: str = "dbdeclare_checkpoint"):
+        """
+        :param engine: A :class:`sqlalchemy.Engine` for the database to keep the table in.
+        :param table: The name of the table.
+        """
+        self.engine = engine
+        self.table = table
+        self._table_created = False
+
+    def _sql_engine(self) -> Engine:
+        return self.engine
+
+    def load(self, key: str) -> set[str]:
+        self._create_table()
+        rows = self._fetch_sql(
+            engine=self.engine, statement=text(f"SELECT step FROM {self.table} WHERE key=:key").bindparams(key=key)
+        )
+        return {row[0] for row in rows}
+
+    def record(self, key: str, step: str) -> None:
+        self._create_table()
+        self._commit_sql(
+            engine=self.engine,
+            statements=[
+                text(f"INSERT INTO {self.table} (key, step) VALUES (:key, :step) ON CONFLICT DO NOTHING").bindparams(
+                    key=key, step=step
+                )
+            ],
+        )
+
+    def clear(self, key: str) -> None:
+        self._create_table()
+        self._commit_sql(
+            engine=self.engine, statements=[text(f"DELETE FROM {self.table} WHERE key=:key").bindparams(key=key)]
+        )
+
+    def _create_table(self) -> None:
+        """
+        Creates the checkpoint table if it doesn't exist yet.
+        """
+        if not self._table_created:
+            self._commit_sql(
+                engine=self.engine,
+                statements=[
+                    text(
+                        f"CREATE TABLE IF NOT EXISTS {self.table} (key text, step text, "
+                        "completed_at timestamptz NOT NULL DEFAULT now(), PRIMARY KEY (key, step))"
+                    )
+                ],
+            )
+            self._table_created = True
+
+
+class Progress:
+    """
+    Tracks the steps of one run against a checkpoint. Without a checkpoint, every step is pending and nothing is
+    recorded.
+    """
+
+    def __init__(self, checkpoint: Checkpoint | None, key: str, resume: bool):
+        """
+        :param checkpoint: The :class:`dbdeclare.checkpoint.Checkpoint` to record steps in, if any.
+        :param key: Identifies the declaration and cluster.
+        :param resume: Whether to skip the steps already recorded. If `False`, they are forgotten instead.
+        """
+        self.checkpoint = checkpoint
+        self.key = key
+        self.completed: set[str] = set()
+        if checkpoint:
+            if resume:
+                self.completed = checkpoint.load(key)
+            else:
+                checkpoint.clear(key)
+
+    def pending(self, step: str) -> bool:
+        return step not in self.completed
+
+    def done(self, step: str) -> None:
+        if self.checkpoint:
+            self.checkpoint.record(self.key, step)
+            self.completed.add(step)
+
+    def finish(self) -> None:
+        """
+        Forgets the recorded steps once the whole run succeeded, so the next run starts from scratch.
+        """
+        if self.checkpoint:
+            self.checkpoint.clear(self.key)
@@ -0,0 +1,181 @@
+import argparse
+import json
+import os
+import sys
+from dataclasses import asdict
+from importlib.util import module_from_spec, spec_from_file_location
+from pathlib import Path
+from typing import TYPE_CHECKING, Sequence, TextIO
+
+# sqlalchemy and the rest of dbdeclare are imported only once a command actually runs, which keeps `--help` and
+# argument errors fast. See benchmarks/import_time.py for the cold start budget.
+if TYPE_CHECKING:
+    from dbdeclare.controller import Operation
+    from dbdeclare.data_structures.report import Report
+    from dbdeclare.registry import Registry
+
+# each subcommand and the controller operation it runs
+_operations: dict[str, "Operation"] = {"plan": "plan", "apply": "run_all", "verify": "verify", "destroy": "remove_all"}
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """
+    Entrypoint for the `dbdeclare` command.
+    :param argv: The command line arguments. Defaults to `sys.argv`.
+    :return: The exit code. 0 on success, 1 if any cluster failed, and 2 if `verify` finds pending changes.
+    """
+    parser = _parser()
+    args = parser.parse_args(argv)
+    urls = args.url or ([os.environ["DBDECLARE_URL"]] if os.environ.get("DBDECLARE_URL") else [])
+    if not urls:
+        parser.error("at least one --url is required, or set the DBDECLARE_URL environment variable")
+
+    from dbdeclare.controller import Controller
+
+    registry = _load(args.declarations)
+    if args.database or args.role or args.name or args.tag:
+        from dbdeclare.data_structures.selector import Selector
+
+        selector = Selector(
+            databases=args.database or (), roles=args.role or (), names=args.name or (), tags=args.tag or ()
+        )
+        # destroying a selection shouldn't drop what it shares with the rest of the declarations
+        registry = Controller.select(selector, registry=registry, dependencies=args.command != "destroy")
+    if getattr(args, "skip_redundant_grants", False):
+        registry, savings = Controller.prune_redundant_grants(registry=registry)
+        print(savings, file=sys.stderr)
+    operation = _operations[args.command]
+    if getattr(args, "sync", False):
+        operation = "sync_all"
+    elif getattr(args, "shared", False):
+        operation = "run_shared"
+    elif getattr(args, "server_side", False):
+        operation = "run_server_side"
+    reports = Controller.run_on_clusters(
+        urls,
+        operation=operation,
+        max_concurrent=args.parallelism,
+        registry=registry,
+        sample_locks=args.sample_locks,
+    )
+    _write(reports=reports, output_format=args.format, file=sys.stdout)
+
+    if not all(report.succeeded for report in reports):
+        return 1
+    if args.command == "verify" and any(report.changes for report in reports):
+        return 2
+    return 0
+
+
+def _parser() -> argparse.ArgumentParser:
+    """
+    Builds the argument parser for the `dbdeclare` command.
+    :return: An :class:`argparse.ArgumentParser` with a subcommand per operation.
+    """
+    parser = argparse.ArgumentParser(prog="dbdeclare", description="Declarative layer for your database.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    helps = {
+        "plan": "list the changes apply would make",
+        "apply": "create all declared entities and grant all declared privileges",
+        "verify": "exit with code 2 if the cluster does not match the declarations",
+        "destroy": "revoke all declared privileges and drop all declared entities",
+    }
+    for command, help_text in helps.items():
+        subparser = subparsers.add_parser(command, help=help_text)
+        subparser.add_argument(
+            "declarations", help="path to the Python file (or JSON, CSV, or YAML data file) that declares your entities"
+        )
+        subparser.add_argument(
+            "--url",
+            action="append",
+            help="SQLAlchemy URL of a cluster, repeat for many clusters. Defaults to the DBDECLARE_URL variable.",
+        )
+        subparser.add_argument(
+            "--parallelism",
+            type=int,
+            default=1,
+            help="how many clusters to work on at the same time, each in its own process (default: 1)",
+        )
+        subparser.add_argument("--format", choices=["text", "json"], default="text", help="output format")
+        subparser.add_argument(
+            "--sample-locks", action="store_true", help="report statements that waited on locks, and what blocked them"
+        )
+        selection = subparser.add_argument_group(
+            "selection",
+            "only work on the matching entities, their grants, and what they need (repeat each to add more)",
+        )
+        selection.add_argument("--database", action="append", help="entities in this database, and the database")
+        selection.add_argument("--role", action="append", help="this role")
+        selection.add_argument(
+            "--name", action="append", help="entities whose names match this glob, like 'tenant_a_*'"
+        )
+        selection.add_argument("--tag", action="append", help="entities declared with this tag")
+        if command == "apply":
+            subparser.add_argument(
+                "--sync", action="store_true", help="also revoke privileges on declared entities that aren't declared"
+            )
+            subparser.add_argument(
+                "--skip-redundant-grants",
+                action="store_true",
+                help="don't grant roles what they already inherit through their memberships (with --sync, revoke it)",
+            )
+            subparser.add_argument(
+                "--shared",
+                action="store_true",
+                help="share the work with other replicas applying the same declarations to the same cluster",
+            )
+            subparser.add_argument(
+                "--server-side",
+                action="store_true",
+                help="check and apply the work on each database in DO blocks, one round trip each (needs psycopg 3)",
+            )
+    return parser
+
+
+def _load(path: str) -> "Registry":
+    """
+    Runs a declarations file in a fresh registry, the same way Python would run it as a script (without the
+    `__main__` block). Data files of records (JSON Lines, JSON, CSV, or YAML) are loaded instead.
+    :param path: Path to the Python file or data file that declares entities.
+    :return: The :class:`dbdeclare.registry.Registry` holding everything the file declared.
+    """
+    from dbdeclare.registry import Registry
+
+    file = Path(path).resolve()
+    if file.suffix != ".py":
+        from dbdeclare.loader import FORMATS, Loader
+
+        if file.suffix.lower() in FORMATS:
+            with Registry() as registry:
+                Loader(file).declare()
+            return registry
+    spec = spec_from_file_location(file.stem, file)
+    if spec is None or spec.loader is None:
+        raise SystemExit(f"dbdeclare: cannot load declarations from {path}")
+    module = module_from_spec(spec)
+    # so the file can import its neighbours, and worker processes can find anything it defines
+    sys.path.insert(0, str(file.parent))
+    sys.modules[spec.name] = module
+    with Registry() as registry:
+        spec.loader.exec_module(module)
+    return registry
+
+
+def _write(reports: list["Report"], output_format: str, file: TextIO) -> None:
+    """
+    Writes the outcome of a command.
+    :param reports: A list of :class:`dbdeclare.data_structures.Report`, one per cluster.
+    :param output_format: Either `text` or `json`.
+    :param file: The file to write to.
+    """
+    if output_format == "json":
+        json.dump([asdict(report) for report in reports], file, indent=2)
+        file.write("\n")
+        return
+    for report in reports:
+        status = "ok" if report.succeeded else f"failed, {report.error}"
+        file.write(f"{report.url} {report.operation}: {status} ({report.seconds:.2f}s)\n")
+        for change in report.changes:
+            file.write(f"  {change}\n")
+        for wait in report.lock_waits:
+            file.write(f"  lock wait: {wait}\n")
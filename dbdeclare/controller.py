@@ -1,111 +1,1232 @@
-from sqlalchemy import Engine
+import os
+from collections import defaultdict
+from copy import copy
+from fnmatch import fnmatchcase
+from time import perf_counter
+from typing import Callable, Collection, Literal, Mapping, Sequence, cast
 
+from sqlalchemy import Connection, Engine, TextClause, create_engine, make_url
+
+from dbdeclare.checkpoint import Checkpoint, Progress
+from dbdeclare.coordination import PartitionClaims, partition
+from dbdeclare.credentials import scram_sha_256
+from dbdeclare.data_structures.credential import Credential
+from dbdeclare.data_structures.discrepancy import Discrepancy
+from dbdeclare.data_structures.grant_on import GrantStore
+from dbdeclare.data_structures.grant_savings import GrantSavings
+from dbdeclare.data_structures.privileges import Privilege
+from dbdeclare.data_structures.report import Report
+from dbdeclare.data_structures.rotation import Rotation
+from dbdeclare.data_structures.selector import Selector
+from dbdeclare.data_structures.tablespace_move import TablespaceMove
+from dbdeclare.diagnostics import APPLICATION_NAME, LockSampler
+from dbdeclare.entities.cluster_entity import ClusterEntity
+from dbdeclare.entities.database import Database
+from dbdeclare.entities.database_entity import DatabaseSqlEntity
 from dbdeclare.entities.entity import Entity
 from dbdeclare.entities.role import Role
+from dbdeclare.entities.tablespace import Tablespace
+from dbdeclare.exceptions import EntityExistsError, PipelineError, PostgresDeclareError
+from dbdeclare.history import TimingHistory, timed, timed_batch
+from dbdeclare.mixins.configurable import Configurable, Setting
+from dbdeclare.mixins.grantable import Grantable
+from dbdeclare.mixins.sql import PIPELINE_BATCH_SIZE, SQLBase
+from dbdeclare.privilege_index import PrivilegeIndex
+from dbdeclare.registry import Registry, bind_engine
+
+# the controller operations that can be applied to many clusters at once
+Operation = Literal[
+    "run_all",
+    "create_all",
+    "grant_all",
+    "configure_all",
+    "remove_all",
+    "drop_all",
+    "revoke_all",
+    "plan",
+    "sync_all",
+    "verify",
+    "run_shared",
+    "run_server_side",
+]
 
 
 class Controller:
     """
     Entrypoint for creating/dropping database entities and granting/revoking privileges once they are
-    declared in code. This is a wrapper of sorts around :class:`dbdeclare.entities.entity.Entity`.
+    declared in code. This is a wrapper of sorts around :class:`dbdeclare.entities.entity.Entity`. Every operation
+    works on the current :class:`dbdeclare.registry.Registry` unless one is passed explicitly.
     """
 
     @classmethod
-    def create_all(cls, engine: Engine | None = None) -> None:
+    def create_all(
+        cls,
+        engine: Engine | None = None,
+        registry: Registry | None = None,
+        checkpoint: Checkpoint | None = None,
+        resume: bool = False,
+        pipeline: bool = False,
+        guarded: bool = False,
+    ) -> list[str]:
         """
         Attempts to create all declared entities. Typically run via `run_all`.
         :param engine: A :class:`sqlalchemy.Engine` that defines the connection to a Postgres instance/cluster.
+        :param registry: The :class:`dbdeclare.registry.Registry` of entities to use. Defaults to the current one.
+        :param checkpoint: A :class:`dbdeclare.checkpoint.Checkpoint` to record progress in, so a failed run can be resumed.
+        :param resume: Whether to skip the work the checkpoint recorded as completed by a previous run that failed.
+        :param pipeline: Whether to send independent statements in batches, one round trip per batch, instead of waiting on each statement in turn.
+        :param guarded: Whether to create entities with statements like `CREATE SCHEMA IF NOT EXISTS` instead of checking if each exists first, for entity types that have them. Requires psycopg 3, other drivers still check first.
+        :return: A list of the entities that were created, leaving out those that already existed.
         """
         cls._handle_engine(engine)
-        for entity in Entity.entities:
-            entity._safe_create()
+        registry = cls._handle_registry(registry)
+        progress = cls._progress(registry=registry, checkpoint=checkpoint, resume=resume)
+        changes = cls._create_all(registry=registry, progress=progress, pipeline=pipeline, guarded=guarded)
+        progress.finish()
+        return changes
 
     @classmethod
-    def grant_all(cls, engine: Engine | None = None) -> None:
+    def grant_all(
+        cls,
+        engine: Engine | None = None,
+        registry: Registry | None = None,
+        checkpoint: Checkpoint | None = None,
+        resume: bool = False,
+        pipeline: bool = False,
+    ) -> None:
         """
         Attempts to grant all declared privileges. Requires entities to exist, typically run via `run_all` or after
         `create_all`.
         :param engine: A :class:`sqlalchemy.Engine` that defines the connection to a Postgres instance/cluster.
+        :param registry: The :class:`dbdeclare.registry.Registry` of entities to use. Defaults to the current one.
+        :param checkpoint: A :class:`dbdeclare.checkpoint.Checkpoint` to record progress in, so a failed run can be resumed.
+        :param resume: Whether to skip the work the checkpoint recorded as completed by a previous run that failed.
+        :param pipeline: Whether to send independent statements in batches, one round trip per batch, instead of waiting on each statement in turn.
         """
         cls._handle_engine(engine)
-        for entity in Entity.entities:
-            if isinstance(entity, Role):
-                entity._safe_grant()
+        registry = cls._handle_registry(registry)
+        progress = cls._progress(registry=registry, checkpoint=checkpoint, resume=resume)
+        cls._grant_all(registry=registry, progress=progress, pipeline=pipeline)
+        progress.finish()
+
+    @classmethod
+    def configure_all(cls, engine: Engine | None = None, registry: Registry | None = None) -> list[str]:
+        """
+        Makes the runtime settings of every role, database, and role in a database that declares them match the
+        declarations: settings that differ are set, and settings that aren't declared are reset. What's in the cluster
+        is read in a single query, and every change is made in one transaction. Requires entities to exist, typically
+        run via `run_all` or after `create_all`.
+        :param engine: A :class:`sqlalchemy.Engine` that defines the connection to a Postgres instance/cluster.
+        :param registry: The :class:`dbdeclare.registry.Registry` of entities to use. Defaults to the current one.
+        :return: A list of the settings set and reset, as strings.
+        """
+        cls._handle_engine(engine)
+        steps, changes = cls._settings_deltas(cls._handle_registry(registry).entities)
+        if steps:
+            with timed_batch([step for step, _ in steps], "configure"):
+                SQLBase._pipeline_sql(engine=Role.engine(), steps=steps)
+        return changes
 
     @classmethod
-    def run_all(cls, engine: Engine | None = None) -> None:
+    def run_all(
+        cls,
+        engine: Engine | None = None,
+        registry: Registry | None = None,
+        checkpoint: Checkpoint | None = None,
+        resume: bool = False,
+        pipeline: bool = False,
+        guarded: bool = False,
+    ) -> list[str]:
         """
         Attempts to create all declared entities then grant all declared privileges. Main way to do so.
         :param engine: A :class:`sqlalchemy.Engine` that defines the connection to a Postgres instance/cluster.
+        :param registry: The :class:`dbdeclare.registry.Registry` of entities to use. Defaults to the current one.
+        :param checkpoint: A :class:`dbdeclare.checkpoint.Checkpoint` to record progress in, so a failed run can be resumed.
+        :param resume: Whether to skip the work the checkpoint recorded as completed by a previous run that failed.
+        :param pipeline: Whether to send independent statements in batches, one round trip per batch, instead of waiting on each statement in turn.
+        :param guarded: Whether to create entities with statements like `CREATE SCHEMA IF NOT EXISTS` instead of checking if each exists first, for entity types that have them. Requires psycopg 3, other drivers still check first.
+        :return: A list of the entities that were created, leaving out those that already existed, followed by the runtime settings that were changed.
+        """
+        cls._handle_engine(engine)
+        registry = cls._handle_registry(registry)
+        progress = cls._progress(registry=registry, checkpoint=checkpoint, resume=resume)
+        changes = cls._create_all(registry=registry, progress=progress, pipeline=pipeline, guarded=guarded)
+        cls._grant_all(registry=registry, progress=progress, pipeline=pipeline)
+        changes += cls.configure_all(registry=registry)
+        progress.finish()
+        return changes
+
+    @classmethod
+    def sync_all(
+        cls,
+        engine: Engine | None = None,
+        registry: Registry | None = None,
+        unmanaged_roles: Collection[str] = ("PUBLIC",),
+    ) -> list[str]:
+        """
+        Attempts to create all declared entities, then makes the privileges on every declared grantable match the
+        declarations exactly: missing privileges are granted and privileges that aren't declared are revoked, including
+        those of roles that aren't declared at all. Owners always keep their privileges. Runtime settings are made to
+        match too, see `configure_all`.
+        :param engine: A :class:`sqlalchemy.Engine` that defines the connection to a Postgres instance/cluster.
+        :param registry: The :class:`dbdeclare.registry.Registry` of entities to use. Defaults to the current one.
+        :param unmanaged_roles: Names of roles whose privileges are left as they are. Defaults to PUBLIC only.
+        :return: A list of the grants and revokes made, followed by the runtime settings changed, as strings.
         """
         cls._handle_engine(engine)
-        cls.create_all()
-        cls.grant_all()
+        cls.create_all(registry=registry)
+        entities = cls._handle_registry(registry).entities
+        for entity in entities:
+            entity._clear_cache()
+        additions, removals = cls._sync_deltas(entities=entities, unmanaged_roles=unmanaged_roles)
+
+        roles = {role.name: role for role in entities if isinstance(role, Role)}
+        changes: list[str] = []
+        for action, deltas in (("grant", additions), ("revoke", removals)):
+            for grantee_name, grants in deltas.items():
+                grantee = roles.get(grantee_name) or cls._undeclared_role(grantee_name)
+                for target, privileges in Grantable._collapse(grants).items():
+                    if action == "grant":
+                        target._grant(grantee=grantee, privileges=privileges)
+                    else:
+                        target._revoke(grantee=grantee, privileges=privileges)
+                    changes.append(
+                        f"{action} {', '.join(sorted(privileges))} on {target.__class__.__name__} "
+                        f"{target._grant_name} {'to' if action == 'grant' else 'from'} {grantee_name}"
+                    )
+        return changes + cls.configure_all(registry=registry)
 
     @classmethod
-    def drop_all(cls, engine: Engine | None = None) -> None:
+    def run_shared(cls, engine: Engine | None = None, registry: Registry | None = None, partitions: int = 64) -> int:
+        """
+        Does what `run_all` does, sharing the work with any other replicas running it on the same declarations and
+        cluster at the same time. The work is split into partitions of entities (and grants) that don't depend on
+        each other, and each replica only works on the partitions it claims, in three phases: cluster entities like
+        roles and databases, then the entities within databases, then grants. Partitions claimed by a replica that
+        dies are picked up by the others. Returns once every partition is done, by this replica or another.
+        :param engine: A :class:`sqlalchemy.Engine` that defines the connection to a Postgres instance/cluster.
+        :param registry: The :class:`dbdeclare.registry.Registry` of entities to use. Defaults to the current one.
+        :param partitions: The most partitions to split each phase into, which limits how many replicas can share it.
+        :return: The number of partitions this replica reconciled.
+        """
+        cls._handle_engine(engine)
+        registry = cls._handle_registry(registry)
+        cluster_entities: list[Entity] = [e for e in registry.entities if isinstance(e, ClusterEntity)]
+        database_entities: list[Entity] = [e for e in registry.entities if not isinstance(e, ClusterEntity)]
+        grants = [
+            (role, target, privileges)
+            for role in registry.entities
+            if isinstance(role, Role)
+            for target, privileges in role._collapsed_grants().items()
+        ]
+
+        def create(entities: list[Entity]) -> None:
+            for entity in entities:
+                with timed(entity._identity(), "create"):
+                    entity._safe_create()
+
+        def grant(role_grants: list[tuple[Role, Grantable, set[Privilege]]]) -> None:
+            for role, target, privileges in role_grants:
+                with timed(role._grant_step(target), "grant"):
+                    target._safe_grant(grantee=role, privileges=privileges)
+
+        history = TimingHistory.current()
+
+        def create_costs(entity_partitions: list[list[Entity]]) -> list[float] | None:
+            if history is None:
+                return None
+            return [sum(history.estimate(e._identity(), "create") for e in p) for p in entity_partitions]
+
+        def grant_costs(grant_partitions: list[list[tuple[Role, Grantable, set[Privilege]]]]) -> list[float] | None:
+            if history is None:
+                return None
+            return [sum(history.estimate(g[0]._grant_step(g[1]), "grant") for g in p) for p in grant_partitions]
+
+        cluster_partitions = partition(cluster_entities, key=Entity._identity, links=cls._links, count=partitions)
+        database_partitions = partition(database_entities, key=Entity._identity, links=cls._links, count=partitions)
+        grant_partitions = partition(grants, key=cls._grant_key, links=cls._grant_links, count=partitions)
+        with PartitionClaims(Entity.engine(), namespace=registry.fingerprint()) as claims:
+            reconciled = claims.run("cluster", cluster_partitions, create, costs=create_costs(cluster_partitions))
+            reconciled += claims.run("database", database_partitions, create, costs=create_costs(database_partitions))
+            reconciled += claims.run("grants", grant_partitions, grant, costs=grant_costs(grant_partitions))
+        return reconciled
+
+    @classmethod
+    def run_server_side(cls, engine: Engine | None = None, registry: Registry | None = None) -> list[str]:
+        """
+        Does what `run_all` does, but has the cluster decide what's missing. The existence checks and creates of
+        consecutive entities in the same database, and the grants on each database, are compiled into PL/pgSQL DO
+        blocks that each take a single round trip. Databases, and the tables of a `DatabaseContent`, are still created
+        one at a time, since they can't be created in a DO block. Requires psycopg 3.
+        :param engine: A :class:`sqlalchemy.Engine` that defines the connection to a Postgres instance/cluster.
+        :param registry: The :class:`dbdeclare.registry.Registry` of entities to use. Defaults to the current one.
+        :return: A list of what was created and granted, in the same form as checkpoint steps. Grants that were already in place are left out.
+        """
+        cls._handle_engine(engine)
+        registry = cls._handle_registry(registry)
+        changes: list[str] = []
+        batch: list[ClusterEntity | DatabaseSqlEntity] = []
+        for entity in registry.entities:
+            if isinstance(entity, (ClusterEntity, DatabaseSqlEntity)) and entity._create_in_transaction:
+                # a block only ever holds entities on one database, in the order they were declared
+                if batch and batch[0]._sql_engine() is not entity._sql_engine():
+                    changes += cls._create_in_block(batch)
+                    batch = []
+                batch.append(entity)
+                continue
+            if batch:
+                changes += cls._create_in_block(batch)
+                batch = []
+            if entity._exists():
+                entity._skip_create()
+            else:
+                entity._create()
+                changes.append(f"create {entity._identity()}")
+        if batch:
+            changes += cls._create_in_block(batch)
+
+        blocks: dict[str, tuple[Engine, list[tuple[Role, SQLBase, set[Privilege]]]]] = {}
+        for role in registry.entities:
+            if isinstance(role, Role):
+                for target, privileges in role._collapsed_grants().items():
+                    if isinstance(target, SQLBase):
+                        target_engine = target._sql_engine()
+                        _, grants = blocks.setdefault(target_engine.url.render_as_string(), (target_engine, []))
+                        grants.append((role, target, privileges))
+                    else:
+                        target._safe_grant(grantee=role, privileges=privileges)
+                        changes.append(role._grant_step(target))
+        for target_engine, grants in blocks.values():
+            with target_engine.connect() as conn:
+                statements = [
+                    cls._grant_block(role=role, target=target, privileges=privileges, conn=conn)
+                    for role, target, privileges in grants
+                ]
+            changes += SQLBase._do_sql(target_engine, statements)
+        # the privileges read before granting are out of date
+        for entity in registry.entities:
+            entity._clear_cache()
+        return changes
+
+    @classmethod
+    def drop_all(
+        cls, engine: Engine | None = None, registry: Registry | None = None, guarded: bool = False
+    ) -> list[str]:
         """
         Attempts to drop all declared entities. Typically run via `remove_all`.
         :param engine: A :class:`sqlalchemy.Engine` that defines the connection to a Postgres instance/cluster.
+        :param registry: The :class:`dbdeclare.registry.Registry` of entities to use. Defaults to the current one.
+        :param guarded: Whether to drop entities with statements like `DROP SCHEMA IF EXISTS` instead of checking if each exists first, for entity types that have them. Requires psycopg 3, other drivers still check first.
+        :return: A list of the entities that were dropped, leaving out those that didn't exist.
         """
         cls._handle_engine(engine)
-        for entity in reversed(Entity.entities):
-            entity._safe_drop()
+        changes = []
+        for entity in reversed(cls._handle_registry(registry).entities):
+            with timed(entity._identity(), "drop"):
+                if entity._safe_drop(guarded=guarded):
+                    changes.append(f"drop {entity._identity()}")
+        return changes
 
     @classmethod
-    def revoke_all(cls, engine: Engine | None = None) -> None:
+    def revoke_all(cls, engine: Engine | None = None, registry: Registry | None = None) -> None:
         """
         Attempts to revoke all declared privileges. Requires entities to exist, typically run via `remove_all` or before
         `drop_all`.
         :param engine: A :class:`sqlalchemy.Engine` that defines the connection to a Postgres instance/cluster.
+        :param registry: The :class:`dbdeclare.registry.Registry` of entities to use. Defaults to the current one.
         """
         cls._handle_engine(engine)
-        for entity in reversed(Entity.entities):
+        for entity in reversed(cls._handle_registry(registry).entities):
             if isinstance(entity, Role):
                 entity._safe_revoke()
 
     @classmethod
-    def remove_all(cls, engine: Engine | None = None) -> None:
+    def remove_all(
+        cls, engine: Engine | None = None, registry: Registry | None = None, guarded: bool = False
+    ) -> list[str]:
         """
         Attempts to revoke all declared privileges then drop all declared entities. Main way to do so.
         :param engine: A :class:`sqlalchemy.Engine` that defines the connection to a Postgres instance/cluster.
+        :param registry: The :class:`dbdeclare.registry.Registry` of entities to use. Defaults to the current one.
+        :param guarded: Whether to drop entities with statements like `DROP SCHEMA IF EXISTS` instead of checking if each exists first, for entity types that have them. Requires psycopg 3, other drivers still check first.
+        :return: A list of the entities that were dropped, leaving out those that didn't exist.
         """
         cls._handle_engine(engine)
-        cls.revoke_all()
-        cls.drop_all()
+        cls.revoke_all(registry=registry)
+        return cls.drop_all(registry=registry, guarded=guarded)
+
+    @classmethod
+    def plan(cls, engine: Engine | None = None, registry: Registry | None = None) -> list[str]:
+        """
+        Lists the changes `run_all` would make in the cluster, without making any of them. Entities are named the way
+        `run_all` reports them.
+        :param engine: A :class:`sqlalchemy.Engine` that defines the connection to a Postgres instance/cluster.
+        :param registry: The :class:`dbdeclare.registry.Registry` of entities to use. Defaults to the current one.
+        :return: A list of pending changes as strings, in the order `run_all` would make them.
+        """
+        cls._handle_engine(engine)
+        entities = cls._handle_registry(registry).entities
+        missing: set[Entity] = set()
+        changes: list[str] = []
+        for entity in entities:
+            entity._clear_cache()
+            if cls._pending(entity, missing) or not entity._exists():
+                missing.add(entity)
+                changes.append(f"create {entity._identity()}")
+
+        for role in entities:
+            if isinstance(role, Role):
+                for target, privileges in role._collapsed_grants().items():
+                    if (
+                        role in missing
+                        or cls._pending(target, missing)
+                        or not target._grants_exist(grantee=role, privileges=privileges)
+                    ):
+                        changes.append(
+                            f"grant {', '.join(sorted(privileges))} on {target.__class__.__name__} "
+                            f"{target._grant_name} to {role.name}"
+                        )
+        return changes + cls._settings_deltas(entities)[1]
+
+    @classmethod
+    def verify(cls, engine: Engine | None = None, registry: Registry | None = None) -> list[Discrepancy]:
+        """
+        Checks every declared entity and privilege against the cluster, without stopping at the first one missing.
+        The ACL of each grantable is read once and every grantee is checked against it, so the cost grows with the
+        number of grantables rather than with roles times grantables.
+        :param engine: A :class:`sqlalchemy.Engine` that defines the connection to a Postgres instance/cluster.
+        :param registry: The :class:`dbdeclare.registry.Registry` of entities to use. Defaults to the current one.
+        :return: A list of :class:`dbdeclare.data_structures.Discrepancy`, empty if the cluster matches.
+        """
+        cls._handle_engine(engine)
+        entities = cls._handle_registry(registry).entities
+        missing: set[Entity] = set()
+        discrepancies: list[Discrepancy] = []
+        for entity in entities:
+            entity._clear_cache()
+            if cls._pending(entity, missing) or not entity._exists():
+                missing.add(entity)
+                discrepancies.append(Discrepancy(entity_type=entity.__class__.__name__, name=entity.name))
+
+        for role in entities:
+            if isinstance(role, Role):
+                for target, privileges in role.grants.items():
+                    declared = target._expand_privileges(privileges)
+                    if role in missing or cls._pending(target, missing):
+                        absent = declared
+                    else:
+                        absent = declared - target._acl(include_owner=True).get(role.name, set())
+                    if absent:
+                        discrepancies.append(
+                            Discrepancy(
+                                entity_type=target.__class__.__name__,
+                                name=target._grant_name,
+                                grantee=role.name,
+                                privileges=tuple(sorted(absent)),
+                            )
+                        )
+        return discrepancies
+
+    @classmethod
+    def critical_path(cls, registry: Registry | None = None) -> list[tuple[str, float]]:
+        """
+        Finds the chain of steps that bounds how fast the declarations can be applied, however much the work is
+        spread out: the longest path through the creates and grants, where creating an entity waits on the entities
+        it refers to (`depends_on` included), and a grant waits on its role and target. Costs are estimated from the
+        current :class:`dbdeclare.history.TimingHistory`.
+        :param registry: The :class:`dbdeclare.registry.Registry` of entities to use. Defaults to the current one.
+        :return: A list of tuples of each step and its estimated seconds, in the order they run. Empty without a current history.
+        """
+        history = TimingHistory.current()
+        if history is None:
+            return []
+        entities = cls._handle_registry(registry).entities
+        costs: dict[str, float] = {}
+        finishes: dict[str, float] = {}
+        previous: dict[str, str | None] = {}
+
+        def add(step: str, cost: float, dependencies: list[str]) -> None:
+            before = max((d for d in dependencies if d in finishes), key=finishes.__getitem__, default=None)
+            costs[step] = cost
+            finishes[step] = cost + (finishes[before] if before else 0.0)
+            previous[step] = before
+
+        # declaration order is a valid order to walk the graph in, since entities can only refer to earlier ones
+        for entity in entities:
+            add(
+                f"create {entity._identity()}",
+                history.estimate(entity._identity(), "create"),
+                [f"create {reference._identity()}" for reference in cls._references(entity)],
+            )
+        for role in entities:
+            if isinstance(role, Role):
+                for target in role._collapsed_grants():
+                    step = role._grant_step(target)
+                    owner = cls._owner(target)
+                    dependencies = [f"create {role._identity()}"]
+                    if owner is not None:
+                        dependencies.append(f"create {owner._identity()}")
+                    add(step, history.estimate(step, "grant"), dependencies)
+
+        path: list[tuple[str, float]] = []
+        last = max(finishes, key=finishes.__getitem__, default=None)
+        while last is not None:
+            path.append((last, costs[last]))
+            last = previous[last]
+        return path[::-1]
+
+    @classmethod
+    def select(cls, selector: Selector, registry: Registry | None = None, dependencies: bool = True) -> Registry:
+        """
+        Picks out the part of a declaration that matches a selector, to reconcile it without touching the rest: pass
+        the result as the `registry` of any other operation. It holds the matching entities, the grants of matching
+        roles and the grants on matching entities (or anything within them), and everything those need to be created:
+        the entities they refer to (like their database, owner, or `depends_on`), and the grantees and targets of the
+        grants, along with what those refer to in turn. Nothing else is reconciled, not even other grants of the
+        roles that are pulled in.
+        :param selector: A :class:`dbdeclare.data_structures.Selector` of the entities to reconcile.
+        :param registry: The :class:`dbdeclare.registry.Registry` of entities to select from. Defaults to the current one.
+        :param dependencies: Whether to include what the matching entities and grants need. Leave them out to remove a selection without dropping anything shared with the rest of the declaration, like the database of a granted role.
+        :return: A new :class:`dbdeclare.registry.Registry` with the selection, in the same order as the declaration.
+        """
+        registry = cls._handle_registry(registry)
+        # entities are compared by type and name, which isn't unique for database entities, so track them by id
+        matched = {id(entity) for entity in registry.entities if cls._matches(selector=selector, entity=entity)}
+        selected: set[int] = set()
+
+        def add(entity: Entity) -> None:
+            pending = [entity]
+            while pending:
+                entity = pending.pop()
+                if id(entity) not in selected:
+                    selected.add(id(entity))
+                    if dependencies:
+                        pending.extend(cls._references(entity))
+
+        for entity in registry.entities:
+            if id(entity) in matched:
+                add(entity)
+
+        grants: dict[int, GrantStore] = defaultdict(lambda: defaultdict(set))
+        for role in registry.entities:
+            if isinstance(role, Role):
+                for target, privileges in role.grants.items():
+                    owner = cls._owner(target)
+                    if id(role) in matched or (owner is not None and id(owner) in matched):
+                        grants[id(role)][target] = privileges
+                        if dependencies:
+                            add(role)
+                            if owner is not None:
+                                add(owner)
+
+        roles = {id(e): grants.get(id(e), {}) for e in registry.entities if isinstance(e, Role) and id(e) in selected}
+        return cls._derive(registry=registry, entities=selected, grants=roles)
+
+    @classmethod
+    def prune_redundant_grants(cls, registry: Registry | None = None) -> tuple[Registry, GrantSavings]:
+        """
+        Leaves out grants that are redundant because the role already inherits the privileges through its memberships
+        (`in_role` and the like, as long as `inherit` isn't turned off along the way), from roles that are granted
+        them or own the target. Pass the result as the `registry` of any other operation to skip them. The privileges
+        Postgres grants to `PUBLIC` by default don't count, since those can be revoked.
+        :param registry: The :class:`dbdeclare.registry.Registry` of entities to use. Defaults to the current one.
+        :return: A tuple of a new :class:`dbdeclare.registry.Registry` without the redundant grants, and the :class:`dbdeclare.data_structures.GrantSavings` of what was left out.
+        """
+        registry = cls._handle_registry(registry)
+        index = PrivilegeIndex(registry=registry, public_defaults=False)
+        pruned: dict[int, GrantStore] = {}
+        skipped: list[str] = []
+        statements = 0
+        for role in registry.entities:
+            if not isinstance(role, Role):
+                continue
+            kept = {
+                target: privileges
+                for target, privileges in role.grants.items()
+                if not target._expand_privileges(privileges).issubset(index.inherited_privileges(role, target))
+            }
+            if len(kept) < len(role.grants):
+                pruned[id(role)] = kept
+                skipped.extend(
+                    f"grant {', '.join(sorted(privileges))} on {target.__class__.__name__} {target._grant_name} to "
+                    f"{role.name}"
+                    for target, privileges in role.grants.items()
+                    if target not in kept
+                )
+                statements += len(Grantable._collapse(role.grants)) - len(Grantable._collapse(kept))
+        # each grant on a target is an entry in its ACL
+        savings = GrantSavings(grants=tuple(skipped), statements=statements, acl_entries=len(skipped))
+        return cls._derive(registry=registry, entities=None, grants=pruned), savings
+
+    @classmethod
+    def rotate_credentials(
+        cls,
+        credentials: Mapping[Role | str, Credential],
+        engine: Engine | None = None,
+        precompute: bool = True,
+        processes: int | None = None,
+        sessions: int = 4,
+        batch_size: int = PIPELINE_BATCH_SIZE,
+    ) -> list[Rotation]:
+        """
+        Changes the passwords and/or expiry of many existing roles at once. Each batch of roles is changed in a single
+        transaction, in one round trip with psycopg 3, and batches are spread over several sessions at the same time.
+        If a role fails, say because it doesn't exist, the rest of its batch is retried without it, so one bad role
+        doesn't hold up the others. Declared roles that are changed get the new password and expiry too.
+        :param credentials: A Mapping of each :class:`dbdeclare.entities.Role` (or its name) to its new :class:`dbdeclare.data_structures.Credential`.
+        :param engine: A :class:`sqlalchemy.Engine` that defines the connection to a Postgres instance/cluster.
+        :param precompute: Whether to send SCRAM-SHA-256 verifiers of the passwords instead of the passwords themselves, computed here rather than by the cluster, so they never show up in its logs. Passwords that are already verifiers are sent as they are.
+        :param processes: How many worker processes to compute the verifiers in. Defaults to one per CPU, and 1 computes them in this process.
+        :param sessions: How many sessions to change roles in at the same time. Postgres hashes every new password, verifier or not, to check it isn't empty, so each session keeps a CPU of the cluster busy.
+        :param batch_size: How many roles to change per transaction.
+        :return: A list of :class:`dbdeclare.data_structures.Rotation`, one per role in the order provided.
+        """
+        cls._handle_engine(engine)
+        roles = [role if isinstance(role, Role) else cls._undeclared_role(role) for role in credentials]
+        passwords = [credential.password for credential in credentials.values()]
+        if precompute:
+            passwords = cls._verifiers(passwords=passwords, processes=processes)
+        steps = [
+            (role.name, role._alter_credential_statements(password=password, valid_until=credential.valid_until))
+            for role, password, credential in zip(roles, passwords, credentials.values())
+        ]
+        steps = [step for step in steps if step[1]]
+        batches = [steps[start : start + batch_size] for start in range(0, len(steps), batch_size)]
+
+        # the engine is bound to this thread, so it's handed to the others
+        bound = Role.engine()
+        errors: dict[str, str] = {}
+        if sessions == 1 or len(batches) < 2:
+            for batch in batches:
+                errors.update(cls._rotate_batch(engine=bound, steps=batch))
+        else:
+            from concurrent.futures import ThreadPoolExecutor
+
+            with ThreadPoolExecutor(max_workers=sessions) as executor:
+                for batch_errors in executor.map(lambda batch: cls._rotate_batch(engine=bound, steps=batch), batches):
+                    errors.update(batch_errors)
+
+        for role, credential in zip(credentials, credentials.values()):
+            if isinstance(role, Role) and role.name not in errors:
+                role.password = credential.password if credential.password is not None else role.password
+                role.valid_until = credential.valid_until if credential.valid_until is not None else role.valid_until
+        return [Rotation(role=role.name, error=errors.get(role.name)) for role in roles]
+
+    @classmethod
+    def plan_move(cls, database: Database, tablespace: Tablespace, engine: Engine | None = None) -> TablespaceMove:
+        """
+        Works out what moving a database to another tablespace would cost, without moving it: how much has to be
+        copied, and how many sessions would have to end.
+        :param database: The :class:`dbdeclare.entities.Database` to move. It must exist.
+        :param tablespace: The :class:`dbdeclare.entities.Tablespace` to move it to.
+        :param engine: A :class:`sqlalchemy.Engine` that defines the connection to a Postgres instance/cluster.
+        :return: A :class:`dbdeclare.data_structures.TablespaceMove`.
+        """
+        cls._handle_engine(engine)
+        return database._tablespace_move(tablespace)
+
+    @classmethod
+    def move_database(
+        cls,
+        database: Database,
+        tablespace: Tablespace,
+        engine: Engine | None = None,
+        confirm: Callable[[TablespaceMove], bool] | None = None,
+        terminate: bool = False,
+    ) -> bool:
+        """
+        Moves a database to another tablespace with `ALTER DATABASE ... SET TABLESPACE`, which copies every file of
+        the database while nobody can connect to it. Declaring another tablespace on a database that exists doesn't
+        move it, this does. The cost is worked out first, see :meth:`plan_move`, and passed to `confirm`.
+        :param database: The :class:`dbdeclare.entities.Database` to move. It must exist.
+        :param tablespace: The :class:`dbdeclare.entities.Tablespace` to move it to. It must exist.
+        :param engine: A :class:`sqlalchemy.Engine` that defines the connection to a Postgres instance/cluster.
+        :param confirm: Called with the :class:`dbdeclare.data_structures.TablespaceMove` before anything changes. Return False to leave the database where it is.
+        :param terminate: Whether to end every other session connected to the database first. Otherwise the move fails if there are any.
+        :return: True if the database was moved, False if it was already there or `confirm` declined.
+        :raises PostgresDeclareError: If some relations of the database are already in the tablespace, which Postgres doesn't allow.
+        """
+        move = cls.plan_move(database=database, tablespace=tablespace, engine=engine)
+        if move.conflicts:
+            raise PostgresDeclareError(f"Cannot {move}.")
+        if not move.needed or (confirm is not None and not confirm(move)):
+            return False
+        database._dispose_engines()
+        with timed(database._identity(), "move"):
+            Database._commit_sql(engine=Database.engine(), statements=database._move_statements(tablespace, terminate))
+        database.tablespace = tablespace
+        return True
+
+    @classmethod
+    def run_on_clusters(
+        cls,
+        engines: Sequence[Engine | str],
+        operation: Operation = "run_all",
+        max_concurrent: int | None = None,
+        registry: Registry | None = None,
+        sample_locks: bool = False,
+    ) -> list[Report]:
+        """
+        Applies all declared entities to many clusters at once, each cluster in its own worker process. Declared
+        entities are pickled and sent to each worker, so any `sqlalchemy_base` used must be importable. With
+        `max_concurrent` set to 1, clusters are worked on one after the other in this process instead.
+        :param engines: A Sequence of :class:`sqlalchemy.Engine` or URL strings, one for each Postgres instance/cluster.
+        :param operation: The name of the operation to run on each cluster, `run_all` by default.
+        :param max_concurrent: The most clusters to work on at the same time. Defaults to all of them.
+        :param registry: The :class:`dbdeclare.registry.Registry` of entities to use. Defaults to the current one.
+        :param sample_locks: Whether to record lock waits with a :class:`dbdeclare.diagnostics.LockSampler` on each cluster and attach them to its report.
+        :return: A list of :class:`dbdeclare.data_structures.Report`, one per cluster in the order provided.
+        """
+        registry = cls._handle_registry(registry)
+        urls = [e if isinstance(e, str) else e.url.render_as_string(hide_password=False) for e in engines]
+        if not urls:
+            return []
+        history = TimingHistory.current()
+        if max_concurrent == 1:
+            reports = [_run_on_cluster(url, registry, operation, sample_locks) for url in urls]
+        else:
+            # imported here since it is slow to import and most runs only ever touch one cluster
+            from concurrent.futures import ProcessPoolExecutor
+
+            order = list(range(len(urls)))
+            if history:
+                # the slowest clusters go first, so no worker is left with a long one at the end
+                estimates = history.estimates(f"cluster {operation}")
+                order.sort(key=lambda i: estimates.get(make_url(urls[i]).render_as_string(), 0.0), reverse=True)
+            with ProcessPoolExecutor(max_workers=max_concurrent or len(urls)) as executor:
+                futures = {
+                    i: executor.submit(_run_on_cluster, urls[i], registry, operation, sample_locks) for i in order
+                }
+                reports = [futures[i].result() for i in range(len(urls))]
+        if history:
+            for report in reports:
+                if report.succeeded:
+                    history.record(key=report.url, operation=f"cluster {operation}", seconds=report.seconds)
+        return reports
 
     @classmethod
-    def _all_entities_exist(cls, engine: Engine | None = None) -> bool:
+    def _all_entities_exist(cls, engine: Engine | None = None, registry: Registry | None = None) -> bool:
         """
         Checks if all declared entities exist in the cluster.
         :param engine:  A :class:`sqlalchemy.Engine` that defines the connection to a Postgres instance/cluster.
+        :param registry: The :class:`dbdeclare.registry.Registry` of entities to use. Defaults to the current one.
         """
         cls._handle_engine(engine)
-        return all([entity._exists() for entity in Entity.entities])
+        return all([entity._exists() for entity in cls._handle_registry(registry).entities])
 
     @classmethod
-    def _all_grants_exist(cls, engine: Engine | None = None) -> bool:
+    def _all_grants_exist(cls, engine: Engine | None = None, registry: Registry | None = None) -> bool:
         """
         Checks if all declared grants exist in the cluster.
         :param engine:  A :class:`sqlalchemy.Engine` that defines the connection to a Postgres instance/cluster.
+        :param registry: The :class:`dbdeclare.registry.Registry` of entities to use. Defaults to the current one.
         """
         cls._handle_engine(engine)
-        return all([role._grants_exist() for role in Entity.entities if isinstance(role, Role)])
+        entities = cls._handle_registry(registry).entities
+        for entity in entities:
+            entity._clear_cache()
+        return all([role._grants_exist() for role in entities if isinstance(role, Role)])
 
     @classmethod
-    def _all_exist(cls, engine: Engine | None = None) -> bool:
+    def _all_exist(cls, engine: Engine | None = None, registry: Registry | None = None) -> bool:
         """
         Checks if all declared entities and grants exist in the cluster.
         :param engine:  A :class:`sqlalchemy.Engine` that defines the connection to a Postgres instance/cluster.
+        :param registry: The :class:`dbdeclare.registry.Registry` of entities to use. Defaults to the current one.
         """
         cls._handle_engine(engine)
-        return cls._all_entities_exist() and cls._all_grants_exist()
+        return cls._all_entities_exist(registry=registry) and cls._all_grants_exist(registry=registry)
+
+    @staticmethod
+    def _sync_deltas(
+        entities: Sequence[Entity], unmanaged_roles: Collection[str]
+    ) -> tuple[dict[str, GrantStore], dict[str, GrantStore]]:
+        """
+        Compares the declared privileges on every declared grantable with its ACL in the cluster, which is read once
+        per grantable. Privileges are compared as bitmasks per grantee. Like in `verify`, what the owner has counts
+        towards its declared privileges, but the owner's privileges are never revoked.
+        :param entities: The declared entities.
+        :param unmanaged_roles: Names of roles to leave out of the comparison.
+        :return: A tuple of the privileges to grant and the privileges to revoke, each mapping grantee names to a
+        :class:`dbdeclare.data_structures.grant_on.GrantStore`.
+        """
+        declared: dict[Grantable, dict[str, int]] = {}
+        for entity in entities:
+            for target in entity._grantables():
+                declared.setdefault(target, {})
+        for role in entities:
+            if isinstance(role, Role):
+                for target, privileges in role.grants.items():
+                    declared.setdefault(target, {})[role.name] = Grantable._mask(target._expand_privileges(privileges))
+
+        additions: dict[str, GrantStore] = defaultdict(dict)
+        removals: dict[str, GrantStore] = defaultdict(dict)
+        for target, wanted in declared.items():
+            existing = {
+                grantee: Grantable._mask(privileges) for grantee, privileges in target._acl(include_owner=True).items()
+            }
+            revocable = target._acl().keys()
+            for grantee in (existing.keys() | wanted.keys()) - set(unmanaged_roles):
+                have, want = existing.get(grantee, 0), wanted.get(grantee, 0)
+                if want & ~have:
+                    additions[grantee][target] = Grantable._unmask(want & ~have)
+                if have & ~want and grantee in revocable:
+                    removals[grantee][target] = Grantable._unmask(have & ~want)
+        return additions, removals
+
+    @staticmethod
+    def _settings_deltas(entities: Sequence[Entity]) -> tuple[list[tuple[str, Sequence[TextClause]]], list[str]]:
+        """
+        Compares the runtime settings declared on entities to those in the cluster, read from `pg_db_role_setting` in
+        a single query. Nothing is read if no settings are declared at all.
+        :param entities: The entities to compare.
+        :return: The steps that make the settings match, for :meth:`dbdeclare.mixins.sql.SQLBase._pipeline_sql`, and the changes they make as strings.
+        """
+        declared = [(entity, entity._declared_settings()) for entity in entities if isinstance(entity, Configurable)]
+        declared = [(entity, settings) for entity, settings in declared if settings]
+        if not declared:
+            return [], []
+        existing: dict[tuple[str, str], dict[str, str]] = defaultdict(dict)
+        for role, database, entry in SQLBase._fetch_sql(
+            engine=Role.engine(), statement=Configurable._settings_catalog_statement()
+        ):
+            name, _, value = entry.partition("=")
+            existing[(role, database)][name] = value
+
+        steps: list[tuple[str, Sequence[TextClause]]] = []
+        changes: list[str] = []
+        for entity, settings in declared:
+            for (role, database), wanted in settings.items():
+                current = existing.get((role, database), {})
+                delta: dict[str, Setting | None] = {
+                    name: value
+                    for name, value in wanted.items()
+                    if current.get(name) != Configurable._stored_setting(value)
+                }
+                delta.update({name: None for name in current if name not in wanted})
+                if not delta:
+                    continue
+                target = f"{entity.__class__.__name__} {entity.name}"
+                if role and database:
+                    target = f"{target} in Database {database}"
+                steps.append((f"configure {target}", entity._settings_statements(database, delta)))
+                changes.extend(
+                    f"reset {name} for {target}"
+                    if value is None
+                    else f"set {name}={Configurable._stored_setting(value)} for {target}"
+                    for name, value in delta.items()
+                )
+        return steps, changes
+
+    @classmethod
+    def _create_all(
+        cls, registry: Registry, progress: Progress, pipeline: bool = False, guarded: bool = False
+    ) -> list[str]:
+        """
+        Creates all declared entities that the progress doesn't have as created already.
+        :param registry: The :class:`dbdeclare.registry.Registry` of entities to use.
+        :param progress: The :class:`dbdeclare.checkpoint.Progress` of the run.
+        :param pipeline: Whether to check and create consecutive entities on the same database in pipelined batches.
+        :param guarded: Whether to create entities with statements that do nothing if they exist, instead of checking first.
+        :return: A list of the entities that were created.
+        """
+        changes: list[str] = []
+        batch: list[ClusterEntity | DatabaseSqlEntity] = []
+        for entity in registry.entities:
+            step = f"create {entity._identity()}"
+            if not progress.pending(step):
+                continue
+            if pipeline and isinstance(entity, (ClusterEntity, DatabaseSqlEntity)) and entity._create_in_transaction:
+                # a batch only ever holds entities on one database, in the order they were declared
+                if batch and (len(batch) == PIPELINE_BATCH_SIZE or batch[0]._sql_engine() is not entity._sql_engine()):
+                    changes += cls._pipeline_create(entities=batch, progress=progress)
+                    batch = []
+                batch.append(entity)
+                continue
+            if batch:
+                changes += cls._pipeline_create(entities=batch, progress=progress)
+                batch = []
+            with timed(entity._identity(), "create"):
+                if entity._safe_create(guarded=guarded):
+                    changes.append(step)
+            progress.done(step)
+        if batch:
+            changes += cls._pipeline_create(entities=batch, progress=progress)
+        return changes
+
+    @staticmethod
+    def _pipeline_create(entities: Sequence[ClusterEntity | DatabaseSqlEntity], progress: Progress) -> list[str]:
+        """
+        Checks a batch of entities on one database in one round trip, then creates those that don't exist in another.
+        :param entities: The entities to create, in the order they were declared.
+        :param progress: The :class:`dbdeclare.checkpoint.Progress` of the run.
+        :return: A list of the entities that were created.
+        """
+        engine = entities[0]._sql_engine()
+        with timed_batch([entity._identity() for entity in entities], "create"):
+            exists = SQLBase._pipeline_sql(
+                engine=engine,
+                steps=[(f"create {entity._identity()}", [entity._exists_statement()]) for entity in entities],
+            )
+            missing = []
+            for entity, rows in zip(entities, exists):
+                if rows[0][0]:
+                    entity._skip_create()
+                else:
+                    missing.append(entity)
+            SQLBase._pipeline_sql(
+                engine=engine,
+                steps=[(f"create {entity._identity()}", entity._create_statements()) for entity in missing],
+            )
+        for entity in entities:
+            progress.done(f"create {entity._identity()}")
+        return [f"create {entity._identity()}" for entity in missing]
+
+    @classmethod
+    def _create_in_block(cls, entities: Sequence[ClusterEntity | DatabaseSqlEntity]) -> list[str]:
+        """
+        Checks and creates entities on one database in a single DO block.
+        :param entities: The entities to create, in the order they were declared.
+        :return: A list of the entities that were created.
+        """
+        engine = entities[0]._sql_engine()
+        with engine.connect() as conn:
+            statements = [cls._create_block(entity, conn=conn) for entity in entities]
+        try:
+            return SQLBase._do_sql(engine, statements)
+        except Exception as error:
+            # raised by the block, straight from psycopg, for an entity that exists when existence checks say it
+            # shouldn't
+            if getattr(error, "sqlstate", None) == "42710":
+                raise EntityExistsError(error.diag.message_primary) from error  # type: ignore
+            raise
+
+    @staticmethod
+    def _create_block(entity: ClusterEntity | DatabaseSqlEntity, conn: Connection) -> str:
+        """
+        Compiles the existence check and create statements of an entity into PL/pgSQL for a DO block.
+        :param entity: The entity to create.
+        :param conn: An open :class:`sqlalchemy.Connection` to the entity's database, to render the statements on.
+        :return: PL/pgSQL that creates the entity if it doesn't exist and raises a notice saying so. If it exists and existence checks say it shouldn't, it raises an exception instead.
+        """
+        creates = [f"{SQLBase._literal_sql(conn, statement)};" for statement in entity._create_statements()]
+        otherwise = []
+        if entity.check_if_exists or entity._registry.check_if_any_exist:
+            message = SQLBase._quote(str(entity._exists_error()))
+            otherwise = ["ELSE", f"RAISE EXCEPTION USING ERRCODE = 'duplicate_object', MESSAGE = {message};"]
+        return "\n".join(
+            [
+                f"IF NOT ({SQLBase._literal_sql(conn, entity._exists_statement())}) THEN",
+                *creates,
+                f"RAISE NOTICE '%', {SQLBase._quote(f'create {entity._identity()}')};",
+                *otherwise,
+                "END IF;",
+            ]
+        )
+
+    @staticmethod
+    def _grant_block(role: Role, target: SQLBase, privileges: set[Privilege], conn: Connection) -> str:
+        """
+        Compiles the grant statements for privileges on a target into PL/pgSQL for a DO block.
+        :param role: The :class:`dbdeclare.entities.Role` to grant privileges to.
+        :param target: The grantable to grant privileges on.
+        :param privileges: The set of :class:`dbdeclare.data_structures.Privilege` to grant.
+        :param conn: An open :class:`sqlalchemy.Connection` to the target's database, to render the statements on.
+        :return: PL/pgSQL that grants the privileges, and raises a notice if that changed the ACL of the target.
+        """
+        grantable = cast(Grantable, target)
+        acl = SQLBase._literal_sql(conn, grantable._acl_statement())
+
+        def snapshot(variable: str) -> str:
+            return f"SELECT array_agg(s::text ORDER BY s::text) INTO {variable} FROM ({acl}) AS s;"
+
+        grants = [
+            f"{SQLBase._literal_sql(conn, statement)};"
+            for statement in grantable._grant_statements(grantee=role, privileges=privileges)
+        ]
+        return "\n".join(
+            [
+                snapshot("_before"),
+                *grants,
+                snapshot("_after"),
+                "IF _before IS DISTINCT FROM _after THEN",
+                f"RAISE NOTICE '%', {SQLBase._quote(role._grant_step(grantable))};",
+                "END IF;",
+            ]
+        )
+
+    @staticmethod
+    def _grant_all(registry: Registry, progress: Progress, pipeline: bool = False) -> None:
+        """
+        Grants all declared privileges that the progress doesn't have as granted already.
+        :param registry: The :class:`dbdeclare.registry.Registry` of entities to use.
+        :param progress: The :class:`dbdeclare.checkpoint.Progress` of the run.
+        :param pipeline: Whether to send the grants on each database in pipelined batches. Instead of checking that each role and target exists first, Postgres rejects the grants on ones that don't.
+        """
+        if not pipeline:
+            for entity in registry.entities:
+                if isinstance(entity, Role):
+                    entity._safe_grant(progress=progress)
+            return
+
+        # grants are independent of each other once every entity exists, so they're only grouped by database
+        batches: dict[str, tuple[Engine, list[tuple[str, Sequence[TextClause]]]]] = {}
+        for entity in registry.entities:
+            if isinstance(entity, Role):
+                for target, privileges in entity._collapsed_grants().items():
+                    step = entity._grant_step(target)
+                    if not progress.pending(step):
+                        continue
+                    if isinstance(target, SQLBase):
+                        engine = target._sql_engine()
+                        _, steps = batches.setdefault(engine.url.render_as_string(), (engine, []))
+                        steps.append((step, target._grant_statements(grantee=entity, privileges=privileges)))
+                    else:
+                        with timed(step, "grant"):
+                            target._safe_grant(grantee=entity, privileges=privileges)
+                        progress.done(step)
+        for engine, steps in batches.values():
+            for start in range(0, len(steps), PIPELINE_BATCH_SIZE):
+                batch = steps[start : start + PIPELINE_BATCH_SIZE]
+                with timed_batch([step for step, _ in batch], "grant"):
+                    SQLBase._pipeline_sql(engine=engine, steps=batch)
+                for step, _ in batch:
+                    progress.done(step)
+        # the privileges read before granting are out of date
+        for entity in registry.entities:
+            entity._clear_cache()
+
+    @staticmethod
+    def _progress(registry: Registry, checkpoint: Checkpoint | None, resume: bool) -> Progress:
+        """
+        Utility to start tracking a run against a checkpoint, keyed by the declaration and the cluster.
+        :param registry: The :class:`dbdeclare.registry.Registry` of entities to use.
+        :param checkpoint: The :class:`dbdeclare.checkpoint.Checkpoint` to record progress in, if any.
+        :param resume: Whether to skip the work the checkpoint recorded as completed.
+        :return: A :class:`dbdeclare.checkpoint.Progress` for the run.
+        """
+        if checkpoint is None:
+            return Progress(checkpoint=None, key="", resume=False)
+        key = f"{registry.fingerprint()} {Entity.engine().url.render_as_string()}"
+        return Progress(checkpoint=checkpoint, key=key, resume=resume)
+
+    @staticmethod
+    def _references(entity: Entity) -> list[Entity]:
+        """
+        Utility to find the entities an entity refers to, like its database, owner, or `depends_on`.
+        :param entity: Any given entity.
+        :return: A list of entities.
+        """
+        references: list[Entity] = []
+        for value in vars(entity).values():
+            if isinstance(value, Entity):
+                references.append(value)
+            elif isinstance(value, (list, tuple)):
+                references.extend(v for v in value if isinstance(v, Entity))
+        return references
+
+    @classmethod
+    def _links(cls, entity: Entity) -> list[str]:
+        """
+        The entities an entity can't be created independently of: those it refers to that are created in the same
+        phase of `run_shared`, and the database it lives in.
+        :param entity: Any given entity.
+        :return: A list of the identities of the linked entities.
+        """
+        cluster_level = isinstance(entity, ClusterEntity)
+        return [
+            reference._identity()
+            for reference in cls._references(entity)
+            if isinstance(reference, ClusterEntity) == cluster_level or reference is getattr(entity, "database", None)
+        ]
+
+    @staticmethod
+    def _owner(target: object) -> Entity | None:
+        """
+        Utility to find the entity a grantable is created by, which is the grantable itself for most of them, and the
+        database content for tables.
+        :param target: Any grantable.
+        :return: The entity, if any.
+        """
+        while target is not None and not isinstance(target, Entity):
+            target = getattr(target, "database_content", None) or getattr(target, "database", None)
+        return target
+
+    @staticmethod
+    def _verifiers(passwords: list[str | None], processes: int | None) -> list[str | None]:
+        """
+        Utility to compute SCRAM-SHA-256 verifiers of many passwords, spread over worker processes since each one
+        takes thousands of hashing iterations on purpose.
+        :param passwords: A list of passwords, which may be None or verifiers already.
+        :param processes: How many worker processes to use. Defaults to one per CPU, and 1 uses this process.
+        :return: The verifiers, in the same order, with None and existing verifiers left as they were.
+        """
+        todo = [i for i, password in enumerate(passwords) if password and not password.startswith("SCRAM-SHA-256$")]
+        plain = [cast(str, passwords[i]) for i in todo]
+        if processes == 1 or len(plain) < 2:
+            verifiers = [scram_sha_256(password) for password in plain]
+        else:
+            # imported here since it is slow to import and only needed for bulk rotations
+            from concurrent.futures import ProcessPoolExecutor
+
+            workers = processes or os.cpu_count() or 1
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                verifiers = list(executor.map(scram_sha_256, plain, chunksize=max(1, len(plain) // (workers * 4))))
+        result = list(passwords)
+        for i, verifier in zip(todo, verifiers):
+            result[i] = verifier
+        return result
+
+    @staticmethod
+    def _rotate_batch(engine: Engine, steps: list[tuple[str, Sequence[TextClause]]]) -> dict[str, str]:
+        """
+        Utility to change the credentials of a batch of roles in one transaction, leaving out any that fail.
+        :param engine: A :class:`sqlalchemy.Engine` for the cluster.
+        :param steps: The name of each role, and the statements that change it.
+        :return: A dict mapping the name of each role that failed to why.
+        """
+        errors = {}
+        pending = steps
+        while pending:
+            try:
+                Role._pipeline_sql(engine=engine, steps=pending)
+                pending = []
+            except PipelineError as error:
+                errors[error.step] = str(error)
+                pending = [step for step in pending if step[0] != error.step]
+        return errors
+
+    @staticmethod
+    def _derive(registry: Registry, entities: Collection[int] | None, grants: dict[int, GrantStore]) -> Registry:
+        """
+        Utility to build a registry from part of another, without changing it. Roles get a copy with other grants.
+        :param registry: The :class:`dbdeclare.registry.Registry` to build from.
+        :param entities: The ids of the entities to keep, or None to keep them all.
+        :param grants: The grants to give roles instead of their own, by the id of the role.
+        :return: A new :class:`dbdeclare.registry.Registry`, in the same order as the one built from.
+        """
+        derived = Registry(check_if_any_exist=registry.check_if_any_exist)
+        for entity in registry.entities:
+            if entities is None or id(entity) in entities:
+                if isinstance(entity, Role) and id(entity) in grants:
+                    role = copy(entity)
+                    role.grants = defaultdict(set, grants[id(entity)])
+                    entity = role
+                derived.register(entity)
+        return derived
+
+    @staticmethod
+    def _matches(selector: Selector, entity: Entity) -> bool:
+        """
+        Checks if an entity matches any of the criteria of a selector.
+        :param selector: A :class:`dbdeclare.data_structures.Selector`.
+        :param entity: Any given entity.
+        :return: True if the entity matches, False otherwise.
+        """
+        if isinstance(entity, Role) and entity.name in selector.roles:
+            return True
+        if any(fnmatchcase(entity.name, name) for name in selector.names):
+            return True
+        if not entity._tags.isdisjoint(selector.tags):
+            return True
+        if selector.databases:
+            # the database itself, or the one the entity (or its database content) lives in
+            target: object = entity
+            while target is not None and not isinstance(target, Database):
+                target = getattr(target, "database_content", None) or getattr(target, "database", None)
+            return isinstance(target, Database) and target.name in selector.databases
+        return False
+
+    @staticmethod
+    def _grant_key(role_grant: tuple[Role, Grantable, set[Privilege]]) -> str:
+        return f"{role_grant[0].name} {role_grant[1]._grant_identity()}"
+
+    @staticmethod
+    def _grant_links(role_grant: tuple[Role, Grantable, set[Privilege]]) -> list[str]:
+        """
+        Grants on anything within the same database are kept together, since they touch the same catalogs.
+        :param role_grant: A tuple of the grantee, the target, and the privileges to grant.
+        :return: A list with the identity of the target's database, or of the target itself if it is cluster-wide.
+        """
+        target: object = role_grant[1]
+        while getattr(target, "database_content", None) or getattr(target, "database", None):
+            target = getattr(target, "database_content", None) or getattr(target, "database")
+        return [target._identity() if isinstance(target, Entity) else str(target)]
+
+    @staticmethod
+    def _undeclared_role(name: str) -> Role:
+        """
+        Utility to refer to a role that exists in the cluster but isn't declared, so its privileges can be revoked.
+        :param name: The name of the role.
+        :return: A :class:`dbdeclare.entities.Role` that isn't part of any registry in use.
+        """
+        with Registry():
+            return Role(name=name)
 
     @staticmethod
     def _handle_engine(engine: Engine | None = None) -> None:
         """
-        Utility to assign the engine if it is provided.
+        Utility to bind the engine to the running thread or asyncio task if it is provided.
         :param engine: A :class:`sqlalchemy.Engine` that defines the connection to a Postgres instance/cluster.
         """
         if engine:
             Entity._engine = engine
+
+    @staticmethod
+    def _pending(target: object, missing: set[Entity]) -> bool:
+        """
+        Checks if a target, or the database or content it lives in, is yet to be created. Those can't be inspected
+        in the cluster, since there may not even be a database to connect to.
+        :param target: An entity or other grantable, like a table.
+        :param missing: The set of entities known to be missing from the cluster.
+        :return: True if the target or anything it lives in is missing, False otherwise.
+        """
+        while target is not None:
+            if target in missing:
+                return True
+            target = getattr(target, "database_content", None) or getattr(target, "database", None)
+        return False
+
+    @staticmethod
+    def _handle_registry(registry: Registry | None = None) -> Registry:
+        """
+        Utility to pick the registry to operate on.
+        :param registry: The :class:`dbdeclare.registry.Registry` of entities to use, if provided.
+        :return: The provided registry, otherwise the current one.
+        """
+        return registry or Registry.current()
+
+
+def _run_on_cluster(url: str, registry: Registry, operation: Operation, sample_locks: bool = False) -> Report:
+    """
+    Runs a controller operation against a single cluster. Lives at module level so worker processes can use it.
+    :param url: The URL of the Postgres instance/cluster.
+    :param registry: The :class:`dbdeclare.registry.Registry` of declared entities to apply.
+    :param operation: The name of the controller operation to run.
+    :param sample_locks: Whether to record lock waits while the operation runs.
+    :return: A :class:`dbdeclare.data_structures.Report` for this cluster.
+    """
+    report = Report(url=make_url(url).render_as_string(), operation=operation)
+    engine = create_engine(url, connect_args={"application_name": APPLICATION_NAME})
+    sampler = LockSampler(engine)
+    start = perf_counter()
+    try:
+        with bind_engine(engine):
+            if sample_locks:
+                with sampler:
+                    result = getattr(Controller, operation)(registry=registry)
+            else:
+                result = getattr(Controller, operation)(registry=registry)
+        if isinstance(result, list):
+            report.changes = [str(change) for change in result]
+    except Exception as e:
+        report.error = f"{e.__class__.__name__}: {e}"
+    finally:
+        report.seconds = perf_counter() - start
+        report.lock_waits = sampler.waits
+        # in-process runs would otherwise keep a pool open per database for every cluster worked on
+        for entity in registry.entities:
+            if isinstance(entity, Database):
+                entity._close_engine(engine.url)
+        engine.dispose()
+    return report
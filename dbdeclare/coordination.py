@@ -0,0 +1,159 @@
+import random
+from typing import Any, Callable, Iterable, Sequence, TypeVar
+from zlib import crc32
+
+from sqlalchemy import Connection, Engine, text
+
+T = TypeVar("T")
+
+
+class PartitionClaims:
+    """
+    Shares work between replicas that apply the same declarations to the same cluster at the same time. Each replica
+    claims partitions of the work with session-level `advisory locks <https://www.postgresql.org/docs/current/explicit-locking.html#ADVISORY-LOCKS>`_,
+    works on the ones it claimed, and marks them done with a shared lock that it holds until it is finished. A replica
+    that runs out of partitions to claim waits for the ones others are working on, and takes over any whose replica
+    died (Postgres releases the locks of a session that ends). Use it as a context manager, which holds the one
+    connection the locks belong to.
+    """
+
+    def __init__(self, engine: Engine, namespace: str):
+        """
+        :param engine: A :class:`sqlalchemy.Engine` that defines the connection to a Postgres instance/cluster.
+        :param namespace: A string that identifies the work, the same for every replica sharing it. Typically the fingerprint of the declarations.
+        """
+        self.engine = engine
+        self.namespace = namespace
+        self._conn: Connection | None = None
+
+    def __enter__(self) -> "PartitionClaims":
+        self._conn = self.engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        if self._conn:
+            # the connection goes back to the pool with its session, so the locks must be released explicitly
+            self._conn.execute(text("SELECT pg_advisory_unlock_all()"))
+            self._conn.close()
+            self._conn = None
+
+    def run(
+        self,
+        phase: str,
+        partitions: Sequence[T],
+        reconcile: Callable[[T], None],
+        costs: Sequence[float] | None = None,
+    ) -> int:
+        """
+        Makes sure every partition of a phase is reconciled, by this replica or another, before returning. Partitions
+        are claimed most expensive first if their costs are known, so no replica is left with a long one at the end,
+        and otherwise in a random order so that replicas starting at the same time spread out.
+        :param phase: The name of the phase, so the partitions of different phases get different locks.
+        :param partitions: The partitions of work, in the same order for every replica.
+        :param reconcile: Function that does the work of one partition. It must be safe to run again, since a partition whose replica died is reconciled again from the start.
+        :param costs: The estimated cost of each partition, if known.
+        :return: The number of partitions this replica reconciled.
+        """
+        work, done = self._key(f"{phase}:work"), self._key(f"{phase}:done")
+        order = list(range(len(partitions)))
+        random.shuffle(order)
+        if costs:
+            order.sort(key=lambda index: costs[index], reverse=True)
+
+        reconciled = 0
+        busy: list[int] = []
+        for index in order:
+            if self._execute("SELECT pg_try_advisory_lock(:key, :index)", key=work, index=index):
+                reconciled += self._finish(partitions[index], index, work, done, reconcile)
+            else:
+                busy.append(index)
+        for index in busy:
+            # blocks until the replica working on it is done, or has died
+            self._execute("SELECT pg_advisory_lock(:key, :index)", key=work, index=index)
+            reconciled += self._finish(partitions[index], index, work, done, reconcile)
+        return reconciled
+
+    def _finish(self, partition: T, index: int, work: int, done: int, reconcile: Callable[[T], None]) -> int:
+        """
+        Reconciles a partition whose work lock this replica holds, unless another replica already did.
+        :param partition: The partition of work.
+        :param index: The index of the partition.
+        :param work: The key of the phase's work locks.
+        :param done: The key of the phase's done markers.
+        :param reconcile: Function that does the work of one partition.
+        :return: 1 if this replica reconciled the partition, 0 if another one already had.
+        """
+        try:
+            # nobody holds the done marker if getting it exclusively succeeds
+            if not self._execute("SELECT pg_try_advisory_lock(:key, :index)", key=done, index=index):
+                return 0
+            self._execute("SELECT pg_advisory_unlock(:key, :index)", key=done, index=index)
+            reconcile(partition)
+            self._execute("SELECT pg_advisory_lock_shared(:key, :index)", key=done, index=index)
+            return 1
+        finally:
+            self._execute("SELECT pg_advisory_unlock(:key, :index)", key=work, index=index)
+
+    def _execute(self, statement: str, **params: int) -> Any:
+        """
+        Runs an advisory lock function on the connection that holds the locks.
+        :param statement: The SQL statement to run.
+        :param params: The parameters to bind.
+        :return: The single value the statement returns.
+        """
+        if self._conn is None:
+            raise RuntimeError("PartitionClaims must be used as a context manager.")
+        return self._conn.execute(text(statement).bindparams(**params)).scalar()
+
+    def _key(self, suffix: str) -> int:
+        """
+        Derives the first half of a two-part advisory lock key, which must fit in a signed 32-bit integer.
+        :param suffix: What the key is for, within this namespace.
+        :return: A signed 32-bit integer.
+        """
+        key = crc32(f"dbdeclare:{self.namespace}:{suffix}".encode())
+        return key - 2**32 if key >= 2**31 else key
+
+
+class _Components:
+    """
+    Union-find over string keys, to group items that are linked to each other directly or through other items.
+    """
+
+    def __init__(self) -> None:
+        self._parents: dict[str, str] = {}
+
+    def find(self, key: str) -> str:
+        self._parents.setdefault(key, key)
+        while self._parents[key] != key:
+            self._parents[key] = self._parents[self._parents[key]]
+            key = self._parents[key]
+        return key
+
+    def union(self, key: str, other: str) -> None:
+        self._parents[self.find(other)] = self.find(key)
+
+
+def partition(
+    items: Sequence[T], key: Callable[[T], str], links: Callable[[T], Iterable[str]], count: int
+) -> list[list[T]]:
+    """
+    Splits items into at most `count` partitions, such that linked items always end up in the same partition and
+    every replica computes the same partitions. Items keep their order within a partition.
+    :param items: The items to split.
+    :param key: Function that gives the unique key of an item.
+    :param links: Function that gives the keys an item is linked to, which need not be keys of items.
+    :param count: The most partitions to split into.
+    :return: A list of non-empty partitions.
+    """
+    components = _Components()
+    for item in items:
+        for link in links(item):
+            components.union(key(item), link)
+
+    buckets: dict[int, list[T]] = {}
+    for item in items:
+        # a stable hash of the component, so every replica agrees
+        root = components.find(key(item))
+        buckets.setdefault(crc32(root.encode()) % count, []).append(item)
+    return [buckets[index] for index in sorted(buckets)]
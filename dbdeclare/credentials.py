@@ -0,0 +1,65 @@
+import hmac
+import os
+import stringprep
+import unicodedata
+from base64 import b64encode
+from hashlib import pbkdf2_hmac, sha256
+
+# what Postgres uses for the verifiers it computes itself, unless its scram_iterations setting says otherwise
+SCRAM_ITERATIONS = 4096
+
+
+def scram_sha_256(password: str, salt: bytes | None = None, iterations: int = SCRAM_ITERATIONS) -> str:
+    """
+    Computes the SCRAM-SHA-256 verifier Postgres stores for a password, the same way it would, so the password
+    itself never has to be sent to the cluster. Postgres recognizes a verifier passed as a password and stores it
+    as it is.
+    :param password: The password.
+    :param salt: A random salt. Defaults to 16 random bytes, like Postgres uses.
+    :param iterations: The number of PBKDF2 iterations.
+    :return: The verifier, like `SCRAM-SHA-256$4096:<salt>$<stored key>:<server key>`.
+    """
+    salt = os.urandom(16) if salt is None else salt
+    salted = pbkdf2_hmac("sha256", _saslprep(password), salt, iterations)
+    stored_key = sha256(hmac.digest(salted, b"Client Key", "sha256")).digest()
+    server_key = hmac.digest(salted, b"Server Key", "sha256")
+    return (
+        f"SCRAM-SHA-256${iterations}:{b64encode(salt).decode()}"
+        f"${b64encode(stored_key).decode()}:{b64encode(server_key).decode()}"
+    )
+
+
+def _saslprep(password: str) -> bytes:
+    """
+    Helper to normalize a password with `SASLprep <https://datatracker.ietf.org/doc/html/rfc4013>`_, the way
+    Postgres does before hashing it. Like Postgres, a password SASLprep prohibits is used as it is instead.
+    :param password: The password.
+    :return: The normalized password, encoded as UTF-8.
+    """
+    raw = password.encode()
+    if password.isascii():
+        # SASLprep leaves printable ASCII alone, and prohibits control characters, so either way it's used as it is
+        return raw
+    mapped = "".join(" " if stringprep.in_table_c12(c) else c for c in password if not stringprep.in_table_b1(c))
+    normalized = unicodedata.normalize("NFKC", mapped)
+    prohibited = (
+        stringprep.in_table_a1,
+        stringprep.in_table_c12,
+        stringprep.in_table_c21_c22,
+        stringprep.in_table_c3,
+        stringprep.in_table_c4,
+        stringprep.in_table_c5,
+        stringprep.in_table_c6,
+        stringprep.in_table_c7,
+        stringprep.in_table_c8,
+        stringprep.in_table_c9,
+    )
+    if not normalized or any(check(c) for c in normalized for check in prohibited):
+        return raw
+    # text that's right to left anywhere must be right to left at both ends, and never left to right
+    if any(stringprep.in_table_d1(c) for c in normalized):
+        if any(stringprep.in_table_d2(c) for c in normalized) or not (
+            stringprep.in_table_d1(normalized[0]) and stringprep.in_table_d1(normalized[-1])
+        ):
+            return raw
+    return normalized.encode()
@@ -1,5 +1,27 @@
-__all__ = ["GrantOn", "GrantTo", "Privilege"]
+__all__ = [
+    "Credential",
+    "DefaultObject",
+    "Discrepancy",
+    "GrantOn",
+    "GrantSavings",
+    "GrantTo",
+    "LockWait",
+    "Privilege",
+    "Report",
+    "Rotation",
+    "Selector",
+    "TablespaceMove",
+]
 
+from dbdeclare.data_structures.credential import Credential
+from dbdeclare.data_structures.default_object import DefaultObject
+from dbdeclare.data_structures.discrepancy import Discrepancy
 from dbdeclare.data_structures.grant_on import GrantOn
+from dbdeclare.data_structures.grant_savings import GrantSavings
 from dbdeclare.data_structures.grant_to import GrantTo
+from dbdeclare.data_structures.lock_wait import LockWait
 from dbdeclare.data_structures.privileges import Privilege
+from dbdeclare.data_structures.report import Report
+from dbdeclare.data_structures.rotation import Rotation
+from dbdeclare.data_structures.selector import Selector
+from dbdeclare.data_structures.tablespace_move import TablespaceMove
@@ -0,0 +1,13 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+
+@dataclass(frozen=True)
+class Credential:
+    """
+    Represents a new password and/or expiry for a role, see :class:`dbdeclare.controller.Controller`
+    `rotate_credentials`. Whatever is left as None is left as it is.
+    """
+
+    password: str | None = None
+    valid_until: datetime | None = None
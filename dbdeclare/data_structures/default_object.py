@@ -0,0 +1,13 @@
+from enum import StrEnum
+
+
+class DefaultObject(StrEnum):
+    """
+    Enumeration of all object types that default privileges can be declared for, see official documentation `here <https://www.postgresql.org/docs/current/sql-alterdefaultprivileges.html>`_.
+    """
+
+    TABLES = "TABLES"
+    SEQUENCES = "SEQUENCES"
+    FUNCTIONS = "FUNCTIONS"
+    TYPES = "TYPES"
+    SCHEMAS = "SCHEMAS"
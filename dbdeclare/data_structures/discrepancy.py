@@ -0,0 +1,26 @@
+from dataclasses import dataclass, field
+
+from dbdeclare.data_structures.privileges import Privilege
+
+
+@dataclass(frozen=True)
+class Discrepancy:
+    """
+    Represents something declared that is missing from the cluster, as found by
+    :class:`dbdeclare.controller.Controller` `verify`. Either a whole entity is missing, or privileges a role should
+    have on a grantable are.
+    """
+
+    entity_type: str
+    name: str
+    grantee: str | None = None
+    privileges: tuple[Privilege, ...] = field(default_factory=tuple)
+
+    @property
+    def missing_entity(self) -> bool:
+        return self.grantee is None
+
+    def __str__(self) -> str:
+        if self.missing_entity:
+            return f"missing {self.entity_type} {self.name}"
+        return f"missing {', '.join(self.privileges)} on {self.entity_type} {self.name} for {self.grantee}"
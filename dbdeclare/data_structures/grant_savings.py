@@ -0,0 +1,19 @@
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True)
+class GrantSavings:
+    """
+    Represents the redundant grants :class:`dbdeclare.controller.Controller` `prune_redundant_grants` left out, and
+    what that saves: GRANT statements sent, and entries in the ACLs of the targets.
+    """
+
+    grants: tuple[str, ...] = field(default_factory=tuple)
+    statements: int = 0
+    acl_entries: int = 0
+
+    def __str__(self) -> str:
+        return (
+            f"skipped {len(self.grants)} redundant grants, saving {self.statements} statements and "
+            f"{self.acl_entries} ACL entries"
+        )
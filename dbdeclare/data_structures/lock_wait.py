@@ -0,0 +1,27 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class LockWait:
+    """
+    Represents a statement run by dbdeclare that had to wait for a lock held by another backend, as recorded by
+    :class:`dbdeclare.diagnostics.LockSampler`. `seconds` is how long the statement was seen waiting on the lock,
+    from the first sample that caught the wait to the last, so it can be short of the real wait by up to the
+    sampler's interval and doesn't include the time the statement ran before it had to wait.
+    """
+
+    pid: int
+    query: str
+    seconds: float
+    blocking_pid: int
+    blocking_query: str
+    lock_type: str
+    database: str | None = None
+    relation: str | None = None
+
+    def __str__(self) -> str:
+        target = " ".join(filter(None, [self.lock_type, self.database, self.relation]))
+        return (
+            f"{self.query!r} waited {self.seconds:.2f}s on {target}, "
+            f"blocked by pid {self.blocking_pid} running {self.blocking_query!r}"
+        )
@@ -0,0 +1,21 @@
+from dataclasses import dataclass, field
+
+from dbdeclare.data_structures.lock_wait import LockWait
+
+
+@dataclass
+class Report:
+    """
+    Represents the outcome of running a :class:`dbdeclare.controller.Controller` operation against one cluster.
+    """
+
+    url: str
+    operation: str
+    seconds: float = 0.0
+    error: str | None = None
+    changes: list[str] = field(default_factory=list)
+    lock_waits: list[LockWait] = field(default_factory=list)
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
@@ -0,0 +1,16 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Rotation:
+    """
+    Represents the outcome of rotating the credential of one role with :class:`dbdeclare.controller.Controller`
+    `rotate_credentials`.
+    """
+
+    role: str
+    error: str | None = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
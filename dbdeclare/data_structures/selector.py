@@ -0,0 +1,16 @@
+from dataclasses import dataclass
+from typing import Sequence
+
+
+@dataclass(frozen=True)
+class Selector:
+    """
+    Picks out part of a declaration, see :class:`dbdeclare.controller.Controller` `select`. An entity matches if it
+    matches any of the criteria: it is or lives in one of the `databases`, it is one of the `roles`, its name matches
+    one of the `names` globs (like `tenant_a_*`), or it was declared with one of the `tags`.
+    """
+
+    databases: Sequence[str] = ()
+    roles: Sequence[str] = ()
+    names: Sequence[str] = ()
+    tags: Sequence[str] = ()
@@ -0,0 +1,33 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class TablespaceMove:
+    """
+    Represents moving a database to another tablespace with :class:`dbdeclare.controller.Controller` `move_database`,
+    and what it costs. Every file of the database in its current tablespace is copied to the new one, and nobody can
+    be connected to the database while that happens.
+    """
+
+    database: str
+    source: str
+    target: str
+    # bytes to copy
+    size: int = 0
+    # sessions connected to the database, which have to end first
+    connections: int = 0
+    # relations of the database already placed in the target tablespace, which Postgres won't move the database over
+    conflicts: int = 0
+
+    @property
+    def needed(self) -> bool:
+        return self.source != self.target
+
+    def __str__(self) -> str:
+        if not self.needed:
+            return f"Database {self.database} is already in Tablespace {self.target}"
+        return (
+            f"move Database {self.database} from Tablespace {self.source} to {self.target}: "
+            f"{self.size / 2**20:.1f} MiB to copy, {self.connections} connections to close"
+            + (f", {self.conflicts} relations already in {self.target} to move back first" if self.conflicts else "")
+        )
@@ -0,0 +1,108 @@
+from threading import Event, Thread
+from typing import Any
+
+from sqlalchemy import Engine, TextClause, text
+
+from dbdeclare.data_structures.lock_wait import LockWait
+
+# every connection dbdeclare opens identifies itself with this, so its backends can be found in pg_stat_activity
+APPLICATION_NAME = "dbdeclare"
+
+
+class LockSampler:
+    """
+    Samples `pg_stat_activity` and `pg_locks` in the background while :class:`dbdeclare.controller.Controller`
+    operations run, and records every dbdeclare statement that waits on a lock along with the backend blocking it.
+    Use it as a context manager around the operations to watch. Backends are recognized by their `application_name`,
+    which is set on every engine dbdeclare creates. If you pass your own engine to the controller, create it with
+    `connect_args={"application_name": "dbdeclare"}` to have its statements sampled too.
+    """
+
+    def __init__(self, engine: Engine, interval: float = 0.1, application_name: str = APPLICATION_NAME):
+        """
+        :param engine: A :class:`sqlalchemy.Engine` that defines the connection to a Postgres instance/cluster.
+        :param interval: Seconds between samples. Waits shorter than this may be missed.
+        :param application_name: The `application_name` of the backends to watch.
+        """
+        self.engine = engine
+        self.interval = interval
+        self.application_name = application_name
+        self.error: str | None = None
+        self._waits: dict[tuple[int, str, int], LockWait] = {}
+        self._first_seen: dict[tuple[int, str, int], float] = {}
+        self._stop = Event()
+        self._thread: Thread | None = None
+
+    def __enter__(self) -> "LockSampler":
+        self._stop.clear()
+        self._thread = Thread(target=self._run, name="dbdeclare-lock-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    @property
+    def waits(self) -> list[LockWait]:
+        """
+        Getter for the lock waits recorded so far, one per waiting statement and blocking backend.
+        :return: A list of :class:`dbdeclare.data_structures.LockWait`, longest wait first.
+        """
+        return sorted(self._waits.values(), key=lambda wait: wait.seconds, reverse=True)
+
+    def _run(self) -> None:
+        """
+        Samples until stopped. Sampling is best effort, so a failure stops sampling and is kept in `error` instead
+        of interrupting the operations being watched.
+        """
+        try:
+            with self.engine.connect() as conn:
+                conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+                while True:
+                    # pg_stat_activity is a snapshot per transaction, so each sample runs in its own
+                    for row in conn.execute(self._sample_statement()).mappings():
+                        fields = dict(row)
+                        sampled_at = fields.pop("sampled_at")
+                        self._record(LockWait(seconds=0.0, **fields), sampled_at=sampled_at)
+                    if self._stop.wait(self.interval):
+                        break
+        except Exception as e:
+            self.error = f"{e.__class__.__name__}: {e}"
+
+    def _record(self, wait: LockWait, sampled_at: float) -> None:
+        """
+        Records one sampled wait, timing it from the first sample that saw the same statement wait on the same
+        blocker. Postgres doesn't expose when a backend started waiting on every version, and `query_start` would
+        count the time the statement ran before it had to wait, so the sampler keeps its own clock.
+        :param wait: A :class:`dbdeclare.data_structures.LockWait` as sampled.
+        :param sampled_at: The server's clock when the sample was taken, as seconds since the epoch.
+        """
+        key = (wait.pid, wait.query, wait.blocking_pid)
+        wait.seconds = sampled_at - self._first_seen.setdefault(key, sampled_at)
+        if key in self._waits:
+            self._waits[key].seconds = max(self._waits[key].seconds, wait.seconds)
+        else:
+            self._waits[key] = wait
+
+    def _sample_statement(self) -> TextClause:
+        """
+        The SQL statement that finds waiting dbdeclare backends, what they wait on, and who blocks them. Relations
+        can only be named in the database the sampler is connected to, elsewhere their oid is given.
+        :return: A single :class:`sqlalchemy.TextClause` containing the SQL to sample lock waits.
+        """
+        return text(
+            "SELECT extract(epoch FROM clock_timestamp())::float8 AS sampled_at, w.pid, w.query, "
+            "b.pid AS blocking_pid, b.query AS blocking_query, coalesce(l.locktype, w.wait_event) AS lock_type, "
+            "d.datname AS database, "
+            "CASE WHEN d.datname = current_database() THEN l.relation::regclass::text "
+            "ELSE l.relation::text END AS relation "
+            "FROM pg_catalog.pg_stat_activity w "
+            "CROSS JOIN LATERAL unnest(pg_catalog.pg_blocking_pids(w.pid)) AS blocker(pid) "
+            "JOIN pg_catalog.pg_stat_activity b ON b.pid = blocker.pid "
+            "LEFT JOIN pg_catalog.pg_locks l ON l.pid = w.pid AND NOT l.granted "
+            "LEFT JOIN pg_catalog.pg_database d ON d.oid = l.database "
+            "WHERE w.application_name = :application_name AND w.wait_event_type = 'Lock' "
+            "AND w.pid <> pg_catalog.pg_backend_pid()"
+        ).bindparams(application_name=self.application_name)
@@ -1,6 +1,28 @@
-__all__ = ["Database", "DatabaseContent", "Role", "Schema"]
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
 
-from dbdeclare.entities.database import Database
-from dbdeclare.entities.database_content import DatabaseContent
-from dbdeclare.entities.role import Role
-from dbdeclare.entities.schema import Schema
+__all__ = ["Database", "DatabaseContent", "DefaultPrivileges", "Role", "Schema", "Tablespace"]
+
+if TYPE_CHECKING:
+    from dbdeclare.entities.database import Database
+    from dbdeclare.entities.database_content import DatabaseContent
+    from dbdeclare.entities.default_privileges import DefaultPrivileges
+    from dbdeclare.entities.role import Role
+    from dbdeclare.entities.schema import Schema
+    from dbdeclare.entities.tablespace import Tablespace
+
+# entities are imported on first use, so that using some of them doesn't pay for importing all of them
+_modules = {
+    "Database": "dbdeclare.entities.database",
+    "DatabaseContent": "dbdeclare.entities.database_content",
+    "DefaultPrivileges": "dbdeclare.entities.default_privileges",
+    "Role": "dbdeclare.entities.role",
+    "Schema": "dbdeclare.entities.schema",
+    "Tablespace": "dbdeclare.entities.tablespace",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _modules:
+        return getattr(import_module(_modules[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
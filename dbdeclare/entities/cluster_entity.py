@@ -1,3 +1,5 @@
+from sqlalchemy import Engine
+
 from dbdeclare.entities.entity import Entity
 from dbdeclare.mixins.sql import SQLCreatable
 
@@ -8,12 +10,15 @@ class ClusterEntity(SQLCreatable, Entity):
     the abstract methods needed since they are consistent across entities.
     """
 
+    def _sql_engine(self) -> Engine:
+        return self.__class__.engine()
+
     def _create(self) -> None:
-        self._commit_sql(engine=self.__class__.engine(), statements=self._create_statements())
+        self._commit_sql(engine=self._sql_engine(), statements=self._create_statements())
 
     def _exists(self) -> bool:
-        rows = self._fetch_sql(engine=self.__class__.engine(), statement=self._exists_statement())
+        rows = self._fetch_sql(engine=self._sql_engine(), statement=self._exists_statement())
         return rows[0][0]  # type: ignore
 
     def _drop(self) -> None:
-        self._commit_sql(engine=self.__class__.engine(), statements=self._drop_statements())
+        self._commit_sql(engine=self._sql_engine(), statements=self._drop_statements())
@@ -1,20 +1,27 @@
-from typing import Sequence
+from typing import Any, Mapping, Sequence
 
-from sqlalchemy import Engine, TextClause, create_engine, text
+from sqlalchemy import URL, Engine, TextClause, create_engine, text
 
 from dbdeclare.data_structures.grant_to import GrantTo
 from dbdeclare.data_structures.privileges import Privilege
+from dbdeclare.data_structures.tablespace_move import TablespaceMove
+from dbdeclare.diagnostics import APPLICATION_NAME
 from dbdeclare.entities.cluster_entity import ClusterEntity
 from dbdeclare.entities.entity import Entity
 from dbdeclare.entities.role import Role
+from dbdeclare.entities.tablespace import Tablespace
+from dbdeclare.mixins.configurable import Configurable, Setting, SettingStore
 from dbdeclare.mixins.grantable import Grantable
 
 
-class Database(ClusterEntity, Grantable):
+class Database(ClusterEntity, Grantable, Configurable):
     """
     Represents a Postgres `Database <https://www.postgresql.org/docs/current/managing-databases.html>`_.
     """
 
+    # CREATE DATABASE can't run inside a transaction, so it can't run in a pipeline or a DO block either
+    _create_in_transaction = False
+
     def __init__(
         self,
         name: str,
@@ -30,12 +37,13 @@ class Database(ClusterEntity, Grantable):
         # icu_locale: str | None = None,
         # locale_provider: str | None = None,
         # collation_version: str | None = None,
-        # tablespace: str | None = None,
+        tablespace: Tablespace | None = None,
         allow_connections: bool | None = None,
         connection_limit: int | None = None,
         is_template: bool | None = None,
         # oid: str | None = None,
         grants: Sequence[GrantTo] | None = None,
+        settings: Mapping[str, Setting] | None = None,
     ):
         """
         All __init__ params correspond to CREATE DATABASE arguments and options, see
@@ -47,10 +55,12 @@ class Database(ClusterEntity, Grantable):
         :param check_if_exists: Flag to set existence check behavior. If `True`, will raise an exception during _safe_create if the entity already exists, and will raise an exception during _safe_drop if the entity does not exist.
         :param owner: The :class:`dbdeclare.entitites.Role` who will own this database. Postgres defaults to the user executing the command.
         :param template: The name of the template from which to create the new database. Postgres defaults to template1.
+        :param tablespace: The :class:`dbdeclare.entities.Tablespace` to place this database in. Postgres defaults to the tablespace of the template, pg_default. Use :class:`dbdeclare.controller.Controller` `move_database` to move an existing database.
         :param allow_connections: Flag to allow connections to this database. Postgres defaults to `True`.
         :param connection_limit: Number of concurrent connections that can be made to this database. Postgres defaults to -1, which means no limit.
         :param is_template: Flag to allow this database to be cloned by any user with CREATEDB privileges; if `False` (the default), then only superusers or the owner of the database can clone it.
         :param grants: Sequence of :class:`dbdeclare.data_structures.GrantTo` to specify privileges this database has in relation to specified roles.
+        :param settings: Runtime settings every session in this database starts with, like `{"statement_timeout": "30s"}`, set with `ALTER DATABASE ... SET`. Settings of the database that aren't declared here are reset, unless this is left out. See :class:`dbdeclare.entities.Role` for settings of a role in a database.
         """
         self.owner = owner
         self.template = template
@@ -62,17 +72,28 @@ class Database(ClusterEntity, Grantable):
         # self.icu_locale = icu_locale
         # self.locale_provider = locale_provider
         # self.collation_version = collation_version
-        # self.tablespace = tablespace
+        self.tablespace = tablespace
         self.allow_connections = allow_connections
         self.connection_limit = connection_limit
         self.is_template = is_template
+        self.settings = self._check_settings(settings)
         # self.oid = oid
 
-        self._db_engine: Engine | None = None
+        # one engine per cluster, so the same declaration can be applied to several clusters at once
+        self._db_engines: dict[URL, Engine] = {}
+        # the owner and ACL of every declared table in this database, shared by its contents, see DatabaseContent
+        self._table_acls: dict[tuple[str, str], tuple[str, dict[str, set[Privilege]]]] | None = None
 
         Grantable.__init__(self, name=name, grants=grants)
         ClusterEntity.__init__(self, name=name, depends_on=depends_on, check_if_exists=check_if_exists)
 
+    def __getstate__(self) -> dict[str, Any]:
+        # engines can't be pickled, and are recreated on demand anyway
+        state = self.__dict__.copy()
+        state["_db_engines"] = {}
+        state["_table_acls"] = None
+        return state
+
     def _create_statements(self) -> Sequence[TextClause]:
         statement = f"CREATE DATABASE {self.name}"
 
@@ -84,13 +105,93 @@ class Database(ClusterEntity, Grantable):
             match k, v:
                 case "owner", v:
                     statement = f"{statement} OWNER={v.name}"
-                case "grants", _:
+                case "tablespace", v:
+                    statement = f"{statement} TABLESPACE={v.name}"
+                case "grants" | "settings", _:
                     pass
                 case k, v:
                     statement = f"{statement} {k.upper()}={v}"
 
         return [text(statement)]
 
+    def _tablespace_move(self, tablespace: Tablespace) -> TablespaceMove:
+        """
+        Works out what moving this database to another tablespace would cost, without moving it.
+        :param tablespace: The :class:`dbdeclare.entities.Tablespace` to move to.
+        :return: A :class:`dbdeclare.data_structures.TablespaceMove`.
+        """
+        # connections this process holds don't count, they're closed before moving
+        self._dispose_engines()
+        [(source, connections)] = self._fetch_sql(
+            engine=self.engine(),
+            statement=text(
+                "SELECT t.spcname, (SELECT count(*) FROM pg_stat_activity a "
+                "WHERE a.datname = d.datname AND a.pid <> pg_backend_pid()) "
+                "FROM pg_database d JOIN pg_tablespace t ON t.oid = d.dattablespace WHERE d.datname=:db"
+            ).bindparams(db=self.name),
+        )
+        if source == tablespace.name:
+            return TablespaceMove(database=self.name, source=source, target=tablespace.name)
+        # only what's in the default tablespace of the database moves, relations placed elsewhere stay put
+        [(size, conflicts)] = self._fetch_sql(
+            engine=self.db_engine(),
+            statement=text(
+                "SELECT coalesce(sum(pg_relation_size(oid, 'main') + pg_relation_size(oid, 'fsm') "
+                "+ pg_relation_size(oid, 'vm') + pg_relation_size(oid, 'init')) FILTER (WHERE reltablespace = 0), 0), "
+                "count(*) FILTER (WHERE reltablespace = (SELECT oid FROM pg_tablespace WHERE spcname=:tablespace)) "
+                "FROM pg_class"
+            ).bindparams(tablespace=tablespace.name),
+        )
+        self._dispose_engines()
+        return TablespaceMove(
+            database=self.name,
+            source=source,
+            target=tablespace.name,
+            size=int(size),
+            connections=connections,
+            conflicts=conflicts,
+        )
+
+    def _move_statements(self, tablespace: Tablespace, terminate: bool = False) -> Sequence[TextClause]:
+        """
+        The SQL statements that move this database to another tablespace.
+        :param tablespace: The :class:`dbdeclare.entities.Tablespace` to move to.
+        :param terminate: Whether to end every other session connected to the database first.
+        :return: A Sequence of :class:`sqlalchemy.TextClause`.
+        """
+        statements = []
+        if terminate:
+            statements.append(
+                text(
+                    "SELECT pg_terminate_backend(pid) FROM pg_stat_activity WHERE datname=:db AND pid <> pg_backend_pid()"
+                ).bindparams(db=self.name)
+            )
+        statements.append(text(f"ALTER DATABASE {self.name} SET TABLESPACE {tablespace.name}"))
+        return statements
+
+    def _dispose_engines(self) -> None:
+        """
+        Closes every connection this database's engines hold, for operations that need nobody to be connected.
+        """
+        for db_engine in self._db_engines.values():
+            db_engine.dispose()
+
+    def _close_engine(self, cluster_url: URL) -> None:
+        """
+        Closes this database's engine on a cluster and forgets it, once nothing more will run there, so its pool
+        doesn't stay open for the life of the process.
+        :param cluster_url: The URL of the cluster engine the engine was created for.
+        """
+        db_engine = self._db_engines.pop(cluster_url, None)
+        if db_engine is not None:
+            db_engine.dispose()
+
+    def _declared_settings(self) -> SettingStore:
+        return {("", self.name): self.settings} if self.settings is not None else {}
+
+    def _settings_target(self, database: str) -> str:
+        return f"DATABASE {self.name}"
+
     def _exists_statement(self) -> TextClause:
         return text("SELECT EXISTS(SELECT 1 FROM pg_database WHERE datname=:db)").bindparams(db=self.name)
 
@@ -102,35 +203,48 @@ class Database(ClusterEntity, Grantable):
         statements.append(text(f"DROP DATABASE {self.name} (FORCE)"))
         return statements
 
+    def _drop_if_exists_statements(self) -> Sequence[TextClause] | None:
+        if self.is_template:
+            # a template has to be altered before it's dropped, which fails if it doesn't exist
+            return None
+        return [text(f"DROP DATABASE IF EXISTS {self.name} (FORCE)")]
+
     def _grant(self, grantee: Role, privileges: set[Privilege]) -> None:
         self._commit_sql(
             engine=self.engine(), statements=self._grant_statements(grantee=grantee, privileges=privileges)
         )
+        self._clear_acl_cache()
 
     def _grants_exist(self, grantee: Role, privileges: set[Privilege]) -> bool:
-        rows = self._fetch_sql(engine=self.engine(), statement=self._grants_exist_statement())
-        # filter to grantee and extract privileges
-        try:
-            existing_privileges = list(
-                filter(None, [self._extract_privileges(acl=r[0], grantee=grantee) for r in rows])
-            )[0]
-            return privileges.issubset(existing_privileges)
-        except IndexError:
-            return False
-
-    def _grants_exist_statement(self) -> TextClause:
-        """
-        The SQL statement that checks to see what grants exist.
-        :return: A single :class:`sqlalchemy.TextClause` containing the SQL to check what grants exist on this entity.
-        """
-        return text("SELECT unnest(datacl) AS acl FROM pg_catalog.pg_database WHERE datname=:db_name").bindparams(
-            db_name=self.name
-        )
+        existing_privileges = self._acl(include_owner=True).get(grantee.name, set())
+        return self._check_privileges(declared_privileges=privileges, existing_privileges=existing_privileges)
 
     def _revoke(self, grantee: Role, privileges: set[Privilege]) -> None:
         self._commit_sql(
             engine=self.engine(), statements=self._revoke_statements(grantee=grantee, privileges=privileges)
         )
+        self._clear_acl_cache()
+
+    def _fetch_acl(self) -> tuple[str, dict[str, set[Privilege]]]:
+        rows = self._fetch_sql(engine=self.engine(), statement=self._acl_statement())
+        return rows[0][0] if rows else "", self._acl_from_rows(acls=[r[1] for r in rows])
+
+    def _acl_statement(self) -> TextClause:
+        """
+        The SQL statement that reads the owner and every privilege granted on this database, defaults included.
+        :return: A single :class:`sqlalchemy.TextClause` containing the SQL to read the ACL of this entity.
+        """
+        return text(
+            "SELECT pg_get_userbyid(datdba) AS owner, unnest(coalesce(datacl, acldefault('d', datdba)))::text AS acl "
+            "FROM pg_catalog.pg_database WHERE datname=:db_name"
+        ).bindparams(db_name=self.name)
+
+    def _grantables(self) -> list[Grantable]:
+        return [self]
+
+    def _clear_cache(self) -> None:
+        self._clear_acl_cache()
+        self._table_acls = None
 
     @staticmethod
     def _allowed_privileges() -> set[Privilege]:
@@ -138,17 +252,22 @@ class Database(ClusterEntity, Grantable):
 
     def db_engine(self) -> Engine:
         """
-        Getter for this database's engine. Will create it if it is not yet set.
+        Getter for this database's engine on the cluster bound in the running context. Will create it if it is not
+        yet set.
         :return: A `sqlalchemy.Engine` to connect to this database.
         """
         # database entities will reference this as the engine to use
-        if not self._db_engine:
+        cluster_url = self.__class__.engine().url
+        if cluster_url not in self._db_engines:
             # grab everything but db name from the cluster engine
-            host = self.__class__.engine().url.host
-            port = self.__class__.engine().url.port
-            user = self.__class__.engine().url.username
-            pw = self.__class__.engine().url.password
+            host = cluster_url.host
+            port = cluster_url.port
+            user = cluster_url.username
+            pw = cluster_url.password
 
             # then create a new engine
-            self._db_engine = create_engine(f"postgresql+psycopg://{user}:{pw}@{host}:{port}/{self.name}")
-        return self._db_engine
+            self._db_engines[cluster_url] = create_engine(
+                f"postgresql+psycopg://{user}:{pw}@{host}:{port}/{self.name}",
+                connect_args={"application_name": APPLICATION_NAME},
+            )
+        return self._db_engines[cluster_url]
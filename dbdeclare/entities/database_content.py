@@ -1,9 +1,9 @@
 from __future__ import annotations
 
-from typing import Sequence, Type
+from typing import TYPE_CHECKING, Collection, Iterator, Mapping, Sequence, Type
 
-from sqlalchemy import Inspector, TextClause, inspect, text
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy import Engine, Inspector, TextClause, inspect, text
+from sqlalchemy import Table as MetadataTable
 
 from dbdeclare.data_structures.grant_to import GrantTo
 from dbdeclare.data_structures.privileges import Privilege
@@ -12,9 +12,14 @@ from dbdeclare.entities.database_entity import DatabaseEntity
 from dbdeclare.entities.entity import Entity
 from dbdeclare.entities.role import Role
 from dbdeclare.entities.schema import Schema
+from dbdeclare.entities.tablespace import Tablespace
 from dbdeclare.mixins.grantable import Grantable
 from dbdeclare.mixins.sql import SQLBase
 
+if TYPE_CHECKING:
+    # only needed for annotations, declarations that use DatabaseContent import sqlalchemy.orm themselves
+    from sqlalchemy.orm import DeclarativeBase
+
 
 class DatabaseContent(DatabaseEntity):
     """
@@ -29,6 +34,8 @@ class DatabaseContent(DatabaseEntity):
         schemas: Sequence[Schema] | None = None,
         depends_on: Sequence[Entity] | None = None,
         check_if_exists: bool | None = None,
+        collapse_grants: bool = False,
+        tablespace: Tablespace | None = None,
     ):
         """
         :param name: Unique name of the entity. Must be unique within a database.
@@ -37,31 +44,201 @@ class DatabaseContent(DatabaseEntity):
         :param database: The :class:`dbdeclare.entities.Database` that this entity belongs to.
         :param depends_on: Any entities that should be created before this one.
         :param check_if_exists: Flag to set existence check behavior. If `True`, will raise an exception during _safe_create if the entity already exists, and will raise an exception during _safe_drop if the entity does not exist.
+        :param collapse_grants: Flag to collapse identical grants on every table of a schema into a single `ALL TABLES IN SCHEMA` grant. Defaults to `False`, since such a grant (or revoke) also applies to tables in the schema that this content does not declare.
+        :param tablespace: The :class:`dbdeclare.entities.Tablespace` to create tables and their indexes in, unless a table names its own with `postgresql_tablespace`. Defaults to the tablespace of the database.
         """
         super().__init__(name=name, depends_on=depends_on, database=database, check_if_exists=check_if_exists)
         self.base = sqlalchemy_base
         # schemas doesn't do anything since __table_args__ in sqlalchemy defines the schema
         # BUT it helps to have it as a dependency here to remind the user to make schemas they intend to use
         self.schemas = schemas
-        self.tables: dict[str, Table] = {
-            table.name: Table(name=table.name, database_content=self, schema=table.schema)
-            for table in self.base.metadata.tables.values()
-        }
+        self.collapse_grants = collapse_grants
+        self.tablespace = tablespace
+        self._schema_tables: dict[str, SchemaTables] = {}
+        self.tables = LazyTables(database_content=self)
 
     def _create(self) -> None:
-        self.base.metadata.create_all(self.database.db_engine())
+        if self.tablespace is None:
+            self.base.metadata.create_all(self.database.db_engine())
+        else:
+            with self.database.db_engine().begin() as conn:
+                # only applies to what doesn't name a tablespace of its own
+                conn.execute(text(f"SET LOCAL default_tablespace = {self.tablespace.name}"))
+                self.base.metadata.create_all(conn)
+        self._clear_cache()
 
     def _exists(self) -> bool:
-        inspector: Inspector = inspect(self.database.db_engine())
-        return all(
-            [
-                inspector.has_table(table_name=table.name, schema=table.schema)
-                for table in self.base.metadata.tables.values()
-            ]
+        tables = self._metadata_tables()
+        rows = SQLBase._fetch_sql(engine=self.database.db_engine(), statement=self._exists_statement(tables=tables))
+        return rows[0][0] == len(tables)  # type: ignore
+
+    @staticmethod
+    def _exists_statement(tables: set[tuple[str, str]]) -> TextClause:
+        """
+        The SQL statement that counts how many of the provided tables exist.
+        :param tables: A set of (schema, table) names to look for.
+        :return: A single :class:`sqlalchemy.TextClause` containing the SQL to count existing tables.
+        """
+        return text(
+            "SELECT count(*) "
+            "FROM unnest(CAST(:schema_names AS text[]), CAST(:table_names AS text[])) AS t(nspname, relname) "
+            "JOIN pg_catalog.pg_namespace n ON n.nspname = t.nspname "
+            "JOIN pg_catalog.pg_class c ON c.relnamespace = n.oid AND c.relname = t.relname "
+            "WHERE c.relkind IN ('r', 'p', 'f', 'v', 'm')"
+        ).bindparams(
+            schema_names=[schema for schema, _ in tables], table_names=[table_name for _, table_name in tables]
         )
 
     def _drop(self) -> None:
         self.base.metadata.drop_all(self.database.db_engine())
+        self._clear_cache()
+
+    def _clear_cache(self) -> None:
+        # the cache is shared by every content of the database
+        self.database._table_acls = None
+
+    def _table_privileges(self, schema: str | None, table_name: str, grantee: Role) -> set[Privilege]:
+        """
+        Look up the privileges a grantee has on one of this content's tables. The ACLs of every table are read and
+        parsed in a single query the first time this is called, then reused until the cache is cleared.
+        :param schema: The string name of the schema the table belongs to. Defaults to public if None.
+        :param table_name: The string name of the table.
+        :param grantee: The :class:`dbdeclare.entities.Role` to look up privileges for.
+        :return: A set of :class:`dbdeclare.data_structures.Privilege` that exist in cluster, granted to the grantee.
+        """
+        return self._table_acl(schema=schema, table_name=table_name)[1].get(grantee.name, set())
+
+    def _table_acl(self, schema: str | None, table_name: str) -> tuple[str, dict[str, set[Privilege]]]:
+        """
+        Look up the owner and the privileges of every grantee on one of this content's tables. The ACLs of every table
+        declared in the database, by this content or any other, are read and parsed in a single query the first time
+        this is called, then reused until the cache is cleared.
+        :param schema: The string name of the schema the table belongs to. Defaults to public if None.
+        :param table_name: The string name of the table.
+        :return: A tuple of the owner's name and a dict of grantee names (PUBLIC for everyone) and their privileges.
+        """
+        if self.database._table_acls is None:
+            self.database._table_acls = self._fetch_table_acls()
+        return self.database._table_acls.get((schema or "public", table_name), ("", {}))
+
+    def _fetch_table_acls(self) -> dict[tuple[str, str], tuple[str, dict[str, set[Privilege]]]]:
+        """
+        Reads the owner and ACL of every table of every content declared in this content's database from pg_class,
+        and parses them.
+        :return: A dict mapping (schema, table) to the owner's name and a dict of grantee names and their privileges.
+        """
+        tables = self._metadata_tables()
+        for entity in self._registry.entities:
+            if isinstance(entity, DatabaseContent) and entity.database is self.database:
+                tables |= entity._metadata_tables()
+        rows = SQLBase._fetch_sql(engine=self.database.db_engine(), statement=self._table_acls_statement(tables=tables))
+        acls: dict[tuple[str, str], tuple[str, dict[str, set[Privilege]]]] = {}
+        for schema, table_name, owner, acl in rows:
+            grantees = acls.setdefault((schema, table_name), (owner, {}))[1]
+            parsed = Grantable._parse_acl(acl)
+            if parsed:
+                grantee_name, privileges = parsed
+                grantees.setdefault(grantee_name or "PUBLIC", set()).update(privileges)
+        return acls
+
+    @staticmethod
+    def _table_acls_statement(tables: set[tuple[str, str]]) -> TextClause:
+        """
+        The SQL statement that reads the ACLs of the provided tables. Tables that have never had privileges granted
+        have a null ACL, which means the defaults apply, so those are filled in.
+        :param tables: A set of (schema, table) names to read the ACL for.
+        :return: A single :class:`sqlalchemy.TextClause` containing the SQL to read the ACLs.
+        """
+        return text(
+            "SELECT n.nspname, c.relname, pg_get_userbyid(c.relowner) AS owner, "
+            "unnest(coalesce(c.relacl, acldefault('r', c.relowner)))::text AS acl "
+            "FROM unnest(CAST(:schema_names AS text[]), CAST(:table_names AS text[])) AS t(nspname, relname) "
+            "JOIN pg_catalog.pg_namespace n ON n.nspname = t.nspname "
+            "JOIN pg_catalog.pg_class c ON c.relnamespace = n.oid AND c.relname = t.relname"
+        ).bindparams(
+            schema_names=[schema for schema, _ in tables], table_names=[table_name for _, table_name in tables]
+        )
+
+    def _metadata_tables(self) -> set[tuple[str, str]]:
+        """
+        Helper to list every table of this content straight from the metadata, without creating any wrappers.
+        :return: A set of (schema, table) names.
+        """
+        return {(table.schema or "public", table.name) for table in self.base.metadata.tables.values()}
+
+    def _grantables(self) -> list[Grantable]:
+        # tables with declared grants already have wrappers, and of the rest only those with privileges granted in
+        # the cluster, besides the owner's, have anything to sync, so the others never get one
+        grantables: list[Grantable] = list(self.tables._wrapped())
+        wrapped = {grantable.name for grantable in grantables}
+        for table in self.base.metadata.tables.values():
+            if table.name not in wrapped:
+                owner, grantees = self._table_acl(schema=table.schema, table_name=table.name)
+                if grantees.keys() - {owner}:
+                    grantables.append(self.tables[table.name])
+        return grantables
+
+    def _schema_group(self, schema: str | None) -> SchemaTables:
+        """
+        Getter for the grant group of all tables in a schema. Will create it if it is not yet set.
+        :param schema: The string name of the schema. Defaults to public if None.
+        :return: The :class:`dbdeclare.entities.database_content.SchemaTables` for the schema.
+        """
+        schema = schema or "public"
+        if schema not in self._schema_tables:
+            self._schema_tables[schema] = SchemaTables(schema=schema, database_content=self)
+        return self._schema_tables[schema]
+
+
+class LazyTables(Mapping[str, "Table"]):
+    """
+    A read-only mapping of table names to :class:`dbdeclare.entities.database_content.Table` for a
+    :class:`dbdeclare.entities.DatabaseContent`. Wrappers are only created the first time a table is looked up, so
+    large models only pay for the tables that actually get grants.
+    """
+
+    def __init__(self, database_content: DatabaseContent):
+        """
+        :param database_content: The `dbdeclare.entities.DatabaseContent` whose tables to wrap.
+        """
+        self.database_content = database_content
+        self._wrappers: dict[str, Table] = {}
+        self._index: dict[str, MetadataTable] = {}
+        self._indexed_count = -1
+
+    def __getitem__(self, name: str) -> Table:
+        if name not in self._wrappers:
+            table = self._metadata_index()[name]
+            self._wrappers[name] = Table(name=table.name, database_content=self.database_content, schema=table.schema)
+        return self._wrappers[name]
+
+    def _wrapped(self) -> list[Table]:
+        """
+        Getter for the wrappers created so far, without creating any more.
+        :return: A list of :class:`dbdeclare.entities.database_content.Table`.
+        """
+        return list(self._wrappers.values())
+
+    def __contains__(self, name: object) -> bool:
+        # checked against the metadata so that membership tests don't create wrappers
+        return name in self._metadata_index()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._metadata_index())
+
+    def __len__(self) -> int:
+        return len(self._metadata_index())
+
+    def _metadata_index(self) -> dict[str, MetadataTable]:
+        """
+        Getter for the metadata tables by name. Rebuilt if tables were added to the metadata since it was last built.
+        :return: A dict mapping table names to `sqlalchemy.Table`.
+        """
+        metadata_tables = self.database_content.base.metadata.tables
+        if self._indexed_count != len(metadata_tables):
+            self._index = {table.name: table for table in metadata_tables.values()}
+            self._indexed_count = len(metadata_tables)
+        return self._index
 
 
 class Table(SQLBase, Grantable):
@@ -100,38 +277,49 @@ class Table(SQLBase, Grantable):
         super().grant(grants=grants)
         self._fix_entity_order(grants=grants, target_entity=self.database_content)
 
+    def _grant_group(self) -> Grantable | None:
+        if self.database_content.collapse_grants:
+            return self.database_content._schema_group(self.schema)
+        return None
+
+    def _sql_engine(self) -> Engine:
+        return self.database_content.database.db_engine()
+
     def _exists(self) -> bool:
         # TODO not sure how expensive creating an inspector is, might not want to do it for every run of this fn
-        inspector: Inspector = inspect(self.database_content.database.db_engine())
+        inspector: Inspector = inspect(self._sql_engine())
         return inspector.has_table(table_name=self.name, schema=self.schema)
 
     def _grant(self, grantee: Role, privileges: set[Privilege]) -> None:
         self._commit_sql(
-            engine=self.database_content.database.db_engine(),
+            engine=self._sql_engine(),
             statements=self._grant_statements(grantee=grantee, privileges=privileges),
         )
+        self.database_content._clear_cache()
+
+    def _acl_statement(self) -> TextClause:
+        return self.database_content._table_acls_statement(tables={(self.schema or "public", self.name)})
 
     def _grants_exist(self, grantee: Role, privileges: set[Privilege]) -> bool:
-        rows = self._fetch_sql(
-            engine=self.database_content.database.db_engine(), statement=self._grants_exist_statement(grantee=grantee)
+        existing_privileges = self.database_content._table_privileges(
+            schema=self.schema, table_name=self.name, grantee=grantee
         )
-        existing_privileges = {r[0] for r in rows}
         return self._check_privileges(declared_privileges=privileges, existing_privileges=existing_privileges)
 
-    def _grants_exist_statement(self, grantee: Role) -> TextClause:
-        """
-        The SQL statement that checks to see what grants exist.
-        :return: A single :class:`sqlalchemy.TextClause` containing the SQL to check what grants exist on this entity.
-        """
-        return text(
-            "SELECT privilege_type FROM information_schema.table_privileges WHERE table_name=:table_name  AND grantee=:grantee_name"
-        ).bindparams(table_name=self.name, grantee_name=grantee.name)
-
     def _revoke(self, grantee: Role, privileges: set[Privilege]) -> None:
         self._commit_sql(
-            engine=self.database_content.database.db_engine(),
+            engine=self._sql_engine(),
             statements=self._revoke_statements(grantee=grantee, privileges=privileges),
         )
+        self.database_content._clear_cache()
+
+    def _acl(self, include_owner: bool = False) -> dict[str, set[Privilege]]:
+        # the content caches the ACLs of all its tables at once, so there's nothing to cache here
+        owner, grantees = self._fetch_acl()
+        return {grantee: p for grantee, p in grantees.items() if include_owner or grantee != owner}
+
+    def _fetch_acl(self) -> tuple[str, dict[str, set[Privilege]]]:
+        return self.database_content._table_acl(schema=self.schema, table_name=self.name)
 
     @staticmethod
     def _allowed_privileges() -> set[Privilege]:
@@ -145,3 +333,137 @@ class Table(SQLBase, Grantable):
             Privilege.TRIGGER,
             Privilege.ALL_PRIVILEGES,
         }
+
+
+class SchemaTables(SQLBase, Grantable):
+    """
+    An internal grant group for every table of a :class:`dbdeclare.entities.DatabaseContent` in one schema. Grants,
+    revokes, and checks on it are issued once for the whole schema instead of once per table.
+    """
+
+    def __init__(self, schema: str, database_content: DatabaseContent):
+        """
+        :param schema: The string name of the schema.
+        :param database_content: The `dbdeclare.entities.DatabaseContent` whose tables make up this group.
+        """
+        super().__init__(name=schema)
+        self.database_content = database_content
+
+    def __hash__(self) -> int:
+        return hash((self.name, self.__class__.__name__, self.database_content.name))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, self.__class__):
+            return NotImplemented
+        return (self.name, self.__class__.__name__, self.database_content.name) == (
+            other.name,
+            other.__class__.__name__,
+            other.database_content.name,
+        )
+
+    def _table_names(self) -> list[str]:
+        """
+        Helper to list the names of every table in this schema, straight from the metadata.
+        :return: A list of table names.
+        """
+        return [
+            table.name
+            for table in self.database_content.base.metadata.tables.values()
+            if (table.schema or "public") == self.name
+        ]
+
+    def _covered_by(self, targets: Collection[Grantable]) -> bool:
+        return {target.name for target in targets} == set(self._table_names())
+
+    def _sql_engine(self) -> Engine:
+        return self.database_content.database.db_engine()
+
+    def _exists(self) -> bool:
+        table_names = self._table_names()
+        rows = self._fetch_sql(
+            engine=self._sql_engine(),
+            statement=self._exists_statement(table_names=table_names),
+        )
+        return rows[0][0] == len(table_names)  # type: ignore
+
+    def _exists_statement(self, table_names: list[str]) -> TextClause:
+        """
+        The SQL statement that counts how many of the tables in this group exist.
+        :param table_names: The names of the tables to look for.
+        :return: A single :class:`sqlalchemy.TextClause` containing the SQL to count existing tables.
+        """
+        return text(
+            "SELECT count(*) FROM pg_catalog.pg_class c "
+            "JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace "
+            "WHERE n.nspname=:schema_name AND c.relname = ANY(:table_names) AND c.relkind IN ('r', 'p', 'f', 'v', 'm')"
+        ).bindparams(schema_name=self.name, table_names=table_names)
+
+    def _grant(self, grantee: Role, privileges: set[Privilege]) -> None:
+        self._commit_sql(
+            engine=self._sql_engine(),
+            statements=self._grant_statements(grantee=grantee, privileges=privileges),
+        )
+        self.database_content._clear_cache()
+
+    def _grant_statements(self, grantee: Role, privileges: set[Privilege]) -> Sequence[TextClause]:
+        return [
+            text(f"GRANT {self._format_privileges(privileges)} ON ALL TABLES IN SCHEMA {self.name} TO {grantee.name}")
+        ]
+
+    def _acl_statement(self) -> TextClause:
+        return self.database_content._table_acls_statement(
+            tables={(self.name, table_name) for table_name in self._table_names()}
+        )
+
+    def _grants_exist(self, grantee: Role, privileges: set[Privilege]) -> bool:
+        return all(
+            self._check_privileges(
+                declared_privileges=privileges,
+                existing_privileges=self.database_content._table_privileges(
+                    schema=self.name, table_name=table_name, grantee=grantee
+                ),
+            )
+            for table_name in self._table_names()
+        )
+
+    def _revoke(self, grantee: Role, privileges: set[Privilege]) -> None:
+        self._commit_sql(
+            engine=self._sql_engine(),
+            statements=self._revoke_statements(grantee=grantee, privileges=privileges),
+        )
+        self.database_content._clear_cache()
+
+    def _revoke_statements(self, grantee: Role, privileges: set[Privilege]) -> Sequence[TextClause]:
+        return [
+            text(
+                f"REVOKE {self._format_privileges(privileges)} ON ALL TABLES IN SCHEMA {self.name} FROM {grantee.name}"
+            )
+        ]
+
+    def _acl(self, include_owner: bool = False) -> dict[str, set[Privilege]]:
+        # the content caches the ACLs of all its tables at once, so there's nothing to cache here
+        owner, grantees = self._fetch_acl()
+        return {grantee: p for grantee, p in grantees.items() if include_owner or grantee != owner}
+
+    def _fetch_acl(self) -> tuple[str, dict[str, set[Privilege]]]:
+        """
+        The privileges each grantee has on every table of the group, which is what a grant on the group gives. The
+        owner is only named if it owns every table.
+        :return: A tuple of the owner's name and a dict mapping grantee names to the privileges they have.
+        """
+        acls = [
+            self.database_content._table_acl(schema=self.name, table_name=table_name)
+            for table_name in self._table_names()
+        ]
+        if not acls:
+            return "", {}
+        owners = {owner for owner, _ in acls}
+        grantees = set.intersection(*(set(privileges) for _, privileges in acls))
+        return (
+            owners.pop() if len(owners) == 1 else "",
+            {grantee: set.intersection(*(privileges[grantee] for _, privileges in acls)) for grantee in grantees},
+        )
+
+    @staticmethod
+    def _allowed_privileges() -> set[Privilege]:
+        return Table._allowed_privileges()
@@ -1,5 +1,7 @@
 from typing import Sequence
 
+from sqlalchemy import Engine
+
 from dbdeclare.entities.database import Database
 from dbdeclare.entities.entity import Entity
 from dbdeclare.mixins.sql import SQLCreatable
@@ -29,6 +31,9 @@ class DatabaseEntity(Entity):
     def __hash__(self) -> int:
         return hash((self.name, self.__class__.__name__, self.database.name))
 
+    def _identity(self) -> str:
+        return f"{self.__class__.__name__} {self.database.name}.{self.name}"
+
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, self.__class__):
             return NotImplemented
@@ -45,12 +50,15 @@ class DatabaseSqlEntity(SQLCreatable, DatabaseEntity):
     consistent across entities.
     """
 
+    def _sql_engine(self) -> Engine:
+        return self.database.db_engine()
+
     def _create(self) -> None:
-        self._commit_sql(engine=self.database.db_engine(), statements=self._create_statements())
+        self._commit_sql(engine=self._sql_engine(), statements=self._create_statements())
 
     def _exists(self) -> bool:
-        rows = self._fetch_sql(engine=self.database.db_engine(), statement=self._exists_statement())
+        rows = self._fetch_sql(engine=self._sql_engine(), statement=self._exists_statement())
         return rows[0][0]  # type: ignore
 
     def _drop(self) -> None:
-        self._commit_sql(engine=self.database.db_engine(), statements=self._drop_statements())
+        self._commit_sql(engine=self._sql_engine(), statements=self._drop_statements())
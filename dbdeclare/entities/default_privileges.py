@@ -0,0 +1,261 @@
+from typing import Sequence
+
+from sqlalchemy import Engine, TextClause, text
+
+from dbdeclare.data_structures.default_object import DefaultObject
+from dbdeclare.data_structures.grant_to import GrantTo
+from dbdeclare.data_structures.privileges import Privilege
+from dbdeclare.entities.database import Database
+from dbdeclare.entities.database_entity import DatabaseEntity
+from dbdeclare.entities.entity import Entity
+from dbdeclare.entities.role import Role
+from dbdeclare.entities.schema import Schema
+from dbdeclare.exceptions import EntityExistsError, InvalidPrivilegeError
+from dbdeclare.mixins.grantable import Grantable
+from dbdeclare.mixins.sql import SQLBase
+
+
+class DefaultPrivileges(DatabaseEntity, SQLBase, Grantable):
+    """
+    Represents Postgres `default privileges <https://www.postgresql.org/docs/current/sql-alterdefaultprivileges.html>`_,
+    the privileges applied to objects created in the future by a given role.
+    """
+
+    # maps each object type to its code in pg_default_acl and the privileges that can be granted on it
+    _object_codes: dict[DefaultObject, str] = {
+        DefaultObject.TABLES: "r",
+        DefaultObject.SEQUENCES: "S",
+        DefaultObject.FUNCTIONS: "f",
+        DefaultObject.TYPES: "T",
+        DefaultObject.SCHEMAS: "n",
+    }
+    _object_privileges: dict[DefaultObject, set[Privilege]] = {
+        DefaultObject.TABLES: {
+            Privilege.SELECT,
+            Privilege.INSERT,
+            Privilege.UPDATE,
+            Privilege.DELETE,
+            Privilege.TRUNCATE,
+            Privilege.REFERENCES,
+            Privilege.TRIGGER,
+            Privilege.ALL_PRIVILEGES,
+        },
+        DefaultObject.SEQUENCES: {Privilege.USAGE, Privilege.SELECT, Privilege.UPDATE, Privilege.ALL_PRIVILEGES},
+        DefaultObject.FUNCTIONS: {Privilege.EXECUTE, Privilege.ALL_PRIVILEGES},
+        DefaultObject.TYPES: {Privilege.USAGE, Privilege.ALL_PRIVILEGES},
+        DefaultObject.SCHEMAS: {Privilege.USAGE, Privilege.CREATE, Privilege.ALL_PRIVILEGES},
+    }
+
+    def __init__(
+        self,
+        name: str,
+        database: Database,
+        owner: Role,
+        object_type: DefaultObject,
+        schema: Schema | None = None,
+        depends_on: Sequence[Entity] | None = None,
+        check_if_exists: bool | None = None,
+        grants: Sequence[GrantTo] | None = None,
+    ):
+        """
+        All __init__ params correspond to ALTER DEFAULT PRIVILEGES arguments and options, see
+        `official Postgres documentation <https://www.postgresql.org/docs/current/sql-alterdefaultprivileges.html>`_.
+        There is nothing to create or drop: default privileges come into being when granted and go away when revoked.
+
+
+        :param name: Unique name of the entity. Must be unique within a database.
+        :param database: The :class:`dbdeclare.entities.Database` that these default privileges apply in.
+        :param owner: The :class:`dbdeclare.entities.Role` whose future objects receive these privileges.
+        :param object_type: The kind of object, as a :class:`dbdeclare.data_structures.DefaultObject`, these privileges apply to.
+        :param schema: The :class:`dbdeclare.entities.Schema` these privileges are limited to. Applies to all schemas if None. Must be None for schemas.
+        :param depends_on: Any entities that should be created before this one.
+        :param check_if_exists: Flag to set existence check behavior. If `True`, will raise an exception during _safe_create if default privileges are already set, and will raise an exception during _safe_drop if they are not.
+        :param grants: Sequence of :class:`dbdeclare.data_structures.GrantTo` to specify privileges future objects have in relation to specified roles.
+        """
+        if schema and object_type == DefaultObject.SCHEMAS:
+            raise InvalidPrivilegeError("Default privileges on schemas cannot be limited to a schema.")
+        self.owner = owner
+        self.object_type = object_type
+        self.schema = schema
+
+        # ALTER DEFAULT PRIVILEGES FOR ROLE needs the owner, and the grantees, to exist first
+        DatabaseEntity.__init__(
+            self,
+            name=name,
+            depends_on=[*(depends_on or []), owner],
+            database=database,
+            check_if_exists=check_if_exists,
+        )
+        self._order_before(roles=[owner], target_entity=self)
+        # registered first, so that grants can order their grantees ahead of it
+        Grantable.__init__(self, name=name, grants=grants)
+
+    def grant(self, grants: Sequence[GrantTo]) -> None:
+        super().grant(grants=grants)
+        self.depends_on = list(
+            dict.fromkeys([*self.depends_on, *(grantee for grant in grants for grantee in grant.to)])
+        )
+        self._fix_entity_order(grants=grants, target_entity=self)
+
+    def _create(self) -> None:
+        # nothing to create, default privileges are set by granting them
+        pass
+
+    def _sql_engine(self) -> Engine:
+        return self.database.db_engine()
+
+    def _exists(self) -> bool:
+        rows = self._fetch_sql(engine=self._sql_engine(), statement=self._exists_statement())
+        return rows[0][0]  # type: ignore
+
+    def _exists_statement(self) -> TextClause:
+        """
+        The SQL statement that checks to see if any default privileges are set for this owner, schema, and object type.
+        :return: A single :class:`sqlalchemy.TextClause` containing the SQL to check if this entity exists.
+        """
+        return text(
+            "SELECT EXISTS(SELECT 1 FROM pg_catalog.pg_default_acl d "
+            "JOIN pg_catalog.pg_roles r ON r.oid = d.defaclrole "
+            "LEFT JOIN pg_catalog.pg_namespace n ON n.oid = d.defaclnamespace "
+            "WHERE r.rolname=:owner AND d.defaclobjtype=:object_code AND coalesce(n.nspname, '')=:schema_name)"
+        ).bindparams(owner=self.owner.name, object_code=self._object_code(), schema_name=self._schema_name())
+
+    def _drop(self) -> None:
+        # nothing to drop, default privileges are removed by revoking them
+        pass
+
+    def _safe_grant(self, grantee: Role, privileges: set[Privilege]) -> None:
+        """
+        Check that the owner and schema exist before attempting to grant privileges. Default privileges themselves
+        only exist once something has been granted.
+        :param grantee: The :class:`dbdeclare.entities.Role` to grant privileges to.
+        :param privileges: The set of :class:`dbdeclare.data_structures.Privilege` to grant.
+        """
+        if not self._targets_exist():
+            raise EntityExistsError(
+                f"The owner {self.owner.name} and schema {self._schema_name() or '(all)'} of the "
+                f"{self.__class__.__name__} named {self.name} must exist to grant privileges."
+            )
+        else:
+            self._grant(grantee=grantee, privileges=privileges)
+
+    def _safe_revoke(self, grantee: Role, privileges: set[Privilege]) -> None:
+        """
+        Check that the owner and schema exist before attempting to revoke privileges.
+        :param grantee: The :class:`dbdeclare.entities.Role` to revoke privileges from.
+        :param privileges: The set of :class:`dbdeclare.data_structures.Privilege` to revoke.
+        """
+        if not self._targets_exist():
+            raise EntityExistsError(
+                f"The owner {self.owner.name} and schema {self._schema_name() or '(all)'} of the "
+                f"{self.__class__.__name__} named {self.name} must exist to revoke privileges."
+            )
+        else:
+            self._revoke(grantee=grantee, privileges=privileges)
+
+    def _targets_exist(self) -> bool:
+        """
+        Check if the owner and, if set, the schema these default privileges refer to exist.
+        :return: True if they exist, False if either does not.
+        """
+        rows = self._fetch_sql(engine=self._sql_engine(), statement=self._targets_exist_statement())
+        return rows[0][0]  # type: ignore
+
+    def _targets_exist_statement(self) -> TextClause:
+        """
+        The SQL statement that checks to see if the owner and schema exist.
+        :return: A single :class:`sqlalchemy.TextClause` containing the SQL to check if the owner and schema exist.
+        """
+        return text(
+            "SELECT EXISTS(SELECT 1 FROM pg_catalog.pg_roles WHERE rolname=:owner) "
+            "AND (:schema_name = '' OR EXISTS(SELECT 1 FROM pg_catalog.pg_namespace WHERE nspname=:schema_name))"
+        ).bindparams(owner=self.owner.name, schema_name=self._schema_name())
+
+    def _grant(self, grantee: Role, privileges: set[Privilege]) -> None:
+        self._commit_sql(
+            engine=self._sql_engine(), statements=self._grant_statements(grantee=grantee, privileges=privileges)
+        )
+        self._clear_acl_cache()
+
+    def _grant_statements(self, grantee: Role, privileges: set[Privilege]) -> Sequence[TextClause]:
+        return [
+            text(
+                f"{self._alter_prefix()} GRANT {self._format_privileges(privileges)} "
+                f"ON {self.object_type} TO {grantee.name}"
+            )
+        ]
+
+    def _grants_exist(self, grantee: Role, privileges: set[Privilege]) -> bool:
+        existing_privileges = self._acl(include_owner=True).get(grantee.name, set())
+        return self._check_privileges(declared_privileges=privileges, existing_privileges=existing_privileges)
+
+    def _grants_exist_statement(self) -> TextClause:
+        """
+        The SQL statement that checks to see what default privileges exist.
+        :return: A single :class:`sqlalchemy.TextClause` containing the SQL to check what grants exist on this entity.
+        """
+        return text(
+            "SELECT unnest(d.defaclacl)::text AS acl FROM pg_catalog.pg_default_acl d "
+            "JOIN pg_catalog.pg_roles r ON r.oid = d.defaclrole "
+            "LEFT JOIN pg_catalog.pg_namespace n ON n.oid = d.defaclnamespace "
+            "WHERE r.rolname=:owner AND d.defaclobjtype=:object_code AND coalesce(n.nspname, '')=:schema_name"
+        ).bindparams(owner=self.owner.name, object_code=self._object_code(), schema_name=self._schema_name())
+
+    def _acl_statement(self) -> TextClause:
+        return self._grants_exist_statement()
+
+    def _fetch_acl(self) -> tuple[str, dict[str, set[Privilege]]]:
+        rows = self._fetch_sql(engine=self._sql_engine(), statement=self._grants_exist_statement())
+        return self.owner.name, self._acl_from_rows(acls=[r[0] for r in rows])
+
+    def _grantables(self) -> list[Grantable]:
+        return [self]
+
+    def _clear_cache(self) -> None:
+        self._clear_acl_cache()
+
+    def _revoke(self, grantee: Role, privileges: set[Privilege]) -> None:
+        self._commit_sql(
+            engine=self._sql_engine(),
+            statements=self._revoke_statements(grantee=grantee, privileges=privileges),
+        )
+        self._clear_acl_cache()
+
+    def _revoke_statements(self, grantee: Role, privileges: set[Privilege]) -> Sequence[TextClause]:
+        return [
+            text(
+                f"{self._alter_prefix()} REVOKE {self._format_privileges(privileges)} "
+                f"ON {self.object_type} FROM {grantee.name}"
+            )
+        ]
+
+    def _alter_prefix(self) -> str:
+        """
+        Helper that formats the part of the statement shared by grants and revokes.
+        :return: The ALTER DEFAULT PRIVILEGES clause for this owner and schema as a string.
+        """
+        prefix = f"ALTER DEFAULT PRIVILEGES FOR ROLE {self.owner.name}"
+        if self.schema:
+            prefix = f"{prefix} IN SCHEMA {self.schema.name}"
+        return prefix
+
+    def _object_code(self) -> str:
+        """
+        Helper to get the code Postgres uses in pg_default_acl for this object type.
+        :return: A single letter code as a string.
+        """
+        return self._object_codes[self.object_type]
+
+    def _schema_name(self) -> str:
+        """
+        Helper to get the schema name, or an empty string if these privileges apply to all schemas.
+        :return: The name of the schema as a string.
+        """
+        return self.schema.name if self.schema else ""
+
+    def _valid_privileges(self) -> set[Privilege]:
+        return set(self._object_privileges[self.object_type])
+
+    @staticmethod
+    def _allowed_privileges() -> set[Privilege]:
+        return set().union(*DefaultPrivileges._object_privileges.values())
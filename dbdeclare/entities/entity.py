@@ -1,22 +1,51 @@
-from abc import ABC, abstractmethod
+from abc import ABC, ABCMeta, abstractmethod
 from inspect import signature
 from typing import Any, Sequence
 
 from sqlalchemy import Engine
 
 from dbdeclare.exceptions import EntityExistsError, NoEngineError
+from dbdeclare.registry import Registry, _current_engine, _current_tags
 
 
-class Entity(ABC):
+class _EntityMeta(ABCMeta):
+    """
+    Keeps `Entity.entities`, `Entity.check_if_any_exist` and `Entity._engine` working as before, but backed by the
+    current :class:`dbdeclare.registry.Registry` and the engine bound in the running context.
+    """
+
+    @property
+    def entities(cls) -> list["Entity"]:
+        return Registry.current().entities
+
+    @entities.setter
+    def entities(cls, value: list["Entity"]) -> None:
+        Registry.current().entities = value
+
+    @property
+    def check_if_any_exist(cls) -> bool:
+        return Registry.current().check_if_any_exist
+
+    @check_if_any_exist.setter
+    def check_if_any_exist(cls, value: bool) -> None:
+        Registry.current().check_if_any_exist = value
+
+    @property
+    def _engine(cls) -> Engine | None:
+        return _current_engine.get()
+
+    @_engine.setter
+    def _engine(cls, value: Engine | None) -> None:
+        _current_engine.set(value)
+
+
+class Entity(ABC, metaclass=_EntityMeta):
     """
     Base class to inherit from for all entities. Defines methods common to all entities, abstract methods that are
     needed for all entities, and class methods that enable collection of entities for easy cluster interaction.
+    Entities register into the current :class:`dbdeclare.registry.Registry` when they are declared.
     """
 
-    entities: list["Entity"] = []
-    check_if_any_exist: bool = False
-    _engine: Engine | None = None
-
     def __init__(
         self,
         name: str,
@@ -31,9 +60,13 @@ class Entity(ABC):
         # TODO have "name" be a str class that validates via regex for valid postgres names
         self.name = name
 
+        self._registry = Registry.current()
+        # see dbdeclare.registry.tagged
+        self._tags = _current_tags.get()
+
         # explicit None check because False requires different behavior
         if check_if_exists is None:
-            self.check_if_exists = self.__class__.check_if_any_exist
+            self.check_if_exists = self._registry.check_if_any_exist
         else:
             self.check_if_exists = check_if_exists
 
@@ -41,7 +74,7 @@ class Entity(ABC):
             depends_on = []
         self.depends_on: Sequence["Entity"] = depends_on
 
-        self.__class__._register(self)
+        self._registry.register(self)
 
     def __hash__(self) -> int:
         return hash((self.name, self.__class__.__name__))
@@ -51,25 +84,27 @@ class Entity(ABC):
             return NotImplemented
         return (self.name, self.__class__.__name__) == (other.name, other.__class__.__name__)
 
-    @classmethod
-    def _register(cls, entity: "Entity") -> None:
+    def _identity(self) -> str:
         """
-        Appends an entity to the running list of all entities.
-        :param entity: Any given entity, can be thought of as operating on a subclassed `self`.
+        A string that identifies this entity within a declaration, the same in every process.
+        :return: The entity type and name.
         """
-        # TODO add code to make sure there are no duplicate entities
-        cls.entities.append(entity)
+        return f"{self.__class__.__name__} {self.name}"
 
     @classmethod
     def engine(cls) -> Engine:
         """
-        Convenience wrapper to safely get the main engine.
+        Convenience wrapper to safely get the main engine bound in the running context.
         :return: A :class:`sqlalchemy.Engine` if one has been assigned, otherwise raises an exception.
         """
-        if cls._engine:
-            return cls._engine
+        engine = _current_engine.get()
+        if engine:
+            return engine
         else:
-            raise NoEngineError("There is no SQLAlchemy Engine present. `Base._engine` must have " "a valid engine.")
+            raise NoEngineError(
+                "There is no SQLAlchemy Engine present. Pass an engine to the Controller or bind one with "
+                "`dbdeclare.registry.bind_engine`."
+            )
 
     @abstractmethod
     def _create(self) -> None:
@@ -78,23 +113,52 @@ class Entity(ABC):
         """
         pass
 
-    def _safe_create(self) -> None:
+    def _safe_create(self, guarded: bool = False) -> bool:
         """
         Run an existence check before attempting to create the entity in the cluster.
+        :param guarded: Whether to skip the existence check and create the entity with a statement that does nothing if it exists, like `CREATE SCHEMA IF NOT EXISTS`. Only entities that have such a statement do so, and only when existence checks aren't set to raise an exception.
+        :return: True if the entity was created, False if it already existed.
         """
+        if guarded and not (self.check_if_exists or self._registry.check_if_any_exist):
+            created = self._create_guarded()
+            if created is not None:
+                return created
         if not self._exists():
             self._create()
+            return True
         else:
-            if self.check_if_exists or self.check_if_any_exist:
-                raise EntityExistsError(
-                    f"There is already a {self.__class__.__name__} with the "
-                    f"name {self.name}. If you want to proceed anyway, set "
-                    f"the `check_if_exists` parameter to False. This will "
-                    f"simply skip over the existing entity."
-                )
-            else:
-                # TODO log that we no-op?
-                pass
+            self._skip_create()
+            return False
+
+    def _create_guarded(self) -> bool | None:
+        """
+        Create this entity with a statement that does nothing if it already exists. Entities that have one override
+        this.
+        :return: True if the entity was created, False if it already existed, and None if it can't be created this way.
+        """
+        return None
+
+    def _skip_create(self) -> None:
+        """
+        Skip creating the entity because it already exists, unless existence checks say to raise an exception.
+        """
+        if self.check_if_exists or self._registry.check_if_any_exist:
+            raise self._exists_error()
+        else:
+            # TODO log that we no-op?
+            pass
+
+    def _exists_error(self) -> EntityExistsError:
+        """
+        The exception to raise when this entity already exists but existence checks say it shouldn't.
+        :return: An :class:`dbdeclare.exceptions.EntityExistsError`.
+        """
+        return EntityExistsError(
+            f"There is already a {self.__class__.__name__} with the "
+            f"name {self.name}. If you want to proceed anyway, set "
+            f"the `check_if_exists` parameter to False. This will "
+            f"simply skip over the existing entity."
+        )
 
     @abstractmethod
     def _exists(self) -> bool:
@@ -111,14 +175,21 @@ class Entity(ABC):
         """
         pass
 
-    def _safe_drop(self) -> None:
+    def _safe_drop(self, guarded: bool = False) -> bool:
         """
         Run an existence check before attempting to drop the entity from the cluster.
+        :param guarded: Whether to skip the existence check and drop the entity with a statement that does nothing if it doesn't exist, like `DROP SCHEMA IF EXISTS`. Only entities that have such a statement do so, and only when existence checks aren't set to raise an exception.
+        :return: True if the entity was dropped, False if it didn't exist.
         """
+        if guarded and not (self.check_if_exists or self._registry.check_if_any_exist):
+            dropped = self._drop_guarded()
+            if dropped is not None:
+                return dropped
         if self._exists():
             self._drop()
+            return True
         else:
-            if self.check_if_exists or self.check_if_any_exist:
+            if self.check_if_exists or self._registry.check_if_any_exist:
                 raise EntityExistsError(
                     f"There is no {self.__class__.__name__} with the "
                     f"name {self.name} to remove. If you want to proceed "
@@ -129,11 +200,33 @@ class Entity(ABC):
             else:
                 # TODO log that we no-op?
                 pass
+            return False
+
+    def _drop_guarded(self) -> bool | None:
+        """
+        Drop this entity with a statement that does nothing if it doesn't exist. Entities that have one override this.
+        :return: True if the entity was dropped, False if it didn't exist, and None if it can't be dropped this way.
+        """
+        return None
+
+    def _grantables(self) -> list[Any]:
+        """
+        The grantables this entity declares, whose privileges are managed when syncing. Entities that are grantable,
+        or that declare grantables of their own, override this.
+        :return: A list of :class:`dbdeclare.mixins.Grantable`.
+        """
+        return []
+
+    def _clear_cache(self) -> None:
+        """
+        Forget anything this entity has cached about the cluster. Entities that cache catalog reads override this.
+        """
+        pass
 
     def _get_passed_args(self) -> dict[str, Any]:
         """
         Helper to grab all the arguments to __init__ that aren't in the superclass and have a non-None value. Useful
-        for subclasses.
+        for subclasses. Private attributes are never arguments and are skipped.
         :return: A dict mapping the names of init arguments to their values.
         """
         return {
@@ -141,5 +234,5 @@ class Entity(ABC):
             for k, v in vars(self).items()
             if (k not in signature(self.__class__.__bases__[0].__init__).parameters)  # type: ignore
             and (v is not None)
-            and (k != "_grant_name")
+            and not k.startswith("_")
         }
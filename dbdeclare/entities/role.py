@@ -1,16 +1,23 @@
 from collections import defaultdict
 from datetime import datetime
-from typing import Sequence
+from typing import TYPE_CHECKING, Mapping, Sequence
 
 from sqlalchemy import TextClause, text
 
+from dbdeclare.checkpoint import Progress
 from dbdeclare.data_structures.grant_on import GrantOn, GrantStore
 from dbdeclare.entities.cluster_entity import ClusterEntity
 from dbdeclare.entities.entity import Entity
 from dbdeclare.exceptions import EntityExistsError
+from dbdeclare.history import timed
+from dbdeclare.mixins.configurable import Configurable, Setting, SettingStore
+from dbdeclare.mixins.grantable import Grantable
 
+if TYPE_CHECKING:
+    from dbdeclare.entities.database import Database
 
-class Role(ClusterEntity):
+
+class Role(ClusterEntity, Configurable):
     """
     Represents a Postgres `Role <https://www.postgresql.org/docs/current/database-roles.html>`_.
     """
@@ -35,6 +42,8 @@ class Role(ClusterEntity):
         role: Sequence["Role"] | None = None,
         admin: Sequence["Role"] | None = None,
         grants: Sequence[GrantOn] | None = None,
+        settings: Mapping[str, Setting] | None = None,
+        database_settings: Mapping["Database", Mapping[str, Setting]] | None = None,
     ):
         """
         All __init__ params correspond to CREATE ROLE arguments and options, see
@@ -59,6 +68,8 @@ class Role(ClusterEntity):
         :param role: Sequence of :class:`dbdeclare.entities.Role` that belong to this role.
         :param admin: Like the `role` param above, but gives the roles the right to grant membership to this role to other roles.
         :param grants: Sequence of :class:`dbdeclare.data_structures.GrantOn` to specify privileges this role has in relation to other entities.
+        :param settings: Runtime settings every session of this role starts with, like `{"work_mem": "64MB"}`, set with `ALTER ROLE ... SET`. Settings of the role that aren't declared here are reset, unless this is left out.
+        :param database_settings: Like the `settings` param above, but for sessions of this role in a given :class:`dbdeclare.entities.Database` only.
         """
         self.superuser = superuser
         self.createdb = createdb
@@ -74,6 +85,12 @@ class Role(ClusterEntity):
         self.in_role = in_role
         self.role = role
         self.admin = admin
+        self.settings = self._check_settings(settings)
+        self.database_settings = (
+            {database: self._check_settings(mapping) for database, mapping in database_settings.items()}
+            if database_settings is not None
+            else None
+        )
         self.grants: GrantStore = defaultdict(set)
         if grants:
             self.grant(grants=grants)
@@ -88,10 +105,10 @@ class Role(ClusterEntity):
                 case "password", str(v):
                     if "encrypted" in props:
                         statement = f"{statement} ENCRYPTED"
-                    statement = f"{statement} PASSWORD '{v}'"
+                    statement = f"{statement} PASSWORD {self._quote_text(v)}"
                     if "valid_until" in props:
                         timestamp = props.get("valid_until")
-                        statement = f"{statement} VALID UNTIL '{timestamp}'"
+                        statement = f"{statement} VALID UNTIL {self._quote_text(str(timestamp))}"
 
                 case k, bool(v) if k != "encrypted":
                     flag = k.upper()
@@ -102,8 +119,8 @@ class Role(ClusterEntity):
                 case "connection_limit", int(v):
                     statement = f"{statement} CONNECTION LIMIT {v}"
 
-                case "grants", _:
-                    # ignore grants argument, it is handled by the _grant command
+                case "grants" | "settings" | "database_settings", _:
+                    # ignore grants and settings arguments, they are handled after the role is created
                     pass
 
                 # match a sequence with at least one element to filter out empty sequence
@@ -116,12 +133,53 @@ class Role(ClusterEntity):
         # TODO binding isn't working, switching to simple quotes for now
         return [text(statement)]
 
+    def _create_if_missing_statements(self) -> Sequence[TextClause]:
+        # there's no CREATE ROLE IF NOT EXISTS, so this does the same in a DO block, notice included
+        [create] = self._create_statements()
+        return [
+            text(
+                "DO $dbdeclare$ BEGIN "
+                f"IF EXISTS(SELECT 1 FROM pg_authid WHERE rolname={self._quote(self.name)}) THEN "
+                f"RAISE NOTICE {self._quote(f'role {self.name} already exists, skipping')}; "
+                f"ELSE {create.text}; END IF; "
+                "END $dbdeclare$"
+            )
+        ]
+
+    def _alter_credential_statements(self, password: str | None, valid_until: datetime | None) -> Sequence[TextClause]:
+        """
+        The SQL statements that change this role's password and/or its expiry.
+        :param password: The new password, or a SCRAM-SHA-256 verifier of it. None leaves the password as it is.
+        :param valid_until: The new expiry. None leaves it as it is.
+        :return: A Sequence of :class:`sqlalchemy.TextClause`, empty if there's nothing to change.
+        """
+        options = []
+        if password is not None:
+            options.append(f"PASSWORD {self._quote_text(password)}")
+        if valid_until is not None:
+            options.append(f"VALID UNTIL {self._quote_text(str(valid_until))}")
+        return [text(f"ALTER ROLE {self.name} {' '.join(options)}")] if options else []
+
+    def _declared_settings(self) -> SettingStore:
+        declared: SettingStore = {}
+        if self.settings is not None:
+            declared[(self.name, "")] = self.settings
+        for database, settings in (self.database_settings or {}).items():
+            declared[(self.name, database.name)] = settings or {}
+        return declared
+
+    def _settings_target(self, database: str) -> str:
+        return f"ROLE {self.name} IN DATABASE {database}" if database else f"ROLE {self.name}"
+
     def _exists_statement(self) -> TextClause:
         return text("SELECT EXISTS(SELECT 1 FROM pg_authid WHERE rolname=:role)").bindparams(role=self.name)
 
     def _drop_statements(self) -> Sequence[TextClause]:
         return [text(f"DROP ROLE {self.name}")]
 
+    def _drop_if_exists_statements(self) -> Sequence[TextClause]:
+        return [text(f"DROP ROLE IF EXISTS {self.name}")]
+
     def grant(self, grants: Sequence[GrantOn]) -> None:
         """
         Sets the privileges to grant on this role to the specified entities.
@@ -131,11 +189,15 @@ class Role(ClusterEntity):
             for target in grant.on:
                 self.grants[target] = self.grants[target].union(set(grant.privileges))
 
-    def _safe_grant(self) -> None:
+    def _safe_grant(self, progress: Progress | None = None) -> None:
         """
         Performs an existence check before executing grant statements in the cluster.
+        :param progress: The :class:`dbdeclare.checkpoint.Progress` of the run, if any. Grants it has recorded as completed are skipped, and each grant is recorded once it completes.
         """
-        if self.grants:
+        grants = self._collapsed_grants()
+        if progress:
+            grants = {target: p for target, p in grants.items() if progress.pending(self._grant_step(target))}
+        if grants:
             if not self._exists():
                 raise EntityExistsError(
                     f"There is no {self.__class__.__name__} with the "
@@ -143,8 +205,19 @@ class Role(ClusterEntity):
                     f"must exist to grant privileges."
                 )
             else:
-                for target, privileges in self.grants.items():
-                    target._safe_grant(grantee=self, privileges=privileges)
+                for target, privileges in grants.items():
+                    with timed(self._grant_step(target), "grant"):
+                        target._safe_grant(grantee=self, privileges=privileges)
+                    if progress:
+                        progress.done(self._grant_step(target))
+
+    def _grant_step(self, target: Grantable) -> str:
+        """
+        Names the step of granting privileges on a target to this role, for checkpoints.
+        :param target: The grantable privileges are granted on.
+        :return: A string that identifies the step.
+        """
+        return f"grant {target._grant_identity()} to {self._identity()}"
 
     def _grants_exist(self) -> bool:
         """
@@ -161,7 +234,7 @@ class Role(ClusterEntity):
                 return all(
                     [
                         target._grants_exist(grantee=self, privileges=privileges)
-                        for target, privileges in self.grants.items()
+                        for target, privileges in self._collapsed_grants().items()
                     ]
                 )
         else:
@@ -180,5 +253,15 @@ class Role(ClusterEntity):
                     f"must exist to revoke privileges."
                 )
             else:
-                for target, privileges in self.grants.items():
-                    target._safe_revoke(grantee=self, privileges=privileges)
+                for target, privileges in self._collapsed_grants().items():
+                    with timed(self._grant_step(target), "revoke"):
+                        target._safe_revoke(grantee=self, privileges=privileges)
+
+    def _collapsed_grants(self) -> GrantStore:
+        """
+        Replaces grants on every member of a grant group (like every table of a schema) with a single grant on the
+        group, as long as the privileges granted on each member are identical. Grants that can't be collapsed are
+        kept as is.
+        :return: A :class:`dbdeclare.data_structures.grant_on.GrantStore` with collapsible grants replaced by groups.
+        """
+        return Grantable._collapse(self.grants)
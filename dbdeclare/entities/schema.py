@@ -52,41 +52,59 @@ class Schema(DatabaseSqlEntity, Grantable):
 
         return [text(statement)]
 
+    def _create_if_missing_statements(self) -> Sequence[TextClause]:
+        statement = f"CREATE SCHEMA IF NOT EXISTS {self.name}"
+
+        if self.owner:
+            statement = f"{statement} AUTHORIZATION {self.owner.name}"
+
+        return [text(statement)]
+
     def _exists_statement(self) -> TextClause:
         return text("SELECT EXISTS(SELECT 1 FROM pg_namespace WHERE nspname=:schema)").bindparams(schema=self.name)
 
     def _drop_statements(self) -> Sequence[TextClause]:
         return [text(f"DROP SCHEMA {self.name}")]
 
+    def _drop_if_exists_statements(self) -> Sequence[TextClause]:
+        return [text(f"DROP SCHEMA IF EXISTS {self.name}")]
+
     def _grant(self, grantee: Role, privileges: set[Privilege]) -> None:
         self._commit_sql(
             engine=self.database.db_engine(), statements=self._grant_statements(grantee=grantee, privileges=privileges)
         )
+        self._clear_acl_cache()
 
     def _grants_exist(self, grantee: Role, privileges: set[Privilege]) -> bool:
-        rows = self._fetch_sql(engine=self.database.db_engine(), statement=self._grants_exist_statement())
-
-        try:
-            existing_privileges = list(
-                filter(None, [self._extract_privileges(acl=r[0], grantee=grantee) for r in rows])
-            )[0]
-            return privileges.issubset(existing_privileges)
-        except IndexError:
-            return False
-
-    def _grants_exist_statement(self) -> TextClause:
-        """
-        The SQL statement that checks to see what grants exist.
-        :return: A single :class:`sqlalchemy.TextClause` containing the SQL to check what grants exist on this entity.
-        """
-        return text("SELECT unnest(nspacl) FROM pg_catalog.pg_namespace WHERE nspname=:schema_name").bindparams(
-            schema_name=self.name
-        )
+        existing_privileges = self._acl(include_owner=True).get(grantee.name, set())
+        return self._check_privileges(declared_privileges=privileges, existing_privileges=existing_privileges)
 
     def _revoke(self, grantee: Role, privileges: set[Privilege]) -> None:
         self._commit_sql(
             engine=self.database.db_engine(), statements=self._revoke_statements(grantee=grantee, privileges=privileges)
         )
+        self._clear_acl_cache()
+
+    def _fetch_acl(self) -> tuple[str, dict[str, set[Privilege]]]:
+        rows = self._fetch_sql(engine=self.database.db_engine(), statement=self._acl_statement())
+        return rows[0][0] if rows else "", self._acl_from_rows(acls=[r[1] for r in rows])
+
+    def _acl_statement(self) -> TextClause:
+        """
+        The SQL statement that reads the owner and every privilege granted on this schema, defaults included.
+        :return: A single :class:`sqlalchemy.TextClause` containing the SQL to read the ACL of this entity.
+        """
+        return text(
+            "SELECT pg_get_userbyid(nspowner) AS owner, "
+            "unnest(coalesce(nspacl, acldefault('n', nspowner)))::text AS acl "
+            "FROM pg_catalog.pg_namespace WHERE nspname=:schema_name"
+        ).bindparams(schema_name=self.name)
+
+    def _grantables(self) -> list[Grantable]:
+        return [self]
+
+    def _clear_cache(self) -> None:
+        self._clear_acl_cache()
 
     @staticmethod
     def _allowed_privileges() -> set[Privilege]:
@@ -0,0 +1,135 @@
+from typing import Sequence
+
+from sqlalchemy import TextClause, text
+
+from dbdeclare.data_structures.grant_to import GrantTo
+from dbdeclare.data_structures.privileges import Privilege
+from dbdeclare.entities.cluster_entity import ClusterEntity
+from dbdeclare.entities.entity import Entity
+from dbdeclare.entities.role import Role
+from dbdeclare.exceptions import PostgresDeclareError
+from dbdeclare.mixins.grantable import Grantable
+
+# the options CREATE TABLESPACE accepts in its WITH clause
+_OPTIONS = {"seq_page_cost", "random_page_cost", "effective_io_concurrency", "maintenance_io_concurrency"}
+
+
+class Tablespace(ClusterEntity, Grantable):
+    """
+    Represents a Postgres `Tablespace <https://www.postgresql.org/docs/current/manage-ag-tablespaces.html>`_, a
+    directory on the server that databases and tables can be placed in, say to spread them over several volumes.
+    """
+
+    # CREATE TABLESPACE can't run inside a transaction, so it can't run in a pipeline or a DO block either
+    _create_in_transaction = False
+
+    def __init__(
+        self,
+        name: str,
+        location: str,
+        depends_on: Sequence[Entity] | None = None,
+        check_if_exists: bool | None = None,
+        owner: Role | None = None,
+        options: dict[str, float | int] | None = None,
+        grants: Sequence[GrantTo] | None = None,
+    ):
+        """
+        All __init__ params correspond to CREATE TABLESPACE arguments and options, see
+        `official Postgres documentation <https://www.postgresql.org/docs/current/sql-createtablespace.html>`_.
+
+
+        :param name: Unique name of the Tablespace. Must be unique across the cluster.
+        :param location: The directory on the server to use. It must exist, be empty, and be owned by the user Postgres runs as.
+        :param depends_on: Any entities that should be created before this one.
+        :param check_if_exists: Flag to set existence check behavior. If `True`, will raise an exception during _safe_create if the entity already exists, and will raise an exception during _safe_drop if the entity does not exist.
+        :param owner: The :class:`dbdeclare.entitites.Role` who will own this tablespace. Postgres defaults to the user executing the command.
+        :param options: Planner settings for the volume, like `random_page_cost` or `effective_io_concurrency`. Postgres defaults to the settings of the cluster.
+        :param grants: Sequence of :class:`dbdeclare.data_structures.GrantTo` to specify privileges this tablespace has in relation to specified roles.
+        """
+        self.location = location
+        self.owner = owner
+        self.options = self._check_options(options)
+
+        Grantable.__init__(self, name=name, grants=grants)
+        ClusterEntity.__init__(self, name=name, depends_on=depends_on, check_if_exists=check_if_exists)
+
+    def _create_statements(self) -> Sequence[TextClause]:
+        statement = f"CREATE TABLESPACE {self.name}"
+        if self.owner:
+            statement = f"{statement} OWNER {self.owner.name}"
+        statement = f"{statement} LOCATION {self._quote_text(self.location)}"
+        if self.options:
+            options = ", ".join(f"{k}={v}" for k, v in self.options.items())
+            statement = f"{statement} WITH ({options})"
+        return [text(statement)]
+
+    @staticmethod
+    def _check_options(options: dict[str, float | int] | None) -> dict[str, float | int] | None:
+        """
+        Helper to check declared options, since they end up in SQL as they are. Names are lowercased, the way Postgres
+        stores them.
+        :param options: The options as declared.
+        :return: A copy of the options, or None if none are declared.
+        """
+        if options is None:
+            return None
+        for name, value in options.items():
+            if name.lower() not in _OPTIONS:
+                raise PostgresDeclareError(
+                    f"{name!r} is not a tablespace option, expected one of {', '.join(sorted(_OPTIONS))}."
+                )
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise PostgresDeclareError(f"Tablespace option {name!r} must be a number, got {value!r}.")
+        return {name.lower(): value for name, value in options.items()}
+
+    def _exists_statement(self) -> TextClause:
+        return text("SELECT EXISTS(SELECT 1 FROM pg_tablespace WHERE spcname=:tablespace)").bindparams(
+            tablespace=self.name
+        )
+
+    def _drop_statements(self) -> Sequence[TextClause]:
+        return [text(f"DROP TABLESPACE {self.name}")]
+
+    def _drop_if_exists_statements(self) -> Sequence[TextClause]:
+        return [text(f"DROP TABLESPACE IF EXISTS {self.name}")]
+
+    def _grant(self, grantee: Role, privileges: set[Privilege]) -> None:
+        self._commit_sql(
+            engine=self.engine(), statements=self._grant_statements(grantee=grantee, privileges=privileges)
+        )
+        self._clear_acl_cache()
+
+    def _grants_exist(self, grantee: Role, privileges: set[Privilege]) -> bool:
+        existing_privileges = self._acl(include_owner=True).get(grantee.name, set())
+        return self._check_privileges(declared_privileges=privileges, existing_privileges=existing_privileges)
+
+    def _revoke(self, grantee: Role, privileges: set[Privilege]) -> None:
+        self._commit_sql(
+            engine=self.engine(), statements=self._revoke_statements(grantee=grantee, privileges=privileges)
+        )
+        self._clear_acl_cache()
+
+    def _fetch_acl(self) -> tuple[str, dict[str, set[Privilege]]]:
+        rows = self._fetch_sql(engine=self.engine(), statement=self._acl_statement())
+        return rows[0][0] if rows else "", self._acl_from_rows(acls=[r[1] for r in rows])
+
+    def _acl_statement(self) -> TextClause:
+        """
+        The SQL statement that reads the owner and every privilege granted on this tablespace, defaults included.
+        :return: A single :class:`sqlalchemy.TextClause` containing the SQL to read the ACL of this entity.
+        """
+        return text(
+            "SELECT pg_get_userbyid(spcowner) AS owner, "
+            "unnest(coalesce(spcacl, acldefault('t', spcowner)))::text AS acl "
+            "FROM pg_catalog.pg_tablespace WHERE spcname=:tablespace"
+        ).bindparams(tablespace=self.name)
+
+    def _grantables(self) -> list[Grantable]:
+        return [self]
+
+    def _clear_cache(self) -> None:
+        self._clear_acl_cache()
+
+    @staticmethod
+    def _allowed_privileges() -> set[Privilege]:
+        return {Privilege.CREATE, Privilege.ALL_PRIVILEGES}
@@ -12,3 +12,13 @@ class EntityExistsError(PostgresDeclareError):
 
 class InvalidPrivilegeError(PostgresDeclareError):
     pass
+
+
+class PipelineError(PostgresDeclareError):
+    def __init__(self, message: str, step: str):
+        """
+        :param message: What failed, and why.
+        :param step: The step that the failed statement belongs to, like granting privileges on an entity to a role.
+        """
+        super().__init__(message)
+        self.step = step
@@ -0,0 +1,140 @@
+import sqlite3
+from contextlib import closing, contextmanager
+from contextvars import ContextVar, Token
+from pathlib import Path
+from threading import Lock
+from time import perf_counter
+from typing import Any, Iterator, Sequence
+
+
+class TimingHistory:
+    """
+    Remembers how long each step of past runs took (creating an entity, granting privileges on a target, and so on)
+    in a local SQLite file. Use it as a context manager around :class:`dbdeclare.controller.Controller` operations to
+    record their steps, which is scoped to the running thread or asyncio task like a
+    :class:`dbdeclare.registry.Registry`. Recorded timings are written to the file on exit. While a history is
+    current, `run_shared` claims its most expensive partitions first, `run_on_clusters` starts its slowest clusters
+    first, and `critical_path` can tell which chain of steps bounds a run.
+    """
+
+    def __init__(self, path: str | Path = ".dbdeclare_history.sqlite", window: int = 5):
+        """
+        :param path: Path to the SQLite file. It is created if it doesn't exist.
+        :param window: How many of the most recent timings of a step to average for its estimate.
+        """
+        self.path = Path(path)
+        self.window = window
+        self._pending: list[tuple[str, str, float]] = []
+        self._estimates: dict[str, dict[str, float]] = {}
+        self._lock = Lock()
+        self._tokens: list[Token["TimingHistory | None"]] = []
+
+    def __enter__(self) -> "TimingHistory":
+        self._tokens.append(_current_history.set(self))
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        _current_history.reset(self._tokens.pop())
+        self.flush()
+
+    def record(self, key: str, operation: str, seconds: float) -> None:
+        """
+        Records how long a step took. Kept in memory until `flush`.
+        :param key: Identifies what the step worked on, like an entity.
+        :param operation: The kind of step, like create or grant.
+        :param seconds: How long it took.
+        """
+        with self._lock:
+            self._pending.append((key, operation, seconds))
+
+    def flush(self) -> None:
+        """
+        Writes the recorded timings to the file, in a single transaction.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if pending:
+            with closing(self._connect()) as conn, conn:
+                conn.executemany("INSERT INTO timings (key, operation, seconds) VALUES (?, ?, ?)", pending)
+
+    def estimates(self, operation: str) -> dict[str, float]:
+        """
+        Estimates how long each step of a kind will take, from the most recent timings written to the file. Read once
+        per operation, then reused.
+        :param operation: The kind of step, like create or grant.
+        :return: A dict mapping keys to estimated seconds. Steps that were never timed are left out.
+        """
+        if operation not in self._estimates:
+            with closing(self._connect()) as conn:
+                rows = conn.execute(
+                    "SELECT key, avg(seconds) FROM ("
+                    "SELECT key, seconds, row_number() OVER (PARTITION BY key ORDER BY id DESC) AS n "
+                    "FROM timings WHERE operation = ?"
+                    ") WHERE n <= ? GROUP BY key",
+                    (operation, self.window),
+                ).fetchall()
+            self._estimates[operation] = dict(rows)
+        return self._estimates[operation]
+
+    def estimate(self, key: str, operation: str) -> float:
+        """
+        Estimates how long a step will take.
+        :param key: Identifies what the step works on, like an entity.
+        :param operation: The kind of step, like create or grant.
+        :return: The estimated seconds, or 0 if the step was never timed.
+        """
+        return self.estimates(operation).get(key, 0.0)
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Opens the SQLite file, creating the timings table if needed.
+        :return: A :class:`sqlite3.Connection`.
+        """
+        conn = sqlite3.connect(self.path)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS timings (id INTEGER PRIMARY KEY, key TEXT NOT NULL, operation TEXT NOT NULL, "
+            "seconds REAL NOT NULL, recorded_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP)"
+        )
+        return conn
+
+    @staticmethod
+    def current() -> "TimingHistory | None":
+        """
+        Getter for the history that steps are recorded in.
+        :return: The :class:`dbdeclare.history.TimingHistory` made current in this context, if any.
+        """
+        return _current_history.get()
+
+
+@contextmanager
+def timed(key: str, operation: str) -> Iterator[None]:
+    """
+    Times a step and records it in the current history, if there is one. Steps that fail aren't recorded.
+    :param key: Identifies what the step works on, like an entity.
+    :param operation: The kind of step, like create or grant.
+    """
+    history = _current_history.get()
+    start = perf_counter()
+    yield
+    if history is not None:
+        history.record(key=key, operation=operation, seconds=perf_counter() - start)
+
+
+@contextmanager
+def timed_batch(keys: Sequence[str], operation: str) -> Iterator[None]:
+    """
+    Times steps that run together, like a pipelined batch, and records an equal share of the time for each of them in
+    the current history, if there is one.
+    :param keys: Identifies what each step works on.
+    :param operation: The kind of steps, like create or grant.
+    """
+    history = _current_history.get()
+    start = perf_counter()
+    yield
+    if history is not None and keys:
+        seconds = (perf_counter() - start) / len(keys)
+        for key in keys:
+            history.record(key=key, operation=operation, seconds=seconds)
+
+
+_current_history: ContextVar[TimingHistory | None] = ContextVar("dbdeclare_history", default=None)
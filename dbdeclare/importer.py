@@ -0,0 +1,272 @@
+import json
+import re
+from datetime import datetime
+from typing import Any, Iterator, TextIO
+
+from sqlalchemy import Engine, TextClause, create_engine, text
+
+from dbdeclare.data_structures.grant_on import GrantOn
+from dbdeclare.data_structures.privileges import Privilege
+from dbdeclare.entities.database import Database
+from dbdeclare.entities.entity import Entity
+from dbdeclare.entities.role import Role
+from dbdeclare.entities.schema import Schema
+from dbdeclare.loader import declare_records
+from dbdeclare.mixins.sql import SQLBase
+
+# objects with an oid below this were created by initdb (template databases, pg_* roles, the public schema, etc.)
+FIRST_NORMAL_OID = 16384
+
+# Postgres defaults for role options, only options that differ are imported
+ROLE_DEFAULTS: dict[str, Any] = {
+    "superuser": False,
+    "createdb": False,
+    "createrole": False,
+    "inherit": True,
+    "login": False,
+    "replication": False,
+    "bypassrls": False,
+    "connection_limit": -1,
+    "valid_until": None,
+}
+
+
+class Importer(SQLBase):
+    """
+    Generates declarations from the roles, databases, schemas, and privileges that already exist in a cluster.
+    Catalogs are read with server-side cursors and turned into records one row at a time, so memory use is bounded
+    by the batch size rather than the size of the catalogs. Records are plain dicts that can be declared as entities,
+    written out as Python source, or written out as a JSON Lines data file.
+
+    Entities created by initdb (like template databases, pg_* roles, and the public schema) are skipped, as are
+    privileges granted to PUBLIC, to those skipped roles, or to the owner of an object. Tables are not imported since
+    they are declared via SQLAlchemy.
+    """
+
+    def __init__(self, engine: Engine, batch_size: int = 1000):
+        """
+        :param engine: A :class:`sqlalchemy.Engine` that defines the connection to a Postgres instance/cluster.
+        :param batch_size: The number of rows to fetch from the server per round trip.
+        """
+        self.engine = engine
+        self.batch_size = batch_size
+
+    def _sql_engine(self) -> Engine:
+        return self.engine
+
+    def records(self) -> Iterator[dict[str, Any]]:
+        """
+        Streams a record for every role, database, schema, and grant in the cluster. Records are ordered so that
+        anything a record refers to comes before it.
+        :return: An Iterator of dicts, each with a "kind" key of role, database, schema, or grant.
+        """
+        for row in self._stream_sql(engine=self.engine, statement=self._roles_statement(), batch_size=self.batch_size):
+            name, options, in_role = row[0], row[1:-1], row[-1]
+            record: dict[str, Any] = {"kind": "role", "name": name}
+            for key, value in zip(ROLE_DEFAULTS, options):
+                if value != ROLE_DEFAULTS[key]:
+                    record[key] = value.isoformat() if isinstance(value, datetime) else value
+            if in_role:
+                record["in_role"] = list(in_role)
+            yield record
+
+        connectable_databases = []
+        for name, owner, allow_connections, connection_limit, is_template in self._stream_sql(
+            engine=self.engine, statement=self._databases_statement(), batch_size=self.batch_size
+        ):
+            record = {"kind": "database", "name": name}
+            if owner:
+                record["owner"] = owner
+            if not allow_connections:
+                record["allow_connections"] = False
+            else:
+                connectable_databases.append(name)
+            if connection_limit != -1:
+                record["connection_limit"] = connection_limit
+            if is_template:
+                record["is_template"] = True
+            yield record
+
+        for database_name, grantee, privileges in self._stream_sql(
+            engine=self.engine, statement=self._database_grants_statement(), batch_size=self.batch_size
+        ):
+            yield {"kind": "grant", "role": grantee, "privileges": list(privileges), "database": database_name}
+
+        for database_name in connectable_databases:
+            db_engine = create_engine(self.engine.url.set(database=database_name))
+            try:
+                for name, owner in self._stream_sql(
+                    engine=db_engine, statement=self._schemas_statement(), batch_size=self.batch_size
+                ):
+                    record = {"kind": "schema", "name": name, "database": database_name}
+                    if owner:
+                        record["owner"] = owner
+                    yield record
+
+                for schema_name, grantee, privileges in self._stream_sql(
+                    engine=db_engine, statement=self._schema_grants_statement(), batch_size=self.batch_size
+                ):
+                    yield {
+                        "kind": "grant",
+                        "role": grantee,
+                        "privileges": list(privileges),
+                        "database": database_name,
+                        "schema": schema_name,
+                    }
+            finally:
+                db_engine.dispose()
+
+    def declare(self) -> list[Entity]:
+        """
+        Declares an entity for every role, database, and schema in the cluster, along with their grants, in the current
+        registry. See :func:`dbdeclare.loader.declare_records`.
+        :return: A list of the declared entities, in the order they were declared.
+        """
+        return declare_records(self.records())
+
+    def write_json(self, file: TextIO) -> None:
+        """
+        Writes every record as a line of JSON (aka JSON Lines), one record at a time.
+        :param file: A text file (or anything with a `write` method) to write to.
+        """
+        for record in self.records():
+            file.write(f"{json.dumps(record)}\n")
+
+    def write_python(self, file: TextIO) -> None:
+        """
+        Writes Python source that declares every role, database, schema, and grant, one record at a time.
+        :param file: A text file (or anything with a `write` method) to write to.
+        """
+        file.write(
+            "from datetime import datetime\n\n"
+            "from dbdeclare.data_structures import GrantOn, Privilege\n"
+            "from dbdeclare.entities import Database, Role, Schema\n\n"
+        )
+        for record in self.records():
+            match record:
+                case {"kind": "role"}:
+                    args = [f"name={record['name']!r}"]
+                    for k, v in record.items():
+                        match k, v:
+                            case "kind" | "name", _:
+                                pass
+                            case "valid_until", v:
+                                args.append(f"valid_until=datetime.fromisoformat({v!r})")
+                            case "in_role", v:
+                                args.append(f"in_role=[{', '.join(self._variable('role', n) for n in v)}]")
+                            case k, v:
+                                args.append(f"{k}={v!r}")
+                    file.write(f"{self._variable('role', record['name'])} = Role({', '.join(args)})\n")
+                case {"kind": "database"}:
+                    args = [f"name={record['name']!r}"]
+                    for k, v in record.items():
+                        match k, v:
+                            case "kind" | "name", _:
+                                pass
+                            case "owner", v:
+                                args.append(f"owner={self._variable('role', v)}")
+                            case k, v:
+                                args.append(f"{k}={v!r}")
+                    file.write(f"{self._variable('database', record['name'])} = Database({', '.join(args)})\n")
+                case {"kind": "schema"}:
+                    args = [f"name={record['name']!r}", f"database={self._variable('database', record['database'])}"]
+                    if "owner" in record:
+                        args.append(f"owner={self._variable('role', record['owner'])}")
+                    variable = self._variable("schema", f"{record['database']}_{record['name']}")
+                    file.write(f"{variable} = Schema({', '.join(args)})\n")
+                case {"kind": "grant"}:
+                    if "schema" in record:
+                        target = self._variable("schema", f"{record['database']}_{record['schema']}")
+                    else:
+                        target = self._variable("database", record["database"])
+                    privileges = ", ".join(f"Privilege.{Privilege(p).name}" for p in record["privileges"])
+                    file.write(
+                        f"{self._variable('role', record['role'])}.grant("
+                        f"grants=[GrantOn(privileges=[{privileges}], on=[{target}])])\n"
+                    )
+
+    @staticmethod
+    def _variable(kind: str, name: str) -> str:
+        """
+        Helper to turn an entity name into a valid Python variable name.
+        :param kind: The kind of entity, used as a prefix.
+        :param name: The name of the entity.
+        :return: A valid Python identifier as a string.
+        """
+        return f"{kind}_{re.sub(r'[^0-9a-zA-Z_]', '_', name)}"
+
+    @staticmethod
+    def _roles_statement() -> TextClause:
+        """
+        The SQL statement that lists every role and the roles it is a member of. Roles are ordered by how deeply they
+        are nested, so every role comes after the roles it is a member of.
+        :return: A single :class:`sqlalchemy.TextClause` containing the SQL to list roles.
+        """
+        return text(
+            "WITH RECURSIVE chain(roleid, depth) AS ("
+            "SELECT oid, 0 FROM pg_catalog.pg_authid WHERE oid >= :first_oid "
+            "UNION ALL "
+            "SELECT m.member, c.depth + 1 FROM pg_catalog.pg_auth_members m JOIN chain c ON m.roleid = c.roleid) "
+            "SELECT a.rolname, a.rolsuper, a.rolcreatedb, a.rolcreaterole, a.rolinherit, a.rolcanlogin, "
+            "a.rolreplication, a.rolbypassrls, a.rolconnlimit, NULLIF(a.rolvaliduntil, 'infinity'), "
+            "ARRAY(SELECT DISTINCT g.rolname FROM pg_catalog.pg_auth_members m "
+            "JOIN pg_catalog.pg_authid g ON g.oid = m.roleid "
+            "WHERE m.member = a.oid AND g.oid >= :first_oid ORDER BY g.rolname) AS in_role "
+            "FROM pg_catalog.pg_authid a "
+            "JOIN (SELECT roleid, max(depth) AS depth FROM chain GROUP BY roleid) d ON d.roleid = a.oid "
+            "WHERE a.oid >= :first_oid ORDER BY d.depth, a.rolname"
+        ).bindparams(first_oid=FIRST_NORMAL_OID)
+
+    @staticmethod
+    def _databases_statement() -> TextClause:
+        """
+        The SQL statement that lists every database and its options.
+        :return: A single :class:`sqlalchemy.TextClause` containing the SQL to list databases.
+        """
+        return text(
+            "SELECT d.datname, CASE WHEN d.datdba >= :first_oid THEN pg_catalog.pg_get_userbyid(d.datdba) END, "
+            "d.datallowconn, d.datconnlimit, d.datistemplate "
+            "FROM pg_catalog.pg_database d WHERE d.oid >= :first_oid ORDER BY d.datname"
+        ).bindparams(first_oid=FIRST_NORMAL_OID)
+
+    @staticmethod
+    def _database_grants_statement() -> TextClause:
+        """
+        The SQL statement that lists the privileges granted on every database, one row per database and grantee.
+        :return: A single :class:`sqlalchemy.TextClause` containing the SQL to list database privileges.
+        """
+        return text(
+            "SELECT d.datname, g.rolname, array_agg(DISTINCT a.privilege_type) "
+            "FROM pg_catalog.pg_database d CROSS JOIN LATERAL aclexplode(d.datacl) a "
+            "JOIN pg_catalog.pg_authid g ON g.oid = a.grantee "
+            "WHERE d.oid >= :first_oid AND a.grantee >= :first_oid AND a.grantee <> d.datdba "
+            "GROUP BY d.datname, g.rolname ORDER BY d.datname, g.rolname"
+        ).bindparams(first_oid=FIRST_NORMAL_OID)
+
+    @staticmethod
+    def _schemas_statement() -> TextClause:
+        """
+        The SQL statement that lists every schema in a database.
+        :return: A single :class:`sqlalchemy.TextClause` containing the SQL to list schemas.
+        """
+        return text(
+            "SELECT n.nspname, CASE WHEN n.nspowner >= :first_oid THEN pg_catalog.pg_get_userbyid(n.nspowner) END "
+            "FROM pg_catalog.pg_namespace n "
+            "WHERE n.oid >= :first_oid AND n.nspname NOT LIKE 'pg\\_%' ORDER BY n.nspname"
+        ).bindparams(first_oid=FIRST_NORMAL_OID)
+
+    @staticmethod
+    def _schema_grants_statement() -> TextClause:
+        """
+        The SQL statement that lists the privileges granted on every schema in a database, one row per schema and
+        grantee.
+        :return: A single :class:`sqlalchemy.TextClause` containing the SQL to list schema privileges.
+        """
+        return text(
+            "SELECT n.nspname, g.rolname, array_agg(DISTINCT a.privilege_type) "
+            "FROM pg_catalog.pg_namespace n CROSS JOIN LATERAL aclexplode(n.nspacl) a "
+            "JOIN pg_catalog.pg_authid g ON g.oid = a.grantee "
+            "WHERE n.oid >= :first_oid AND n.nspname NOT LIKE 'pg\\_%' "
+            "AND a.grantee >= :first_oid AND a.grantee <> n.nspowner "
+            "GROUP BY n.nspname, g.rolname ORDER BY n.nspname, g.rolname"
+        ).bindparams(first_oid=FIRST_NORMAL_OID)
@@ -0,0 +1,323 @@
+import csv
+import json
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable, Iterator, TextIO
+
+from dbdeclare.data_structures.grant_on import GrantOn
+from dbdeclare.data_structures.privileges import Privilege
+from dbdeclare.entities.database import Database
+from dbdeclare.entities.entity import Entity
+from dbdeclare.entities.role import Role
+from dbdeclare.entities.schema import Schema
+from dbdeclare.exceptions import InvalidPrivilegeError, PostgresDeclareError
+from dbdeclare.mixins.grantable import Grantable
+from dbdeclare.registry import Registry
+
+# file suffixes and the format of their records
+FORMATS = {".jsonl": "jsonl", ".ndjson": "jsonl", ".json": "json", ".csv": "csv", ".yaml": "yaml", ".yml": "yaml"}
+
+# CSV cells are all strings, these are the columns that hold something else. Lists are separated by "|".
+_CSV_LISTS = {"privileges", "in_role"}
+_CSV_INTEGERS = {"connection_limit"}
+_CSV_BOOLEANS = {
+    "superuser",
+    "createdb",
+    "createrole",
+    "inherit",
+    "login",
+    "replication",
+    "bypassrls",
+    "allow_connections",
+    "is_template",
+}
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class Loader:
+    """
+    Declares entities from a data file of records, the same records :class:`dbdeclare.importer.Importer` produces:
+    dicts with a "kind" key of role, database, schema, or grant. Reads JSON Lines, a JSON array, CSV with a column
+    per key, or YAML (either a list or a document per record, which needs PyYAML). Records are read and declared one
+    at a time, so memory use is bounded by what's declared rather than the size of the file.
+    """
+
+    def __init__(self, path: str | Path, file_format: str | None = None, chunk_size: int = 65536):
+        """
+        :param path: Path to the data file.
+        :param file_format: One of jsonl, json, csv, or yaml. Defaults to the format for the file suffix.
+        :param chunk_size: The number of characters to read at a time from a JSON array.
+        """
+        self.path = Path(path)
+        self.file_format = file_format or FORMATS.get(self.path.suffix.lower())
+        if self.file_format not in FORMATS.values():
+            raise PostgresDeclareError(
+                f"Cannot tell the format of {self.path}, pass one of {', '.join(sorted(set(FORMATS.values())))}."
+            )
+        self.chunk_size = chunk_size
+
+    def records(self) -> Iterator[dict[str, Any]]:
+        """
+        Streams the records in the file.
+        :return: An Iterator of dicts, one per record.
+        """
+        with self.path.open(newline="" if self.file_format == "csv" else None) as file:
+            match self.file_format:
+                case "jsonl":
+                    yield from (json.loads(line) for line in file if line.strip())
+                case "json":
+                    yield from _json_array(file=file, chunk_size=self.chunk_size)
+                case "csv":
+                    yield from (_csv_record(row) for row in csv.DictReader(file))
+                case "yaml":
+                    yield from _yaml_documents(file)
+
+    def declare(self) -> list[Entity]:
+        """
+        Declares an entity for every role, database, and schema record, and every grant record, in the current
+        registry. See :func:`declare_records`.
+        :return: A list of the declared entities, in the order they were declared.
+        """
+        return declare_records(self.records())
+
+
+def declare_records(records: Iterable[Any]) -> list[Entity]:
+    """
+    Declares an entity for every role, database, and schema record, and every grant record, in the current registry.
+    Records may refer to anything declared before them, in a previous record or already in the registry. References
+    are looked up by name in an index, and privileges are checked against the target as each grant is declared.
+    :param records: An Iterable of dicts, each with a "kind" key of role, database, schema, or grant.
+    :return: A list of the declared entities, in the order they were declared.
+    """
+    index = _Index(Registry.current())
+    entities: list[Entity] = []
+    for number, record in enumerate(records, start=1):
+        try:
+            entity = index.declare(record)
+        except (KeyError, TypeError, ValueError) as e:
+            raise PostgresDeclareError(f"Cannot declare record {number} ({record!r}): {e}") from e
+        except PostgresDeclareError as e:
+            raise e.__class__(f"Cannot declare record {number} ({record!r}): {e}") from e
+        if entity is not None:
+            entities.append(entity)
+    return entities
+
+
+class _Index:
+    """
+    Roles, databases, and schemas by name, to resolve the references in records without scanning the registry.
+    """
+
+    def __init__(self, registry: Registry):
+        """
+        :param registry: The :class:`dbdeclare.registry.Registry` records are declared in, whose entities they can
+        refer to.
+        """
+        self.roles: dict[str, Role] = {}
+        self.databases: dict[str, Database] = {}
+        self.schemas: dict[tuple[str, str], Schema] = {}
+        for entity in registry.entities:
+            self._add(entity)
+
+    def declare(self, record: Any) -> Entity | None:
+        """
+        Declares a single record.
+        :param record: A dict with a "kind" key of role, database, schema, or grant.
+        :return: The declared entity, or None for a grant.
+        """
+        match record:
+            case {"kind": "role", "name": str(name)}:
+                self._check_new(Role, name, self.roles)
+                options = {k: v for k, v in record.items() if k not in ("kind", "in_role")}
+                if isinstance(options.get("valid_until"), str):
+                    options["valid_until"] = datetime.fromisoformat(options["valid_until"])
+                in_role = [self._get(Role, n, self.roles) for n in record.get("in_role", [])]
+                entity: Entity = Role(in_role=in_role or None, **options)
+            case {"kind": "database", "name": str(name)}:
+                self._check_new(Database, name, self.databases)
+                options = {k: v for k, v in record.items() if k not in ("kind", "owner")}
+                entity = Database(owner=self._owner(record), **options)
+            case {"kind": "schema", "name": str(name), "database": str(database_name)}:
+                self._check_new(Schema, f"{database_name}.{name}", self.schemas, key=(database_name, name))
+                database = self._get(Database, database_name, self.databases)
+                entity = Schema(name=name, database=database, owner=self._owner(record))
+            case {"kind": "grant", "role": str(role_name), "privileges": list(names), "database": str(database_name)}:
+                if "schema" in record:
+                    key = (database_name, record["schema"])
+                    target: Grantable = self._get(Schema, ".".join(key), self.schemas, key=key)
+                else:
+                    target = self._get(Database, database_name, self.databases)
+                role = self._get(Role, role_name, self.roles)
+                role.grant(grants=[GrantOn(privileges=self._privileges(names=names, target=target), on=[target])])
+                return None
+            case _:
+                raise PostgresDeclareError(
+                    "A record must be a dict with a kind of role (and a name), database (and a name), schema (and a "
+                    "name and database), or grant (and a role, privileges, and database)."
+                )
+        self._add(entity)
+        return entity
+
+    def _add(self, entity: Entity) -> None:
+        """
+        Helper to index an entity that records can refer to.
+        :param entity: Any given entity.
+        """
+        if isinstance(entity, Role):
+            self.roles[entity.name] = entity
+        elif isinstance(entity, Database):
+            self.databases[entity.name] = entity
+        elif isinstance(entity, Schema):
+            self.schemas[(entity.database.name, entity.name)] = entity
+
+    def _owner(self, record: dict[str, Any]) -> Role | None:
+        """
+        Helper to resolve the owner of a database or schema record.
+        :param record: A database or schema record.
+        :return: The owning :class:`dbdeclare.entities.Role`, or None if the record doesn't have one.
+        """
+        return self._get(Role, record["owner"], self.roles) if record.get("owner") else None
+
+    @staticmethod
+    def _get(kind: type, name: str, index: dict[Any, Any], key: Any = None) -> Any:
+        """
+        Helper to look up an entity a record refers to.
+        :param kind: The class of the entity, for the error message.
+        :param name: The name of the entity, for the error message.
+        :param index: The index to look in.
+        :param key: The key to look up. Defaults to the name.
+        :return: The entity.
+        """
+        try:
+            return index[name if key is None else key]
+        except KeyError:
+            raise PostgresDeclareError(f"There is no {kind.__name__} named {name} declared before it.") from None
+
+    @staticmethod
+    def _check_new(kind: type, name: str, index: dict[Any, Any], key: Any = None) -> None:
+        """
+        Helper to make sure a record doesn't declare an entity twice.
+        :param kind: The class of the entity, for the error message.
+        :param name: The name of the entity, for the error message.
+        :param index: The index to look in.
+        :param key: The key to look up. Defaults to the name.
+        """
+        if (name if key is None else key) in index:
+            raise PostgresDeclareError(f"The {kind.__name__} {name} is already declared.")
+
+    @staticmethod
+    def _privileges(names: list[str], target: Grantable) -> list[Privilege]:
+        """
+        Helper to parse the privileges of a grant record and check they can be granted on its target.
+        :param names: The privileges as strings, like "CONNECT" or "all privileges".
+        :param target: The entity the privileges are granted on.
+        :return: A list of :class:`dbdeclare.data_structures.Privilege`.
+        """
+        allowed = target._valid_privileges()
+        privileges = []
+        for name in names:
+            try:
+                privilege = Privilege(str(name).upper())
+            except ValueError:
+                privilege = None
+            if privilege not in allowed:
+                raise InvalidPrivilegeError(
+                    f"Cannot grant {name} on {target.__class__.__name__} {target.name}. Valid privileges for it "
+                    f"include: {', '.join(sorted(allowed))}."
+                )
+            privileges.append(privilege)
+        return privileges
+
+
+def _json_array(file: TextIO, chunk_size: int) -> Iterator[Any]:
+    """
+    Streams the values of a JSON array, a chunk of the file at a time, so the whole array never has to be in memory.
+    :param file: A text file that holds a single JSON array.
+    :param chunk_size: The number of characters to read at a time.
+    :return: An Iterator of the values in the array.
+    """
+    decoder = json.JSONDecoder()
+    buffer, position, started, eof = "", 0, False, False
+    while True:
+        position = _WHITESPACE.match(buffer, position).end()  # type: ignore[union-attr]
+        if position < len(buffer):
+            char = buffer[position]
+            if not started:
+                if char != "[":
+                    raise PostgresDeclareError("A JSON file of records must hold a single array.")
+                started, position = True, position + 1
+                continue
+            if char == "]":
+                return
+            if char == ",":
+                position += 1
+                continue
+            try:
+                value, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # the value may just be cut off at the end of the chunk
+                if eof:
+                    raise
+            else:
+                yield value
+                continue
+        elif eof:
+            raise PostgresDeclareError("The JSON array of records isn't closed.")
+        # drop what's been decoded already, and read some more
+        chunk = file.read(chunk_size)
+        buffer, position, eof = buffer[position:] + chunk, 0, not chunk
+
+
+def _csv_record(row: dict[str, str]) -> dict[str, Any]:
+    """
+    Helper to turn a CSV row into a record. Empty cells are left out.
+    :param row: A row from :class:`csv.DictReader`.
+    :return: A record.
+    """
+    record: dict[str, Any] = {}
+    for key, value in row.items():
+        if not value:
+            continue
+        if key in _CSV_LISTS:
+            record[key] = [item.strip() for item in value.split("|") if item.strip()]
+        elif key in _CSV_INTEGERS:
+            record[key] = int(value)
+        elif key in _CSV_BOOLEANS:
+            record[key] = value.strip().lower() in ("true", "t", "yes", "1")
+        else:
+            record[key] = value
+    return record
+
+
+def _yaml_documents(file: TextIO) -> Iterator[Any]:
+    """
+    Streams the records in a YAML file, one node at a time. A document that holds a list is streamed item by item,
+    and any other document is a single record.
+    :param file: A text file of YAML.
+    :return: An Iterator of records.
+    """
+    try:
+        import yaml  # type: ignore[import-untyped]
+    except ImportError as e:
+        raise PostgresDeclareError(
+            "Loading YAML requires PyYAML, install it with `pip install dbdeclare[yaml]`."
+        ) from e
+
+    loader = yaml.SafeLoader(file)
+    try:
+        loader.get_event()  # stream start
+        while not loader.check_event(yaml.StreamEndEvent):
+            loader.get_event()  # document start
+            if loader.check_event(yaml.SequenceStartEvent):
+                loader.get_event()
+                while not loader.check_event(yaml.SequenceEndEvent):
+                    yield loader.construct_document(loader.compose_node(None, None))
+                loader.get_event()
+            elif not loader.check_event(yaml.DocumentEndEvent):
+                yield loader.construct_document(loader.compose_node(None, None))
+            loader.get_event()  # document end
+            loader.anchors = {}
+    finally:
+        loader.dispose()
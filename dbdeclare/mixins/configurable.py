@@ -0,0 +1,117 @@
+import re
+from abc import ABC, abstractmethod
+from typing import Mapping, Sequence, Union
+
+from sqlalchemy import TextClause, text
+
+from dbdeclare.exceptions import PostgresDeclareError
+from dbdeclare.mixins.sql import SQLBase
+
+# a value for a runtime setting, a sequence for list settings like search_path
+Setting = Union[str, int, float, bool, Sequence[str]]
+# declared settings by (role name, database name), empty for settings that apply to any role or database
+SettingStore = dict[tuple[str, str], dict[str, Setting]]
+
+_SETTING_NAME = re.compile(r"[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)?")
+_PLAIN_IDENTIFIER = re.compile(r"[a-z_][a-z0-9_$]*")
+
+
+class Configurable(ABC):
+    """
+    Mixin for entities that can have `runtime settings <https://www.postgresql.org/docs/current/config-setting.html>`_
+    declared, which every session they apply to starts with, like `work_mem` for a role. Postgres keeps these in
+    `pg_db_role_setting`, see :class:`dbdeclare.controller.Controller` `configure_all`.
+    """
+
+    name: str
+
+    def _declared_settings(self) -> SettingStore:
+        """
+        The settings declared on this entity, by the (role name, database name) pair they apply to. A pair that maps
+        to an empty dict is still managed: any setting it has in the cluster is reset.
+        :return: A :class:`dbdeclare.mixins.configurable.SettingStore`.
+        """
+        return {}
+
+    @abstractmethod
+    def _settings_target(self, database: str) -> str:
+        """
+        What an ALTER statement that changes settings of this entity applies to, like `ROLE reporting`.
+        :param database: The name of the database the settings apply in, empty for any.
+        :return: The target of the statement, without ALTER or SET.
+        """
+        pass
+
+    def _settings_statements(self, database: str, changes: Mapping[str, Setting | None]) -> Sequence[TextClause]:
+        """
+        Generates the statements that set or reset settings of this entity.
+        :param database: The name of the database the settings apply in, empty for any.
+        :param changes: The settings to change, None for those to reset.
+        :return: A Sequence of :class:`sqlalchemy.TextClause`, one per setting.
+        """
+        target = self._settings_target(database)
+        return [
+            text(f"ALTER {target} RESET {name}")
+            if value is None
+            else text(f"ALTER {target} SET {name} TO {self._setting_literal(value)}")
+            for name, value in changes.items()
+        ]
+
+    @staticmethod
+    def _check_settings(settings: Mapping[str, Setting] | None) -> dict[str, Setting] | None:
+        """
+        Helper to check the names of declared settings, since they end up in SQL as they are. Names are lowercased,
+        the way Postgres stores them.
+        :param settings: The settings as declared.
+        :return: A copy of the settings, or None if none are declared.
+        """
+        if settings is None:
+            return None
+        for name in settings:
+            if not _SETTING_NAME.fullmatch(name):
+                raise PostgresDeclareError(f"{name!r} is not the name of a setting.")
+        return {name.lower(): value for name, value in settings.items()}
+
+    @staticmethod
+    def _setting_literal(value: Setting) -> str:
+        """
+        Helper to render a setting as the value of a SET clause.
+        :param value: A declared setting.
+        :return: One or more SQL literals, ready for a :class:`sqlalchemy.TextClause`.
+        """
+        if isinstance(value, str):
+            return SQLBase._quote_text(value)
+        if isinstance(value, Sequence):
+            return ", ".join(SQLBase._quote_text(item) for item in value)
+        return SQLBase._quote_text(Configurable._stored_setting(value))
+
+    @staticmethod
+    def _stored_setting(value: Setting) -> str:
+        """
+        Helper to render a setting the way Postgres stores it in `pg_db_role_setting`, to compare with what's there.
+        :param value: A declared setting.
+        :return: The setting as a string.
+        """
+        if isinstance(value, bool):
+            return "on" if value else "off"
+        if isinstance(value, str):
+            return value
+        if isinstance(value, Sequence):
+            # Postgres quotes the items of list settings that aren't plain identifiers
+            return ", ".join(
+                item if _PLAIN_IDENTIFIER.fullmatch(item) else '"' + item.replace('"', '""') + '"' for item in value
+            )
+        return str(value)
+
+    @staticmethod
+    def _settings_catalog_statement() -> TextClause:
+        """
+        The SQL statement that reads every setting of every role and database in the cluster, one row per setting.
+        :return: A single :class:`sqlalchemy.TextClause`.
+        """
+        return text(
+            "SELECT coalesce(r.rolname, ''), coalesce(d.datname, ''), unnest(s.setconfig) "
+            "FROM pg_catalog.pg_db_role_setting s "
+            "LEFT JOIN pg_catalog.pg_roles r ON r.oid = s.setrole "
+            "LEFT JOIN pg_catalog.pg_database d ON d.oid = s.setdatabase"
+        )
@@ -2,7 +2,8 @@ from __future__ import annotations
 
 import re
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING, Sequence
+from collections import defaultdict
+from typing import TYPE_CHECKING, Collection, Iterable, Sequence
 
 from sqlalchemy import TextClause, text
 
@@ -14,12 +15,31 @@ from dbdeclare.exceptions import EntityExistsError, InvalidPrivilegeError
 if TYPE_CHECKING:
     from dbdeclare.entities.role import Role
 
+# letter codes of ACL entries, see https://www.postgresql.org/docs/current/ddl-priv.html#PRIVILEGE-ABBREVS-TABLE
+_PRIVILEGE_CODES = {
+    "r": Privilege.SELECT,
+    "w": Privilege.UPDATE,
+    "a": Privilege.INSERT,
+    "d": Privilege.DELETE,
+    "D": Privilege.TRUNCATE,
+    "x": Privilege.REFERENCES,
+    "t": Privilege.TRIGGER,
+    "X": Privilege.EXECUTE,
+    "U": Privilege.USAGE,
+    "C": Privilege.CREATE,
+    "c": Privilege.CONNECT,
+    "T": Privilege.TEMPORARY,
+}
+
 
 class Grantable(ABC):
     """
     Mixin for entities that can have privileges granted or revoked.
     """
 
+    # the owner and ACL read from the cluster, see _acl
+    _acl_cache: tuple[str, dict[str, set[Privilege]]] | None = None
+
     def __init__(self, name: str, grants: Sequence[GrantTo] | None = None):
         """
         :param name: Unique name of the grantable.
@@ -40,7 +60,7 @@ class Grantable(ABC):
                 invalid_privileges = self._invalid_privileges(privileges=set(grant.privileges))
                 if invalid_privileges:
                     formatted_invalid_privileges = ", ".join(invalid_privileges)
-                    formatted_valid_privileges = ", ".join(self._allowed_privileges())
+                    formatted_valid_privileges = ", ".join(self._valid_privileges())
                     raise InvalidPrivilegeError(
                         f"Cannot grant the following privileges for database entity of "
                         f"type {self.__class__.__name__}: {formatted_invalid_privileges}. "
@@ -113,6 +133,15 @@ class Grantable(ABC):
         """
         pass
 
+    @abstractmethod
+    def _acl_statement(self) -> TextClause:
+        """
+        The SQL statement that reads every privilege granted on this entity, which is also how grants in a DO block
+        check what's already granted.
+        :return: A single :class:`sqlalchemy.TextClause` containing the SQL to read the ACL of this entity.
+        """
+        pass
+
     def _grant_statements(self, grantee: Role, privileges: set[Privilege]) -> Sequence[TextClause]:
         """
         Generates a grant statement to commit via SQL.
@@ -148,6 +177,14 @@ class Grantable(ABC):
         """
         pass
 
+    def _valid_privileges(self) -> set[Privilege]:
+        """
+        The set of :class:`dbdeclare.data_structures.Privilege` that are allowed for this particular grantable.
+        Defaults to the privileges allowed for the entity type, override if they depend on the instance.
+        :return: The set of :class:`dbdeclare.data_structures.Privilege` that are allowed for this grantable.
+        """
+        return self._allowed_privileges()
+
     def _check_privileges(self, declared_privileges: set[Privilege], existing_privileges: set[Privilege]) -> bool:
         """
         Check the in-code declared privileges against the in-cluster existing privileges.
@@ -155,13 +192,114 @@ class Grantable(ABC):
         :param existing_privileges: A set of :class:`dbdeclare.data_structures.Privilege` declared in cluster for this entity.
         :return: True if the declared privileges are a subset of the existing privileges. Accounts for ALL_PRIVILEGES.
         """
-        if Privilege.ALL_PRIVILEGES in declared_privileges:
-            declared = self._allowed_privileges()
-            declared.discard(Privilege.ALL_PRIVILEGES)
-        else:
-            declared = declared_privileges
+        return self._expand_privileges(declared_privileges).issubset(existing_privileges)
+
+    def _expand_privileges(self, privileges: set[Privilege]) -> set[Privilege]:
+        """
+        Replaces ALL_PRIVILEGES with the individual privileges it stands for on this grantable, which is how they show
+        up in the cluster.
+        :param privileges: A set of :class:`dbdeclare.data_structures.Privilege`.
+        :return: A set of :class:`dbdeclare.data_structures.Privilege` without ALL_PRIVILEGES.
+        """
+        if Privilege.ALL_PRIVILEGES in privileges:
+            expanded = self._valid_privileges()
+            expanded.discard(Privilege.ALL_PRIVILEGES)
+            privileges = expanded
+        uncheckable = privileges - set(_PRIVILEGE_CODES.values())
+        if uncheckable:
+            raise InvalidPrivilegeError(
+                f"Cannot check {', '.join(sorted(uncheckable))} on {self.__class__.__name__} {self._grant_name}: "
+                f"dbdeclare doesn't know how Postgres lists it in an ACL."
+            )
+        return privileges
+
+    def _acl(self, include_owner: bool = False) -> dict[str, set[Privilege]]:
+        """
+        Every privilege granted on this grantable in the cluster. The ACL is read once, then reused for every grantee
+        until the cache is cleared.
+        :param include_owner: Whether to include the privileges of the owner, which the owner can't lose.
+        :return: A dict mapping grantee names (PUBLIC for everyone) to the privileges they have.
+        """
+        if self._acl_cache is None:
+            self._acl_cache = self._fetch_acl()
+        owner, privileges = self._acl_cache
+        return {grantee: p for grantee, p in privileges.items() if include_owner or grantee != owner}
+
+    @abstractmethod
+    def _fetch_acl(self) -> tuple[str, dict[str, set[Privilege]]]:
+        """
+        Reads the owner and every privilege granted on this grantable from the cluster. Needed to verify and sync
+        privileges.
+        :return: A tuple of the owner's name and a dict mapping grantee names to the privileges they have.
+        """
+        pass
+
+    def _clear_acl_cache(self) -> None:
+        """
+        Forget the ACL read from the cluster, so the next check reads it again.
+        """
+        self._acl_cache = None
+
+    @classmethod
+    def _acl_from_rows(cls, acls: Iterable[str]) -> dict[str, set[Privilege]]:
+        """
+        Helper to parse the raw ACL entries of a grantable into privileges per grantee.
+        :param acls: Raw acl strings from Postgres in the form of grantee=xxxx/grantor.
+        :return: A dict mapping grantee names (PUBLIC for everyone) to the privileges they have.
+        """
+        privileges: dict[str, set[Privilege]] = {}
+        for acl in acls:
+            parsed = cls._parse_acl(acl)
+            if parsed:
+                privileges.setdefault(parsed[0] or "PUBLIC", set()).update(parsed[1])
+        return privileges
+
+    @staticmethod
+    def _mask(privileges: Iterable[Privilege]) -> int:
+        """
+        Helper to pack privileges into a bitmask, one bit per :class:`dbdeclare.data_structures.Privilege`.
+        :param privileges: The privileges to pack.
+        :return: The bitmask as an int.
+        """
+        members = list(Privilege)
+        mask = 0
+        for privilege in privileges:
+            mask |= 1 << members.index(privilege)
+        return mask
 
-        return declared.issubset(existing_privileges)
+    @staticmethod
+    def _unmask(mask: int) -> set[Privilege]:
+        """
+        Helper to unpack a bitmask made by `_mask` back into privileges.
+        :param mask: The bitmask as an int.
+        :return: A set of :class:`dbdeclare.data_structures.Privilege`.
+        """
+        return {privilege for i, privilege in enumerate(Privilege) if mask & (1 << i)}
+
+    @staticmethod
+    def _collapse(grants: dict[Grantable, set[Privilege]]) -> dict[Grantable, set[Privilege]]:
+        """
+        Replaces grants on every member of a grant group (like every table of a schema) with a single grant on the
+        group, as long as the privileges on each member are identical. Grants that can't be collapsed are kept as is.
+        :param grants: A dict mapping grantables to the privileges for a single grantee.
+        :return: A dict like the one provided, with collapsible grants replaced by groups.
+        """
+        collapsed: dict[Grantable, set[Privilege]] = {}
+        grouped: dict[Grantable, dict[Grantable, set[Privilege]]] = defaultdict(dict)
+        for target, privileges in grants.items():
+            group = target._grant_group()
+            if group is None:
+                collapsed[target] = privileges
+            else:
+                grouped[group][target] = privileges
+
+        for group, members in grouped.items():
+            distinct_privileges = {frozenset(privileges) for privileges in members.values()}
+            if len(distinct_privileges) == 1 and group._covered_by(members):
+                collapsed[group] = set(distinct_privileges.pop())
+            else:
+                collapsed.update(members)
+        return collapsed
 
     def _invalid_privileges(self, privileges: set[Privilege]) -> set[Privilege]:
         """
@@ -169,7 +307,34 @@ class Grantable(ABC):
         :param privileges: A set of :class:`dbdeclare.data_structures.Privilege` to check for invalid entries.
         :return: A set of :class:`dbdeclare.data_structures.Privilege` that are invalid. Empty if all valid.
         """
-        return privileges.difference(self._allowed_privileges())
+        return privileges.difference(self._valid_privileges())
+
+    def _grant_identity(self) -> str:
+        """
+        Identifies this grantable within a declaration, the same in every process, for checkpoints and timing history.
+        Names are only unique within a database, so grantables that live in one are qualified by its identity.
+        :return: The grantable type and name, followed by the database it lives in, if any.
+        """
+        content = getattr(self, "database_content", None)
+        database = getattr(content, "database", None) or getattr(self, "database", None)
+        identity = f"{self.__class__.__name__} {self._grant_name}"
+        return f"{identity} in {database._identity()}" if isinstance(database, Entity) else identity
+
+    def _grant_group(self) -> Grantable | None:
+        """
+        The grantable that stands in for a group of grantables this one belongs to, if any. When a grantee is granted
+        identical privileges on every member of a group, the group is granted instead, in a single statement.
+        :return: The :class:`dbdeclare.mixins.Grantable` representing the group, or None if this isn't grouped.
+        """
+        return None
+
+    def _covered_by(self, targets: Collection[Grantable]) -> bool:
+        """
+        Check if the provided grantables make up every member of the group this grantable represents.
+        :param targets: A Collection of :class:`dbdeclare.mixins.Grantable` that claim this as their group.
+        :return: True if the targets cover every member of this group. False for grantables that aren't groups.
+        """
+        return False
 
     @staticmethod
     def _format_privileges(privileges: set[Privilege]) -> str:
@@ -188,50 +353,47 @@ class Grantable(ABC):
         :param grants: A Sequence of :class:`dbdeclare.data_structures.GrantTo`.
         :param target_entity: The target to check against. Likely `self` or similar.
         """
-        target_index = target_entity.entities.index(target_entity)
-        for grant in grants:
-            for grantee in grant.to:
-                grantee_index = target_entity.entities.index(grantee)
-                if grantee_index > target_index:
-                    target_entity.entities.insert(target_index, target_entity.entities.pop(grantee_index))
+        Grantable._order_before(
+            roles=[grantee for grant in grants for grantee in grant.to], target_entity=target_entity
+        )
 
-    def _extract_privileges(self, acl: str, grantee: Role) -> set[Privilege]:
+    @staticmethod
+    def _order_before(roles: Iterable[Entity], target_entity: Entity) -> None:
+        """
+        Moves roles a target refers to ahead of it in its registry, if they're declared after it.
+        :param roles: The roles that must exist prior to the target.
+        :param target_entity: The target to check against. Likely `self` or similar.
         """
-        Extracts a set of :class:`dbdeclare.data_structures.Privilege` from a Postgres ACL statement.
-        The expected format is: grantee=xxxx/grantor, where grantee and grantor are roles and the "x"s indicate
-        potential privilege codes. If the grantee is absent, the grantee is PUBLIC.
+        entities = target_entity._registry.entities
+        target_index = entities.index(target_entity)
+        for role in roles:
+            role_index = entities.index(role)
+            if role_index > target_index:
+                entities.insert(target_index, entities.pop(role_index))
+
+    @classmethod
+    def _parse_acl(cls, acl: str) -> tuple[str, set[Privilege]] | None:
+        """
+        Parses a Postgres ACL statement into its grantee and a set of :class:`dbdeclare.data_structures.Privilege`.
+        Grant options (marked with a "*") are ignored, and so are privileges dbdeclare doesn't declare, like MAINTAIN
+        in the default ACL of a table's owner since Postgres 17. An empty grantee means PUBLIC.
         :param acl: Raw acl string from Postgres in the form of grantee=xxxx/grantor.
-        :param grantee: The :class:`dbdeclare.entities.Role` to filter to.
-        :return: A set of :class:`dbdeclare.data_structures.Privilege` that exist in cluster, granted to the grantee.
+        :return: A tuple of the grantee name and its privileges, or None if the acl could not be parsed.
         """
-        m = re.match(r"(\w*)=(\w*)\/(\w*)", acl)
+        m = re.match(r"(\w*)=([\w*]*)\/(\w*)", acl)
         if m:
-            if m.group(1) == grantee.name:
-                raw_privileges = m.group(2)
-                return {self._code_to_privilege(code) for code in raw_privileges}
-        return set()
+            privileges = {cls._code_to_privilege(code) for code in m.group(2) if code != "*"}
+            return m.group(1), {privilege for privilege in privileges if privilege is not None}
+        return None
 
     @staticmethod
-    def _code_to_privilege(code: str) -> Privilege:
+    def _code_to_privilege(code: str) -> Privilege | None:
         """
         Wrapper around a dictionary to map from a letter code to a typed privilege.
         :param code: A letter code representing a privilege. See `Postgres docs <https://www.postgresql.org/docs/current/ddl-priv.html#PRIVILEGE-ABBREVS-TABLE>`_ for more.
-        :return: A :class:`dbdeclare.data_structures.Privilege` corresponding to the provided letter code.
-        """
-        return {
-            "r": Privilege.SELECT,
-            "w": Privilege.UPDATE,
-            "a": Privilege.INSERT,
-            "d": Privilege.DELETE,
-            "D": Privilege.TRUNCATE,
-            "x": Privilege.REFERENCES,
-            "t": Privilege.TRIGGER,
-            "X": Privilege.EXECUTE,
-            "U": Privilege.USAGE,
-            "C": Privilege.CREATE,
-            "c": Privilege.CONNECT,
-            "T": Privilege.TEMPORARY,
-        }[code]
+        :return: A :class:`dbdeclare.data_structures.Privilege` corresponding to the provided letter code, or None for privileges dbdeclare doesn't declare.
+        """
+        return _PRIVILEGE_CODES.get(code)
 
 
 class GrantableEntity(Grantable, Entity):
@@ -1,10 +1,28 @@
 from abc import ABC, abstractmethod
-from typing import Any, Sequence
+from typing import Any, Iterator, Sequence
 
-from sqlalchemy import Engine, Row, TextClause
+from sqlalchemy import Connection, Engine, Row, TextClause
+from sqlalchemy.exc import DBAPIError
+
+from dbdeclare.exceptions import PipelineError, PostgresDeclareError
+
+# how many steps are sent per round trip in pipeline mode, see SQLBase._pipeline_sql
+PIPELINE_BATCH_SIZE = 500
 
 
 class SQLBase(ABC):
+    # whether this entity can be created inside a transaction, like a pipeline or a DO block. Some statements, like
+    # CREATE DATABASE, can't be
+    _create_in_transaction = True
+
+    @abstractmethod
+    def _sql_engine(self) -> Engine:
+        """
+        The engine this entity's statements run on.
+        :return: A :class:`sqlalchemy.Engine` for the cluster or for the database this entity belongs to.
+        """
+        pass
+
     @staticmethod
     def _commit_sql(engine: Engine, statements: Sequence[TextClause]) -> None:
         """
@@ -17,6 +35,151 @@ class SQLBase(ABC):
                 conn.execution_options(isolation_level="AUTOCOMMIT").execute(statement)
                 conn.commit()
 
+    @staticmethod
+    def _commit_guarded(engine: Engine, statements: Sequence[TextClause]) -> bool | None:
+        """
+        Commits guarded SQL statements, like `DROP ROLE IF EXISTS`, which raise a notice instead of an error when
+        there's nothing to do. Requires psycopg 3 to see the notices.
+        :param engine: A :class:`sqlalchemy.Engine` for the target database.
+        :param statements: A Sequence of :class:`sqlalchemy.TextClause` statements to commit.
+        :return: True if the statements did something, False if they raised a notice that they were skipped, and None without committing anything if the driver isn't psycopg 3.
+        """
+        notices: list[str] = []
+
+        def collect(diagnostic: Any) -> None:
+            notices.append(diagnostic.message_primary)
+
+        with engine.connect() as conn:
+            driver: Any = conn.connection.driver_connection
+            if type(driver).__module__.split(".")[0] != "psycopg":
+                return None
+            driver.add_notice_handler(collect)
+            try:
+                for statement in statements:
+                    conn.execution_options(isolation_level="AUTOCOMMIT").execute(statement)
+                    conn.commit()
+            finally:
+                driver.remove_notice_handler(collect)
+        return not notices
+
+    @staticmethod
+    def _pipeline_sql(engine: Engine, steps: Sequence[tuple[str, Sequence[TextClause]]]) -> list[list[tuple[Any, ...]]]:
+        """
+        Sends the statements of many independent steps to the database in one round trip, using psycopg's
+        `pipeline mode <https://www.psycopg.org/psycopg3/docs/advanced/pipeline.html>`_, instead of waiting for each
+        statement in turn. The statements run in a single transaction, so if one fails, none of them are committed.
+        Drivers without pipeline mode run the statements one at a time, in the same single transaction.
+        :param engine: A :class:`sqlalchemy.Engine` for the target database.
+        :param steps: A Sequence of steps, each a name (like the entity it works on) and the statements it runs.
+        :return: The rows returned by the last statement of each step, in order. Empty for statements that return none.
+        :raises PipelineError: If a statement fails. It names the step the statement belongs to.
+        """
+        with engine.begin() as conn:
+            driver: Any = conn.connection.driver_connection
+            if not hasattr(driver, "pipeline"):
+                results = []
+                for step, statements in steps:
+                    try:
+                        rows: list[tuple[Any, ...]] = []
+                        for statement in statements:
+                            result = conn.execute(statement)
+                            rows = [tuple(row) for row in result] if result.returns_rows else []
+                        results.append(rows)
+                    except DBAPIError as error:
+                        raise PipelineError(f"{step} failed: {error.orig}", step=step) from error
+                return results
+
+            cursors = []
+            current = ""
+            try:
+                with driver.pipeline():
+                    for current, statements in steps:
+                        for statement in statements:
+                            compiled = statement.compile(dialect=engine.dialect)
+                            cursor = driver.cursor()
+                            cursor.execute(str(compiled), compiled.params)
+                            cursors.append((current, cursor))
+            except driver.Error as error:
+                # psycopg raises an error on whichever statement it reads results for next, the statement that
+                # failed is the first one without a result, or the one being sent
+                failed = next((step for step, cursor in cursors if cursor.pgresult is None), current)
+                raise PipelineError(f"{failed} failed: {error}", step=failed) from error
+            last = {step: cursor for step, cursor in cursors}
+            return [last[step].fetchall() if step in last and last[step].description else [] for step, _ in steps]
+
+    @staticmethod
+    def _do_sql(engine: Engine, statements: Sequence[str]) -> list[str]:
+        """
+        Runs PL/pgSQL statements in the database in a single `DO <https://www.postgresql.org/docs/current/sql-do.html>`_
+        block, so they take one round trip, and collects the notices they raise. Requires psycopg 3.
+        :param engine: A :class:`sqlalchemy.Engine` for the target database.
+        :param statements: A Sequence of PL/pgSQL statements, which can use the text[] variables `_before` and `_after`.
+        :return: The message of every notice raised, in order.
+        """
+        notices: list[str] = []
+        block = "\n".join(
+            ["DO $dbdeclare$", "DECLARE _before text[]; _after text[];", "BEGIN", *statements, "END", "$dbdeclare$"]
+        )
+        with engine.begin() as conn:
+            driver: Any = SQLBase._psycopg(conn.connection.driver_connection)
+
+            def collect(diagnostic: Any) -> None:
+                notices.append(diagnostic.message_primary)
+
+            driver.add_notice_handler(collect)
+            try:
+                # straight to the driver, so nothing in the block is taken for a bind parameter
+                conn.connection.cursor().execute(block)
+            finally:
+                driver.remove_notice_handler(collect)
+        return notices
+
+    @staticmethod
+    def _literal_sql(conn: Connection, statement: TextClause) -> str:
+        """
+        Renders a statement with its bind parameters inlined as literals, so it can be embedded in a DO block.
+        Requires psycopg 3. Rendering doesn't run anything, so a whole block can be rendered on one connection.
+        :param conn: An open :class:`sqlalchemy.Connection` to the target database.
+        :param statement: A single :class:`sqlalchemy.TextClause` statement.
+        :return: The SQL of the statement, with no bind parameters left.
+        """
+        compiled = statement.compile(dialect=conn.dialect)
+        driver = SQLBase._psycopg(conn.connection.driver_connection)
+        # psycopg is only required for this, so it's only imported once it's known to be there
+        from psycopg import ClientCursor
+
+        return ClientCursor(driver).mogrify(str(compiled), compiled.params)
+
+    @staticmethod
+    def _quote(value: str) -> str:
+        """
+        Quotes a string as an SQL literal.
+        :param value: Any string.
+        :return: The string in single quotes, with any single quotes in it escaped.
+        """
+        return "'" + value.replace("'", "''") + "'"
+
+    @staticmethod
+    def _quote_text(value: str) -> str:
+        """
+        Quotes a string as an SQL literal to embed in a :class:`sqlalchemy.TextClause`, where a colon could otherwise
+        start a bind parameter.
+        :param value: Any string.
+        :return: The string in single quotes, with any single quotes in it escaped, and any colons escaped for SQLAlchemy.
+        """
+        return SQLBase._quote(value).replace(":", "\\:")
+
+    @staticmethod
+    def _psycopg(driver: Any) -> Any:
+        """
+        Checks that a DBAPI connection is from psycopg 3, for what only it can do.
+        :param driver: A DBAPI connection.
+        :return: The same connection.
+        """
+        if type(driver).__module__.split(".")[0] != "psycopg":
+            raise PostgresDeclareError(f"Running DO blocks requires psycopg 3, not {type(driver).__module__}.")
+        return driver
+
     @staticmethod
     def _fetch_sql(engine: Engine, statement: TextClause) -> Sequence[Row[Any]]:
         """
@@ -29,6 +192,21 @@ class SQLBase(ABC):
             result = conn.execute(statement)
             return result.all()
 
+    @staticmethod
+    def _stream_sql(engine: Engine, statement: TextClause, batch_size: int = 1000) -> Iterator[Row[Any]]:
+        """
+        Streams results from the database specified with the provided engine using a server-side cursor, so that
+        only `batch_size` rows are held in memory at a time.
+        :param engine: A :class:`sqlalchemy.Engine` for the target database.
+        :param statement: A single :class:`sqlalchemy.TextClause` statement to fetch information from the database.
+        :param batch_size: The number of rows to fetch from the server per round trip.
+        :return: An Iterator of :class:`sqlalchemy.Row` that contain the results of the query provided.
+        """
+        with engine.connect() as conn:
+            result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(statement)
+            for row in result:
+                yield row
+
 
 class SQLCreatable(SQLBase):
     @abstractmethod
@@ -61,6 +239,32 @@ class SQLCreatable(SQLBase):
         """
         pass
 
+    def _create_guarded(self) -> bool | None:
+        statements = self._create_if_missing_statements()
+        if statements is None:
+            return None
+        return self._commit_guarded(engine=self._sql_engine(), statements=statements)
+
+    def _drop_guarded(self) -> bool | None:
+        statements = self._drop_if_exists_statements()
+        if statements is None:
+            return None
+        return self._commit_guarded(engine=self._sql_engine(), statements=statements)
+
+    def _create_if_missing_statements(self) -> Sequence[TextClause] | None:
+        """
+        The SQL statements that create this entity if it doesn't exist, and raise a notice if it does.
+        :return: A Sequence of :class:`sqlalchemy.TextClause`, or None if this entity type doesn't have any.
+        """
+        return None
+
+    def _drop_if_exists_statements(self) -> Sequence[TextClause] | None:
+        """
+        The SQL statements that drop this entity if it exists, and raise a notice if it doesn't.
+        :return: A Sequence of :class:`sqlalchemy.TextClause`, or None if this entity type doesn't have any.
+        """
+        return None
+
     @abstractmethod
     def _exists_statement(self) -> TextClause:
         """
@@ -0,0 +1,249 @@
+from collections import defaultdict
+
+from dbdeclare.data_structures.privileges import Privilege
+from dbdeclare.entities.database import Database
+from dbdeclare.entities.role import Role
+from dbdeclare.mixins.grantable import Grantable
+from dbdeclare.registry import Registry
+
+
+class PrivilegeIndex:
+    """
+    Answers who can do what according to a declaration, without asking the cluster. Privileges are declared one way
+    only, on the grantee (each role's grants), so this indexes them the other way too, by target, along with role
+    memberships. A role has the privileges granted to it, to the roles it inherits from (those it's a member of,
+    directly or through other roles, as long as `inherit` isn't turned off along the way), and every privilege on
+    what it or those roles own. Superusers have every privilege, and every role has the privileges Postgres grants
+    to PUBLIC on new databases (CONNECT and TEMPORARY) unless told otherwise.
+
+    Direct lookups take constant time, and the rest take time in proportion to the roles involved. The index is a
+    snapshot: build a new one if the declaration changes.
+    """
+
+    def __init__(self, registry: Registry | None = None, public_defaults: bool = True):
+        """
+        :param registry: The :class:`dbdeclare.registry.Registry` to index. Defaults to the current one.
+        :param public_defaults: Whether every role has the privileges Postgres grants to PUBLIC by default. Turn this off if you revoke them, say with `sync_all` and no unmanaged roles.
+        """
+        self.public_defaults = public_defaults
+        self._roles: dict[str, Role] = {}
+        self._grants: dict[str, dict[Grantable, set[Privilege]]] = {}
+        self._grantees: dict[Grantable, dict[str, set[Privilege]]] = defaultdict(dict)
+        # the roles each role is a direct member of, and the other way around
+        self._parents: dict[str, set[str]] = defaultdict(set)
+        self._children: dict[str, set[str]] = defaultdict(set)
+        self._inherited: dict[str, frozenset[str]] = {}
+        self._inheritors: dict[str, frozenset[str]] = {}
+
+        for entity in (registry or Registry.current()).entities:
+            if isinstance(entity, Role):
+                self._add_role(entity)
+                for target, privileges in entity.grants.items():
+                    self._grants[entity.name][target] = set(privileges)
+                    self._grantees[target][entity.name] = set(privileges)
+        self._superusers = frozenset(name for name, role in self._roles.items() if role.superuser)
+
+    def grants(self, role: Role | str) -> dict[Grantable, set[Privilege]]:
+        """
+        The privileges granted to a role directly, as declared.
+        :param role: A :class:`dbdeclare.entities.Role` or its name.
+        :return: A dict mapping each target to the privileges granted on it.
+        """
+        return self._grants.get(self._name(role), {})
+
+    def grantees(self, target: Grantable) -> dict[str, set[Privilege]]:
+        """
+        The roles granted privileges on a target directly, as declared.
+        :param target: Any grantable, like a database, schema, or table.
+        :return: A dict mapping the name of each grantee to the privileges granted to it.
+        """
+        return self._grantees.get(target, {})
+
+    def memberships(self, role: Role | str) -> frozenset[str]:
+        """
+        Every role a role is a member of, directly or through other roles, whether it inherits their privileges or
+        not (it can still `SET ROLE` to them).
+        :param role: A :class:`dbdeclare.entities.Role` or its name.
+        :return: The names of the roles.
+        """
+        found: set[str] = set()
+        pending = [self._name(role)]
+        while pending:
+            for parent in self._parents.get(pending.pop(), ()):
+                if parent not in found:
+                    found.add(parent)
+                    pending.append(parent)
+        return frozenset(found)
+
+    def inherited(self, role: Role | str) -> frozenset[str]:
+        """
+        The roles whose privileges a role has: itself, and every role it's a member of through roles that all inherit.
+        :param role: A :class:`dbdeclare.entities.Role` or its name.
+        :return: The names of the roles, including the role itself.
+        """
+        name = self._name(role)
+        if name not in self._inherited:
+            found = {name}
+            pending = [name]
+            while pending:
+                member = pending.pop()
+                if self._inherits(member):
+                    for parent in self._parents.get(member, ()):
+                        if parent not in found:
+                            found.add(parent)
+                            pending.append(parent)
+            self._inherited[name] = frozenset(found)
+        return self._inherited[name]
+
+    def privileges(self, role: Role | str, target: Grantable) -> set[Privilege]:
+        """
+        The privileges a role effectively has on a target, with `ALL PRIVILEGES` spelled out.
+        :param role: A :class:`dbdeclare.entities.Role` or its name.
+        :param target: Any grantable, like a database, schema, or table.
+        :return: A set of :class:`dbdeclare.data_structures.Privilege`.
+        """
+        name = self._name(role)
+        if self._superuser(name):
+            return target._expand_privileges({Privilege.ALL_PRIVILEGES})
+        return self._privileges_of(roles=self.inherited(name), target=target)
+
+    def inherited_privileges(self, role: Role | str, target: Grantable) -> set[Privilege]:
+        """
+        The privileges a role has on a target through the roles it inherits from alone, leaving out what's granted to
+        the role itself. Anything granted to the role that's in here is redundant.
+        :param role: A :class:`dbdeclare.entities.Role` or its name.
+        :param target: Any grantable, like a database, schema, or table.
+        :return: A set of :class:`dbdeclare.data_structures.Privilege`.
+        """
+        name = self._name(role)
+        return self._privileges_of(roles=self.inherited(name) - {name}, target=target)
+
+    def can(self, role: Role | str, privilege: Privilege, target: Grantable) -> bool:
+        """
+        Checks if a role effectively has a privilege on a target.
+        :param role: A :class:`dbdeclare.entities.Role` or its name.
+        :param privilege: A :class:`dbdeclare.data_structures.Privilege`.
+        :param target: Any grantable, like a database, schema, or table.
+        :return: True if the role has the privilege, False otherwise.
+        """
+        return target._expand_privileges({privilege}).issubset(self.privileges(role=role, target=target))
+
+    def who_can(self, privilege: Privilege, target: Grantable) -> set[str]:
+        """
+        Finds every role that effectively has a privilege on a target, among those declared and those they refer to.
+        :param privilege: A :class:`dbdeclare.data_structures.Privilege`.
+        :param target: Any grantable, like a database, schema, or table.
+        :return: The names of the roles.
+        """
+        wanted = target._expand_privileges({privilege})
+        if wanted.issubset(self._public(target)):
+            return set(self._roles)
+        holders: set[str] = set()
+        owner = self._owner(target)
+        if owner is not None:
+            holders.add(owner)
+        for grantees in self._grantee_maps(target):
+            holders.update(
+                name
+                for name, privileges in grantees.items()
+                if Privilege.ALL_PRIVILEGES in privileges or wanted.issubset(privileges)
+            )
+        # being a superuser isn't inherited, unlike privileges
+        found = set(self._superusers)
+        for holder in holders:
+            found |= self._inheritors_of(holder)
+        return found
+
+    def _privileges_of(self, roles: frozenset[str], target: Grantable) -> set[Privilege]:
+        """
+        Helper to combine the privileges on a target of several roles.
+        :param roles: The names of the roles.
+        :param target: Any grantable.
+        :return: A set of :class:`dbdeclare.data_structures.Privilege`, with `ALL PRIVILEGES` spelled out.
+        """
+        if self._owner(target) in roles:
+            return target._expand_privileges({Privilege.ALL_PRIVILEGES})
+        privileges = self._public(target)
+        for grantees in self._grantee_maps(target):
+            for name in roles:
+                privileges |= grantees.get(name, set())
+        return target._expand_privileges(privileges) if Privilege.ALL_PRIVILEGES in privileges else privileges
+
+    def _add_role(self, role: Role) -> None:
+        """
+        Helper to index a role and its memberships, along with any roles it refers to that aren't declared.
+        :param role: A :class:`dbdeclare.entities.Role`.
+        """
+        self._roles[role.name] = role
+        self._grants.setdefault(role.name, {})
+        for parent in role.in_role or []:
+            self._member(member=role, parent=parent)
+        for member in [*(role.role or []), *(role.admin or [])]:
+            self._member(member=member, parent=role)
+
+    def _member(self, member: Role, parent: Role) -> None:
+        """
+        Helper to index a membership.
+        :param member: The member :class:`dbdeclare.entities.Role`.
+        :param parent: The :class:`dbdeclare.entities.Role` it's a member of.
+        """
+        self._parents[member.name].add(parent.name)
+        self._children[parent.name].add(member.name)
+        # roles declared elsewhere still decide whether they inherit
+        self._roles.setdefault(member.name, member)
+        self._roles.setdefault(parent.name, parent)
+
+    def _inherits(self, name: str) -> bool:
+        role = self._roles.get(name)
+        return role is None or role.inherit is not False
+
+    def _inheritors_of(self, name: str) -> frozenset[str]:
+        """
+        Helper for the inverse of :meth:`inherited`: the roles that have a role's privileges.
+        :param name: The name of a role.
+        :return: The names of the roles, including the role itself.
+        """
+        if name not in self._inheritors:
+            found = {name}
+            pending = [name]
+            while pending:
+                for child in self._children.get(pending.pop(), ()):
+                    if child not in found and self._inherits(child):
+                        found.add(child)
+                        pending.append(child)
+            self._inheritors[name] = frozenset(found)
+        return self._inheritors[name]
+
+    def _superuser(self, name: str) -> bool:
+        return name in self._superusers
+
+    def _grantee_maps(self, target: Grantable) -> list[dict[str, set[Privilege]]]:
+        """
+        Helper to find the grants on a target, and on the group it belongs to (like every table in a schema).
+        :param target: Any grantable.
+        :return: A list of dicts mapping the name of each grantee to the privileges granted to it.
+        """
+        group = target._grant_group()
+        maps = [self._grantees.get(target, {})]
+        if group is not None:
+            maps.append(self._grantees.get(group, {}))
+        return maps
+
+    def _public(self, target: Grantable) -> set[Privilege]:
+        """
+        Helper to find the privileges every role has on a target through PUBLIC.
+        :param target: Any grantable.
+        :return: A set of :class:`dbdeclare.data_structures.Privilege`.
+        """
+        if self.public_defaults and isinstance(target, Database):
+            return {Privilege.CONNECT, Privilege.TEMPORARY}
+        return set()
+
+    @staticmethod
+    def _owner(target: Grantable) -> str | None:
+        owner = getattr(target, "owner", None)
+        return owner.name if isinstance(owner, Role) else None
+
+    @staticmethod
+    def _name(role: Role | str) -> str:
+        return role if isinstance(role, str) else role.name
@@ -0,0 +1,280 @@
+"""
+A pytest plugin that builds your declarations once into template databases and clones them for tests. Enable it in
+your `conftest.py`:
+
+    pytest_plugins = ["dbdeclare.pytest_plugin"]
+"""
+import os
+from contextlib import contextmanager
+from hashlib import sha256
+from itertools import count
+from typing import Iterator
+from zlib import crc32
+
+import pytest
+from sqlalchemy import Engine, create_engine, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateTable
+
+from dbdeclare.controller import Controller
+from dbdeclare.diagnostics import APPLICATION_NAME
+from dbdeclare.entities.database import Database
+from dbdeclare.entities.database_content import DatabaseContent
+from dbdeclare.entities.role import Role
+from dbdeclare.exceptions import PostgresDeclareError
+from dbdeclare.registry import Registry, bind_engine
+
+# Postgres truncates names to 63 characters, so leave room for the suffixes of templates and clones
+_NAME_LENGTH = 40
+
+
+class TemplateDatabases:
+    """
+    Builds a declaration into one template database per declared :class:`dbdeclare.entities.Database`, and clones
+    them. Templates are named after the declaration, so they're reused until it changes.
+    """
+
+    def __init__(self, engine: Engine, registry: Registry):
+        """
+        :param engine: A :class:`sqlalchemy.Engine` that defines the connection to a Postgres instance/cluster.
+        :param registry: The :class:`dbdeclare.registry.Registry` to build templates of.
+        """
+        self.engine = engine
+        self.registry = registry
+        self.key = self._key(registry)
+        self.databases = [entity for entity in registry.entities if isinstance(entity, Database)]
+        self.roles = [entity for entity in registry.entities if isinstance(entity, Role)]
+        self.templates = {db.name: f"{db.name[:_NAME_LENGTH]}_tpl_{self.key[:12]}" for db in self.databases}
+
+    def build(self, rebuild: bool = False) -> bool:
+        """
+        Builds the templates, unless they already exist. Builds are serialized with an advisory lock, so concurrent
+        test sessions (and xdist workers) build them only once.
+        :param rebuild: Whether to drop and build the templates even if they exist.
+        :return: True if the templates were built, False if they were reused.
+        """
+        with bind_engine(self.engine), self._lock():
+            existing = self._existing_templates()
+            if existing == set(self.templates.values()) and not rebuild:
+                # roles live outside databases, so they may be gone even though the templates are still there
+                for role in self.roles:
+                    role._safe_create(guarded=True)
+                return False
+            with Registry():
+                for name in existing:
+                    Database(name=name, is_template=True)._safe_drop()
+                for db in self.databases:
+                    if Database(name=db.name)._exists():
+                        raise PostgresDeclareError(
+                            f"Cannot build a template of Database {db.name}: it already exists. Templates are built "
+                            f"under the declared name and renamed once they're done, so drop it first."
+                        )
+
+            Controller.run_all(self.engine, registry=self.registry)
+            statements = []
+            for db in self.databases:
+                # a database can't be renamed while anyone is connected to it
+                for db_engine in db._db_engines.values():
+                    db_engine.dispose()
+                db._db_engines.clear()
+                template = self.templates[db.name]
+                statements.append(text(f"ALTER DATABASE {db.name} RENAME TO {template}"))
+                statements.append(text(f"ALTER DATABASE {template} WITH IS_TEMPLATE true ALLOW_CONNECTIONS false"))
+            Database._commit_sql(engine=self.engine, statements=statements)
+            return True
+
+    def clone(self, suffix: str) -> dict[str, Database]:
+        """
+        Clones every template, and grants the privileges and sets the runtime settings declared on each database on its
+        clone, since those belong to the database rather than its contents and aren't copied from the template. Clones
+        left over from an interrupted session with the same suffix are dropped first.
+        :param suffix: Appended to the name of each declared database to name its clone.
+        :return: A dict mapping the name of each declared database to its clone.
+        """
+        clones = {}
+        with Registry(), bind_engine(self.engine):
+            for db in self.databases:
+                clone = Database(
+                    name=f"{db.name[:_NAME_LENGTH]}_{suffix}",
+                    owner=db.owner,
+                    template=self.templates[db.name],
+                    connection_limit=db.connection_limit,
+                    tablespace=db.tablespace,
+                    settings=db.settings,
+                )
+                clone._safe_drop(guarded=True)
+                clone._create()
+                statements = list(clone._settings_statements(database="", changes=clone.settings or {}))
+                for role in self.roles:
+                    privileges = role.grants.get(db)
+                    if privileges:
+                        clone._grant(grantee=role, privileges=privileges)
+                    settings = (role.database_settings or {}).get(db)
+                    if settings:
+                        statements.extend(role._settings_statements(database=clone.name, changes=settings))
+                if statements:
+                    Database._commit_sql(engine=self.engine, statements=statements)
+                clones[db.name] = clone
+        return clones
+
+    def drop(self, clones: dict[str, Database]) -> None:
+        """
+        Drops clones, disconnecting anyone still connected to them.
+        :param clones: The clones returned by :meth:`clone`.
+        """
+        with bind_engine(self.engine):
+            for clone in clones.values():
+                for db_engine in clone._db_engines.values():
+                    db_engine.dispose()
+                clone._safe_drop(guarded=True)
+
+    def drop_templates(self) -> None:
+        """
+        Drops the templates of this declaration. Roles are left in place.
+        """
+        with bind_engine(self.engine), self._lock(), Registry():
+            for name in self._existing_templates():
+                Database(name=name, is_template=True)._safe_drop()
+
+    def _existing_templates(self) -> set[str]:
+        """
+        Helper to find which of this declaration's templates exist.
+        :return: The names of the templates that exist.
+        """
+        statement = text("SELECT datname FROM pg_database WHERE datistemplate AND datname = ANY(:names)").bindparams(
+            names=list(self.templates.values())
+        )
+        return {row[0] for row in Database._fetch_sql(engine=self.engine, statement=statement)}
+
+    @contextmanager
+    def _lock(self) -> Iterator[None]:
+        """
+        Holds a session-level advisory lock shared by every declaration, since a template is built under the
+        declared name of its database, which other declarations may share.
+        """
+        # a single bigint key, which doesn't collide with the two-part keys of run_shared
+        key = crc32(b"dbdeclare:templates")
+        with self.engine.connect() as conn:
+            conn.execute(text("SELECT pg_advisory_lock(:key)").bindparams(key=key))
+            try:
+                yield
+            finally:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)").bindparams(key=key))
+                conn.commit()
+
+    @staticmethod
+    def _key(registry: Registry) -> str:
+        """
+        Identifies a declaration by its fingerprint and by what its entities would create, so that, say, a changed
+        column or role attribute gets a new template too.
+        :param registry: The :class:`dbdeclare.registry.Registry` to identify.
+        :return: A hex digest.
+        """
+        digest = sha256(registry.fingerprint().encode())
+        dialect = postgresql.dialect()  # type: ignore[no-untyped-call]
+        for entity in registry.entities:
+            if isinstance(entity, DatabaseContent):
+                for table in entity.base.metadata.sorted_tables:
+                    digest.update(f"{CreateTable(table).compile(dialect=dialect)}\n".encode())
+            elif hasattr(entity, "_create_statements"):
+                for statement in entity._create_statements():
+                    digest.update(f"{statement}\n".encode())
+        return digest.hexdigest()
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("dbdeclare")
+    group.addoption("--dbdeclare-url", help="SQLAlchemy URL of the cluster to build templates and clones in")
+    group.addoption("--dbdeclare-declarations", help="path to the Python file that declares your entities")
+    group.addoption("--dbdeclare-rebuild", action="store_true", help="rebuild the templates even if they exist")
+    parser.addini("dbdeclare_url", help="SQLAlchemy URL of the cluster to build templates and clones in")
+    parser.addini("dbdeclare_declarations", help="path to the Python file that declares your entities")
+
+
+def _option(config: pytest.Config, name: str) -> str | None:
+    """
+    Helper to read a plugin setting from the command line, then the ini file.
+    :param config: The pytest config.
+    :param name: Name of the setting, without the `dbdeclare_` prefix.
+    :return: The setting, or None if it isn't set.
+    """
+    value = config.getoption(f"dbdeclare_{name}") or config.getini(f"dbdeclare_{name}")
+    return str(value) if value else None
+
+
+@pytest.fixture(scope="session")
+def dbdeclare_engine(request: pytest.FixtureRequest) -> Engine:
+    """
+    The cluster to build templates and clones in, from `--dbdeclare-url`, the `dbdeclare_url` ini setting, or the
+    `DBDECLARE_URL` environment variable. Override it to use your own engine.
+    """
+    url = _option(request.config, "url") or os.environ.get("DBDECLARE_URL")
+    if not url:
+        pytest.fail("dbdeclare needs a cluster: pass --dbdeclare-url, or set dbdeclare_url or DBDECLARE_URL")
+    return create_engine(url, connect_args={"application_name": APPLICATION_NAME})
+
+
+@pytest.fixture(scope="session")
+def dbdeclare_registry(request: pytest.FixtureRequest) -> Registry:
+    """
+    The declarations to build templates of, from the file given by `--dbdeclare-declarations` or the
+    `dbdeclare_declarations` ini setting. Override it to declare them in your `conftest.py` instead.
+    """
+    path = _option(request.config, "declarations")
+    if not path:
+        pytest.fail("dbdeclare needs declarations: pass --dbdeclare-declarations or override dbdeclare_registry")
+    from dbdeclare.cli import _load
+
+    return _load(path)
+
+
+@pytest.fixture(scope="session")
+def dbdeclare_templates(
+    request: pytest.FixtureRequest, dbdeclare_engine: Engine, dbdeclare_registry: Registry
+) -> TemplateDatabases:
+    """
+    The declarations built into template databases, once per declaration rather than once per session.
+    """
+    templates = TemplateDatabases(engine=dbdeclare_engine, registry=dbdeclare_registry)
+    templates.build(rebuild=bool(request.config.getoption("dbdeclare_rebuild")))
+    return templates
+
+
+def _worker(config: pytest.Config) -> str:
+    """
+    Helper to name the running pytest-xdist worker.
+    :param config: The pytest config.
+    :return: The worker id, like `gw0`, or `main` without xdist.
+    """
+    return str(getattr(config, "workerinput", {}).get("workerid", "main"))
+
+
+@pytest.fixture(scope="session")
+def dbdeclare_databases(
+    request: pytest.FixtureRequest, dbdeclare_templates: TemplateDatabases
+) -> Iterator[dict[str, Engine]]:
+    """
+    Clones of the declared databases for this worker, shared by all of its tests.
+    :return: A dict mapping the name of each declared database to an engine for its clone.
+    """
+    clones = dbdeclare_templates.clone(suffix=_worker(request.config))
+    with bind_engine(dbdeclare_templates.engine):
+        yield {name: clone.db_engine() for name, clone in clones.items()}
+    dbdeclare_templates.drop(clones)
+
+
+_test_clones = count()
+
+
+@pytest.fixture
+def dbdeclare_test_databases(
+    request: pytest.FixtureRequest, dbdeclare_templates: TemplateDatabases
+) -> Iterator[dict[str, Engine]]:
+    """
+    Clones of the declared databases for a single test.
+    :return: A dict mapping the name of each declared database to an engine for its clone.
+    """
+    clones = dbdeclare_templates.clone(suffix=f"{_worker(request.config)}_t{next(_test_clones)}")
+    with bind_engine(dbdeclare_templates.engine):
+        yield {name: clone.db_engine() for name, clone in clones.items()}
+    dbdeclare_templates.drop(clones)
@@ -0,0 +1,114 @@
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from hashlib import sha256
+from typing import TYPE_CHECKING, Any, Iterator
+
+from sqlalchemy import Engine
+
+if TYPE_CHECKING:
+    from dbdeclare.entities.entity import Entity
+
+
+class Registry:
+    """
+    A single declaration: the ordered collection of entities to reconcile against a cluster. Entities register into
+    whichever registry is current when they are declared. Use a registry as a context manager to make it current,
+    which is scoped to the running thread or asyncio task, so independent declarations can be built and applied
+    concurrently without interfering with each other.
+    """
+
+    def __init__(self, check_if_any_exist: bool = False):
+        """
+        :param check_if_any_exist: Flag to set existence check behavior for every entity in this registry. If `True`, entities raise an exception during _safe_create if they already exist, and during _safe_drop if they do not exist.
+        """
+        self.entities: list["Entity"] = []
+        self.check_if_any_exist = check_if_any_exist
+        self._tokens: list[Token["Registry"]] = []
+
+    def __enter__(self) -> "Registry":
+        self._tokens.append(_current_registry.set(self))
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        _current_registry.reset(self._tokens.pop())
+
+    def __getstate__(self) -> dict[str, Any]:
+        # tokens only make sense in the context that created them
+        state = self.__dict__.copy()
+        state["_tokens"] = []
+        return state
+
+    def register(self, entity: "Entity") -> None:
+        """
+        Appends an entity to the running list of entities in this registry.
+        :param entity: Any given entity.
+        """
+        # TODO add code to make sure there are no duplicate entities
+        self.entities.append(entity)
+
+    def fingerprint(self) -> str:
+        """
+        Identifies the declaration by every entity in it and every privilege its roles are granted, so two processes
+        that declare the same things get the same fingerprint.
+        :return: A hex digest.
+        """
+        digest = sha256()
+        for entity in self.entities:
+            digest.update(f"{entity._identity()}\n".encode())
+            grants = [
+                f"{target._grant_identity()}: {', '.join(sorted(privileges))}"
+                for target, privileges in getattr(entity, "grants", {}).items()
+            ]
+            for grant in sorted(grants):
+                digest.update(f"  {grant}\n".encode())
+        return digest.hexdigest()
+
+    @staticmethod
+    def current() -> "Registry":
+        """
+        Getter for the registry that newly declared entities register into.
+        :return: The :class:`dbdeclare.registry.Registry` made current in this context, or the default registry.
+        """
+        return _current_registry.get()
+
+
+@contextmanager
+def bind_engine(engine: Engine | None) -> Iterator[None]:
+    """
+    Binds the cluster engine for the running thread or asyncio task, restoring the previous one on exit.
+    :param engine: A :class:`sqlalchemy.Engine` that defines the connection to a Postgres instance/cluster.
+    """
+    token = _current_engine.set(engine)
+    try:
+        yield
+    finally:
+        _current_engine.reset(token)
+
+
+@contextmanager
+def tagged(*tags: str) -> Iterator[None]:
+    """
+    Tags every entity declared in the running thread or asyncio task until exit, so they can be selected by tag with
+    :class:`dbdeclare.data_structures.Selector`. Nested blocks add to the tags of the enclosing ones.
+    :param tags: Any strings, like the name of a tenant.
+    """
+    token = _current_tags.set(_current_tags.get() | frozenset(tags))
+    try:
+        yield
+    finally:
+        _current_tags.reset(token)
+
+
+def current_engine() -> Engine | None:
+    """
+    Getter for the cluster engine bound in this context.
+    :return: A :class:`sqlalchemy.Engine` if one has been bound, otherwise None.
+    """
+    return _current_engine.get()
+
+
+# entities declared outside any `with Registry():` block land here, as they always have
+_default_registry = Registry()
+_current_registry: ContextVar[Registry] = ContextVar("dbdeclare_registry", default=_default_registry)
+_current_engine: ContextVar[Engine | None] = ContextVar("dbdeclare_engine", default=None)
+_current_tags: ContextVar[frozenset[str]] = ContextVar("dbdeclare_tags", default=frozenset())
@@ -9,6 +9,7 @@ from dbdeclare.entities.database_content import DatabaseContent
 from dbdeclare.entities.entity import Entity
 from dbdeclare.entities.role import Role
 from dbdeclare.entities.schema import Schema
+from dbdeclare.registry import Registry, bind_engine
 from tests.helpers import YieldFixture
 
 
@@ -24,10 +25,14 @@ def engine() -> Engine:
 
 @pytest.fixture(scope="module")
 def entity(engine: Engine) -> YieldFixture[Type[Entity]]:
-    Entity._engine = engine
-    yield Entity
-    Entity.entities = []
-    Entity.check_if_any_exist = False
+    with Registry(), bind_engine(engine):
+        yield Entity
+
+
+@pytest.fixture
+def registry() -> YieldFixture[Registry]:
+    with Registry() as registry, bind_engine(None):
+        yield registry
 
 
 @pytest.fixture(scope="module")
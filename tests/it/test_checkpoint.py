@@ -0,0 +1,73 @@
+from pathlib import Path
+from typing import Any
+
+import pytest
+from sqlalchemy import Engine, text
+
+from dbdeclare.checkpoint import Checkpoint, FileCheckpoint, TableCheckpoint
+from dbdeclare.controller import Controller
+from dbdeclare.data_structures import GrantOn, Privilege
+from dbdeclare.entities import Database, Role, Schema
+from dbdeclare.registry import Registry
+
+
+@pytest.fixture(params=["file", "table"])
+def checkpoint(request: pytest.FixtureRequest, tmp_path: Path, engine: Engine) -> Checkpoint:
+    if request.param == "file":
+        return FileCheckpoint(tmp_path / "checkpoint.jsonl")
+    return TableCheckpoint(engine)
+
+
+def test_resume(registry: Registry, engine: Engine, checkpoint: Checkpoint, monkeypatch: pytest.MonkeyPatch) -> None:
+    db = Database(name="resumed")
+    reader = Role(name="resumed_reader", grants=[GrantOn(privileges=[Privilege.CONNECT], on=[db])])
+    schema = Schema(name="resumed_schema", database=db)
+
+    def failover(*args: Any, **kwargs: Any) -> None:
+        raise ConnectionError("failover")
+
+    # the run fails part way, after the database and role are created
+    monkeypatch.setattr(schema, "_safe_create", failover)
+    with pytest.raises(ConnectionError):
+        Controller.run_all(engine, checkpoint=checkpoint)
+    monkeypatch.undo()
+
+    # resuming doesn't touch what was completed, not even to check it exists
+    monkeypatch.setattr(db, "_safe_create", failover)
+    monkeypatch.setattr(reader, "_safe_create", failover)
+    Controller.run_all(engine, checkpoint=checkpoint, resume=True)
+    monkeypatch.undo()
+    assert Controller._all_exist()
+
+    # a completed run leaves nothing to resume
+    key = f"{registry.fingerprint()} {engine.url.render_as_string()}"
+    assert checkpoint.load(key) == set()
+
+    Controller.remove_all()
+    if isinstance(checkpoint, TableCheckpoint):
+        checkpoint._commit_sql(engine=engine, statements=[text(f"DROP TABLE {checkpoint.table}")])
+
+
+def test_resume_same_names_in_databases(
+    registry: Registry, engine: Engine, checkpoint: Checkpoint, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    first, second = Database(name="resumed_a"), Database(name="resumed_b")
+    schemas = [Schema(name="log", database=db) for db in (first, second)]
+    reader = Role(name="resumed_reader", grants=[GrantOn(privileges=[Privilege.USAGE], on=schemas)])
+    assert reader._grant_step(schemas[0]) != reader._grant_step(schemas[1])
+
+    def failover(*args: Any, **kwargs: Any) -> None:
+        raise ConnectionError("failover")
+
+    # the run fails after granting on the first schema
+    monkeypatch.setattr(schemas[1], "_safe_grant", failover)
+    with pytest.raises(ConnectionError):
+        Controller.run_all(engine, checkpoint=checkpoint)
+    monkeypatch.undo()
+
+    Controller.run_all(engine, checkpoint=checkpoint, resume=True)
+    assert all(schema._grants_exist(grantee=reader, privileges={Privilege.USAGE}) for schema in schemas)
+
+    Controller.remove_all()
+    if isinstance(checkpoint, TableCheckpoint):
+        checkpoint._commit_sql(engine=engine, statements=[text(f"DROP TABLE {checkpoint.table}")])
@@ -0,0 +1,42 @@
+import json
+from pathlib import Path
+
+import pytest
+from sqlalchemy import Engine
+
+from dbdeclare.cli import main
+
+declarations = """
+from dbdeclare.data_structures import GrantOn, Privilege
+from dbdeclare.entities import Database, Role
+
+db = Database(name="cli_db")
+Role(name="cli_reader", grants=[GrantOn(privileges=[Privilege.CONNECT], on=[db])])
+"""
+
+
+@pytest.fixture
+def declarations_file(tmp_path: Path) -> Path:
+    file = tmp_path / "cli_declarations.py"
+    file.write_text(declarations)
+    return file
+
+
+def test_cli(declarations_file: Path, engine: Engine, capsys: pytest.CaptureFixture[str]) -> None:
+    args = [str(declarations_file), "--url", engine.url.render_as_string(hide_password=False)]
+
+    assert main(["plan", *args]) == 0
+    output = capsys.readouterr().out
+    assert "create Database cli_db" in output
+    assert "create Role cli_reader" in output
+    assert "grant CONNECT on Database cli_db to cli_reader" in output
+    assert main(["verify", *args]) == 2
+
+    assert main(["apply", *args]) == 0
+    capsys.readouterr()
+    assert main(["verify", *args, "--format", "json"]) == 0
+    reports = json.loads(capsys.readouterr().out)
+    assert reports[0]["operation"] == "verify" and reports[0]["changes"] == []
+
+    assert main(["destroy", *args]) == 0
+    assert main(["verify", *args]) == 2
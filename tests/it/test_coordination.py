@@ -0,0 +1,58 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Timer
+
+from sqlalchemy import Engine, text
+
+from dbdeclare.controller import Controller
+from dbdeclare.coordination import PartitionClaims
+from dbdeclare.data_structures import GrantOn, Privilege
+from dbdeclare.entities import Database, Role, Schema
+from dbdeclare.registry import Registry, bind_engine
+
+
+def test_claims_done_by_another_replica(engine: Engine) -> None:
+    done_by_a: list[int] = []
+    done_by_b: list[int] = []
+    with PartitionClaims(engine, namespace="test_done") as a:
+        assert a.run("phase", [1, 2, 3], done_by_a.append) == 3
+        with PartitionClaims(engine, namespace="test_done") as b:
+            assert b.run("phase", [1, 2, 3], done_by_b.append) == 0
+    assert sorted(done_by_a) == [1, 2, 3] and done_by_b == []
+
+    # once a replica is gone, so are its done markers
+    with PartitionClaims(engine, namespace="test_done") as c:
+        assert c.run("phase", [1, 2, 3], done_by_b.append) == 3
+
+
+def test_claims_taken_over_from_dead_replica(engine: Engine) -> None:
+    claims = PartitionClaims(engine, namespace="test_dead")
+    # a replica claims the second partition, then dies without finishing it
+    dead = engine.connect()
+    dead.execute(text("SELECT pg_advisory_lock(:key, 1)").bindparams(key=claims._key("phase:work")))
+    Timer(0.3, dead.invalidate).start()
+
+    done: list[str] = []
+    with claims:
+        assert claims.run("phase", ["first", "second", "third"], done.append) == 3
+    assert sorted(done) == ["first", "second", "third"]
+
+
+def test_run_shared(engine: Engine) -> None:
+    def replica(_: int) -> tuple[Registry, int]:
+        # every replica declares the same things in its own registry, like separate processes would
+        with Registry() as registry:
+            for tenant in ["a", "b", "c", "d"]:
+                db = Database(name=f"shared_{tenant}")
+                Schema(name="events", database=db)
+                Role(name=f"shared_{tenant}_reader", grants=[GrantOn(privileges=[Privilege.CONNECT], on=[db])])
+        with bind_engine(engine):
+            return registry, Controller.run_shared(registry=registry)
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        results = list(executor.map(replica, range(3)))
+
+    registry = results[0][0]
+    # four databases with their readers, four sets of schemas, and four sets of grants
+    assert sum(reconciled for _, reconciled in results) >= 12
+    assert Controller._all_exist(engine, registry=registry)
+    Controller.remove_all(engine, registry=registry)
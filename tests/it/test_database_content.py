@@ -1,12 +1,16 @@
 import pytest
+from sqlalchemy import Engine, text
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
+from dbdeclare.controller import Controller
 from dbdeclare.data_structures.grant_to import GrantTo
 from dbdeclare.data_structures.privileges import Privilege
 from dbdeclare.entities.database import Database
-from dbdeclare.entities.database_content import DatabaseContent
+from dbdeclare.entities.database_content import DatabaseContent, SchemaTables
 from dbdeclare.entities.role import Role
 from dbdeclare.entities.schema import Schema
-from tests.conftest import SimpleTable
+from dbdeclare.registry import Registry, bind_engine
+from tests.conftest import FancyTable, SimpleTable, schema_name
 
 
 @pytest.fixture
@@ -59,6 +63,30 @@ def test_table_revoke(simple_db_content: DatabaseContent, grant_role: Role, tabl
     grant_role._safe_drop()
 
 
+@pytest.mark.order(after="test_table_revoke", before="test_drop")
+def test_schema_grant_collapse(simple_db_content: DatabaseContent, table_privileges: set[Privilege]) -> None:
+    simple_db_content.collapse_grants = True
+    collapse_role = Role(name="collapse_role")
+    collapse_role._safe_create()
+    fancy_table = simple_db_content.tables[FancyTable.__tablename__]
+    fancy_table.grant(grants=[GrantTo(privileges=list(table_privileges), to=[collapse_role])])
+
+    collapsed = collapse_role._collapsed_grants()
+    assert list(collapsed) == [simple_db_content._schema_group(schema_name)]
+    assert isinstance(list(collapsed)[0], SchemaTables)
+
+    collapse_role._safe_grant()
+    assert fancy_table._grants_exist(grantee=collapse_role, privileges=table_privileges)
+    assert collapse_role._grants_exist()
+    group = simple_db_content._schema_group(schema_name)
+    assert group._acl()["collapse_role"] == table_privileges
+
+    collapse_role._safe_revoke()
+    assert not fancy_table._grants_exist(grantee=collapse_role, privileges=table_privileges)
+    collapse_role._safe_drop()
+    simple_db_content.collapse_grants = False
+
+
 @pytest.mark.order(after="test_table_revoke")
 def test_column_grant_does_not_exist() -> None:
     # TODO
@@ -83,3 +111,91 @@ def test_drop(simple_db_content: DatabaseContent, simple_db: Database) -> None:
     assert not simple_db_content._exists()
     # clean up database
     simple_db._safe_drop()
+
+
+class FirstAclBase(DeclarativeBase):
+    pass
+
+
+class One(FirstAclBase):
+    __tablename__ = "one"
+    __table_args__ = {"schema": "acl_a"}
+    id: Mapped[int] = mapped_column(primary_key=True)
+
+
+class Two(FirstAclBase):
+    __tablename__ = "two"
+    __table_args__ = {"schema": "acl_b"}
+    id: Mapped[int] = mapped_column(primary_key=True)
+
+
+class SecondAclBase(DeclarativeBase):
+    pass
+
+
+class Three(SecondAclBase):
+    __tablename__ = "three"
+    __table_args__ = {"schema": "acl_b"}
+    id: Mapped[int] = mapped_column(primary_key=True)
+
+
+def test_table_acls_per_database(engine: Engine, monkeypatch: pytest.MonkeyPatch) -> None:
+    with Registry() as registry:
+        db = Database(name="acl_db")
+        schemas = [Schema(name=name, database=db) for name in ("acl_a", "acl_b")]
+        first = DatabaseContent(name="first", sqlalchemy_base=FirstAclBase, database=db, schemas=schemas)
+        second = DatabaseContent(name="second", sqlalchemy_base=SecondAclBase, database=db, schemas=schemas)
+    Controller.run_all(engine, registry=registry)
+    with bind_engine(engine):
+        # a table nobody declared, whose schema and name each match a declared table
+        db._commit_sql(engine=db.db_engine(), statements=[text("CREATE TABLE acl_a.two (id int)")])
+
+        reads: list[DatabaseContent] = []
+        fetch = DatabaseContent._fetch_table_acls
+
+        def counted(content: DatabaseContent) -> dict[tuple[str, str], tuple[str, dict[str, set[Privilege]]]]:
+            reads.append(content)
+            return fetch(content)
+
+        monkeypatch.setattr(DatabaseContent, "_fetch_table_acls", counted)
+        first._clear_cache()
+        assert first._table_acl(schema="acl_a", table_name="one")[0] == "postgres"
+        assert second._table_acl(schema="acl_b", table_name="three")[0] == "postgres"
+        assert len(reads) == 1
+        assert set(db._table_acls or {}) == {("acl_a", "one"), ("acl_b", "two"), ("acl_b", "three")}
+        db._commit_sql(engine=db.db_engine(), statements=[text("DROP TABLE acl_a.two")])
+    Controller.remove_all(engine, registry=registry)
+
+
+class SyncBase(DeclarativeBase):
+    pass
+
+
+class Declared(SyncBase):
+    __tablename__ = "declared"
+    id: Mapped[int] = mapped_column(primary_key=True)
+
+
+class Granted(SyncBase):
+    __tablename__ = "granted"
+    id: Mapped[int] = mapped_column(primary_key=True)
+
+
+class Untouched(SyncBase):
+    __tablename__ = "untouched"
+    id: Mapped[int] = mapped_column(primary_key=True)
+
+
+def test_sync_only_wraps_tables_with_grants(engine: Engine) -> None:
+    with Registry() as registry:
+        db = Database(name="wrap_db")
+        reader = Role(name="wrap_reader")
+        content = DatabaseContent(name="wrap_content", sqlalchemy_base=SyncBase, database=db)
+        content.tables["declared"].grant(grants=[GrantTo(privileges=[Privilege.SELECT], to=[reader])])
+    Controller.run_all(engine, registry=registry)
+    with bind_engine(engine):
+        db._commit_sql(engine=db.db_engine(), statements=[text("GRANT INSERT ON granted TO wrap_reader")])
+
+    assert Controller.sync_all(engine, registry=registry) == ["revoke INSERT on Table granted from wrap_reader"]
+    assert {table.name for table in content.tables._wrapped()} == {"declared", "granted"}
+    Controller.remove_all(engine, registry=registry)
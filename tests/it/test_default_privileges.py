@@ -0,0 +1,96 @@
+import pytest
+from sqlalchemy import text
+
+from dbdeclare.data_structures.default_object import DefaultObject
+from dbdeclare.data_structures.grant_to import GrantTo
+from dbdeclare.data_structures.privileges import Privilege
+from dbdeclare.entities.database import Database
+from dbdeclare.entities.default_privileges import DefaultPrivileges
+from dbdeclare.entities.entity import Entity
+from dbdeclare.entities.role import Role
+from dbdeclare.entities.schema import Schema
+from dbdeclare.exceptions import InvalidPrivilegeError
+from tests.helpers import YieldFixture
+
+
+@pytest.fixture(scope="module")
+def owner_role(entity: Entity) -> YieldFixture[Role]:
+    yield Role(name="default_owner")
+
+
+@pytest.fixture(scope="module")
+def default_schema(entity: Entity, simple_db: Database, owner_role: Role) -> YieldFixture[Schema]:
+    yield Schema(name="default_schema", database=simple_db, owner=owner_role)
+
+
+@pytest.fixture(scope="module")
+def default_privileges(
+    entity: Entity, simple_db: Database, owner_role: Role, default_schema: Schema
+) -> YieldFixture[DefaultPrivileges]:
+    yield DefaultPrivileges(
+        name="future_tables",
+        database=simple_db,
+        owner=owner_role,
+        object_type=DefaultObject.TABLES,
+        schema=default_schema,
+    )
+
+
+def test_does_not_exist(
+    default_privileges: DefaultPrivileges, simple_db: Database, owner_role: Role, grant_role: Role
+) -> None:
+    simple_db._safe_create()
+    owner_role._safe_create()
+    grant_role._safe_create()
+    assert not default_privileges._exists()
+    assert not default_privileges._grants_exist(grantee=grant_role, privileges={Privilege.SELECT})
+
+
+@pytest.mark.order(after="test_does_not_exist")
+def test_grant(
+    default_privileges: DefaultPrivileges, default_schema: Schema, owner_role: Role, grant_role: Role
+) -> None:
+    default_schema._safe_create()
+    default_privileges.grant(grants=[GrantTo(privileges=[Privilege.SELECT], to=[grant_role])])
+    grant_role._safe_grant()
+    assert default_privileges._exists()
+    assert default_privileges._grants_exist(grantee=grant_role, privileges={Privilege.SELECT})
+
+    # a table created later by the owner is covered without any further grants
+    with default_schema.database.db_engine().connect() as conn:
+        conn.execute(text(f"SET ROLE {owner_role.name}"))
+        conn.execute(text(f"CREATE TABLE {default_schema.name}.later (id int)"))
+        conn.commit()
+        granted = conn.execute(
+            text(f"SELECT has_table_privilege('{grant_role.name}', '{default_schema.name}.later', 'SELECT')")
+        ).scalar()
+    assert granted
+
+
+@pytest.mark.order(after="test_grant")
+def test_revoke(default_privileges: DefaultPrivileges, grant_role: Role) -> None:
+    grant_role._safe_revoke()
+    assert not default_privileges._grants_exist(grantee=grant_role, privileges={Privilege.SELECT})
+
+
+@pytest.mark.order(after="test_revoke")
+def test_clean_up(simple_db: Database, owner_role: Role, grant_role: Role) -> None:
+    simple_db._safe_drop()
+    grant_role._safe_drop()
+    owner_role._safe_drop()
+
+
+def test_invalid_privilege(default_privileges: DefaultPrivileges, grant_role: Role) -> None:
+    with pytest.raises(InvalidPrivilegeError):
+        default_privileges.grant(grants=[GrantTo(privileges=[Privilege.EXECUTE], to=[grant_role])])
+
+
+def test_no_schema_for_schemas(simple_db: Database, owner_role: Role, default_schema: Schema) -> None:
+    with pytest.raises(InvalidPrivilegeError):
+        DefaultPrivileges(
+            name="future_schemas",
+            database=simple_db,
+            owner=owner_role,
+            object_type=DefaultObject.SCHEMAS,
+            schema=default_schema,
+        )
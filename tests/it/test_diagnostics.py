@@ -0,0 +1,47 @@
+from threading import Timer
+
+from sqlalchemy import Engine, text
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from dbdeclare.controller import Controller
+from dbdeclare.diagnostics import LockSampler
+from dbdeclare.entities import Database, DatabaseContent
+from dbdeclare.registry import Registry
+
+
+class LockedBase(DeclarativeBase):
+    pass
+
+
+class Ledger(LockedBase):
+    __tablename__ = "ledger"
+    id: Mapped[int] = mapped_column(primary_key=True)
+
+
+def test_lock_sampler(registry: Registry, engine: Engine) -> None:
+    db = Database(name="locked")
+    DatabaseContent(name="main", sqlalchemy_base=LockedBase, database=db)
+    Controller.run_all(engine)
+
+    # another session holds a lock on the table for a while, so dropping it has to wait
+    blocker = db.db_engine().connect()
+    blocker.execute(text("LOCK TABLE ledger IN ACCESS SHARE MODE"))
+    blocker_pid = blocker.execute(text("SELECT pg_backend_pid()")).scalar_one()
+    Timer(0.5, blocker.close).start()
+
+    with LockSampler(engine, interval=0.05) as sampler:
+        Controller.remove_all()
+
+    assert sampler.error is None
+    wait = sampler.waits[0]
+    assert "DROP TABLE ledger" in wait.query
+    assert wait.blocking_pid == blocker_pid
+    assert wait.database == "locked" and wait.lock_type == "relation"
+    assert wait.seconds > 0.2
+
+
+def test_lock_sampler_quiet(registry: Registry, engine: Engine) -> None:
+    Database(name="unlocked")
+    reports = Controller.run_on_clusters([engine], operation="run_all", max_concurrent=1, sample_locks=True)
+    assert reports[0].succeeded and reports[0].lock_waits == []
+    Controller.remove_all(engine)
@@ -0,0 +1,102 @@
+import io
+import json
+
+import pytest
+from sqlalchemy import Engine, text
+
+from dbdeclare.controller import Controller
+from dbdeclare.data_structures.grant_on import GrantOn
+from dbdeclare.data_structures.privileges import Privilege
+from dbdeclare.entities.database import Database
+from dbdeclare.entities.role import Role
+from dbdeclare.entities.schema import Schema
+from dbdeclare.importer import Importer
+from dbdeclare.registry import Registry
+from tests.helpers import YieldFixture
+
+
+@pytest.fixture
+def declared(engine: Engine) -> YieldFixture[Registry]:
+    with Registry() as declared:
+        group = Role(name="imp_group")
+        member = Role(name="imp_member", login=True, connection_limit=3, in_role=[group])
+        db = Database(name="imp_db", owner=group)
+        schema = Schema(name="imp_schema", database=db)
+        member.grant(
+            grants=[
+                GrantOn(privileges=[Privilege.CONNECT], on=[db]),
+                GrantOn(privileges=[Privilege.USAGE], on=[schema]),
+            ]
+        )
+    Controller.run_all(engine, registry=declared)
+    yield declared
+    Controller.remove_all(engine, registry=declared)
+
+
+def test_records(declared: Registry, engine: Engine) -> None:
+    records = list(Importer(engine, batch_size=2).records())
+    assert {"kind": "role", "name": "imp_group"} in records
+    assert {"kind": "role", "name": "imp_member", "login": True, "connection_limit": 3, "in_role": ["imp_group"]} in (
+        records
+    )
+    assert {"kind": "database", "name": "imp_db", "owner": "imp_group"} in records
+    assert {"kind": "schema", "name": "imp_schema", "database": "imp_db"} in records
+    assert {"kind": "grant", "role": "imp_member", "privileges": ["CONNECT"], "database": "imp_db"} in records
+    assert {
+        "kind": "grant",
+        "role": "imp_member",
+        "privileges": ["USAGE"],
+        "database": "imp_db",
+        "schema": "imp_schema",
+    } in records
+    # groups come before their members
+    names = [r["name"] for r in records if r["kind"] == "role"]
+    assert names.index("imp_group") < names.index("imp_member")
+
+
+def test_records_valid_until(engine: Engine) -> None:
+    # a password that never expires is stored as infinity, which has no datetime to go with it
+    Role._commit_sql(
+        engine=engine,
+        statements=[
+            text("CREATE ROLE imp_forever LOGIN VALID UNTIL 'infinity'"),
+            text("CREATE ROLE imp_expiring LOGIN VALID UNTIL '2031-01-01 00:00:00+00'"),
+        ],
+    )
+    try:
+        records = {r["name"]: r for r in Importer(engine).records() if r["kind"] == "role"}
+        assert records["imp_forever"] == {"kind": "role", "name": "imp_forever", "login": True}
+        assert records["imp_expiring"]["valid_until"].startswith("2031-01-01")
+    finally:
+        Role._commit_sql(engine=engine, statements=[text("DROP ROLE imp_forever"), text("DROP ROLE imp_expiring")])
+
+
+def test_declare(declared: Registry, registry: Registry, engine: Engine) -> None:
+    entities = {(e.__class__.__name__, e.name): e for e in Importer(engine).declare()}
+    member = entities[("Role", "imp_member")]
+    db = entities[("Database", "imp_db")]
+    schema = entities[("Schema", "imp_schema")]
+    assert isinstance(member, Role) and isinstance(db, Database)
+    assert [r.name for r in member.in_role or []] == ["imp_group"]
+    assert db.owner == entities[("Role", "imp_group")]
+    assert member.grants == {db: {Privilege.CONNECT}, schema: {Privilege.USAGE}}
+    assert Controller._all_exist(engine)
+
+
+def test_write_json(declared: Registry, engine: Engine) -> None:
+    file = io.StringIO()
+    Importer(engine).write_json(file)
+    lines = file.getvalue().splitlines()
+    assert [json.loads(line) for line in lines] == list(Importer(engine).records())
+
+
+def test_write_python(declared: Registry, registry: Registry, engine: Engine) -> None:
+    file = io.StringIO()
+    Importer(engine).write_python(file)
+    exec(compile(file.getvalue(), "imported.py", "exec"), {})
+    assert {(e.__class__.__name__, e.name) for e in registry.entities} >= {
+        ("Role", "imp_group"),
+        ("Role", "imp_member"),
+        ("Database", "imp_db"),
+        ("Schema", "imp_schema"),
+    }
@@ -0,0 +1,45 @@
+from sqlalchemy import Engine, text
+
+from dbdeclare.controller import Controller
+from dbdeclare.data_structures import GrantOn, Privilege
+from dbdeclare.entities import Database, Role, Schema
+from dbdeclare.privilege_index import PrivilegeIndex
+from dbdeclare.registry import Registry
+
+
+def test_matches_cluster(registry: Registry, engine: Engine) -> None:
+    db = Database(name="idx_db")
+    schema = Schema(name="analytics", database=db)
+    readers = Role(name="idx_readers", grants=[GrantOn(privileges=[Privilege.USAGE], on=[schema])])
+    writers = Role(
+        name="idx_writers", in_role=[readers], grants=[GrantOn(privileges=[Privilege.ALL_PRIVILEGES], on=[db])]
+    )
+    Role(name="idx_alice", in_role=[writers])
+    bob = Role(name="idx_bob", in_role=[writers], inherit=False)
+    owner = Role(name="idx_owner", role=[bob])
+    owned = Schema(name="owned", database=db, owner=owner)
+    Role(name="idx_root", superuser=True)
+    Controller.run_all(engine)
+    index = PrivilegeIndex()
+
+    try:
+        roles = [e.name for e in registry.entities if isinstance(e, Role)]
+        with engine.connect() as conn:
+            for role in roles:
+                for privilege in [Privilege.CONNECT, Privilege.CREATE, Privilege.TEMPORARY]:
+                    statement = text("SELECT has_database_privilege(:role, 'idx_db', :privilege)")
+                    expected = conn.execute(statement, {"role": role, "privilege": privilege.value}).scalar()
+                    assert index.can(role, privilege, db) == expected, (role, privilege)
+        with db.db_engine().connect() as conn:
+            for role in roles:
+                for target in [schema, owned]:
+                    for privilege in [Privilege.USAGE, Privilege.CREATE]:
+                        statement = text("SELECT has_schema_privilege(:role, :schema, :privilege)")
+                        params = {"role": role, "schema": target.name, "privilege": privilege.value}
+                        assert index.can(role, privilege, target) == conn.execute(statement, params).scalar(), (
+                            role,
+                            privilege,
+                            target.name,
+                        )
+    finally:
+        Controller.remove_all(engine)
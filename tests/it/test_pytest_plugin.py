@@ -0,0 +1,133 @@
+from pathlib import Path
+
+import pytest
+from sqlalchemy import Engine, create_engine, inspect, text
+
+from dbdeclare.data_structures import GrantOn, Privilege
+from dbdeclare.entities import Database, DatabaseContent, Role, Schema, Tablespace
+from dbdeclare.pytest_plugin import TemplateDatabases
+from dbdeclare.registry import Registry, bind_engine
+from tests.conftest import MyBase
+from tests.helpers import YieldFixture
+
+pytest_plugins = ["pytester"]
+
+
+@pytest.fixture
+def templates(engine: Engine) -> YieldFixture[TemplateDatabases]:
+    with Registry() as registry:
+        db = Database(name="plugin_db", settings={"statement_timeout": "30s"})
+        schema = Schema(name="simple_schema", database=db)
+        DatabaseContent(name="plugin_content", database=db, schemas=[schema], sqlalchemy_base=MyBase)
+        Role(
+            name="plugin_reader",
+            login=True,
+            grants=[GrantOn(privileges=[Privilege.CONNECT], on=[db])],
+            database_settings={db: {"work_mem": "8MB"}},
+        )
+    templates = TemplateDatabases(engine=engine, registry=registry)
+    yield templates
+    templates.drop_templates()
+    with bind_engine(engine):
+        for role in templates.roles:
+            role._safe_drop()
+
+
+def test_template_databases(engine: Engine, templates: TemplateDatabases) -> None:
+    assert templates.build()
+    # a template is reused as long as the declaration doesn't change
+    assert not TemplateDatabases(engine=engine, registry=templates.registry).build()
+
+    clones = templates.clone(suffix="test")
+    assert list(clones) == ["plugin_db"]
+    clone = clones["plugin_db"]
+    assert clone.name == "plugin_db_test"
+    with bind_engine(engine), clone.db_engine().connect() as conn:
+        assert set(inspect(conn).get_table_names(schema="simple_schema")) == {"fancy_table"}
+        assert conn.execute(
+            text("SELECT has_database_privilege('plugin_reader', current_database(), 'CONNECT')")
+        ).scalar()
+        # settings of the database and of roles in it aren't copied from the template either
+        settings = conn.execute(
+            text(
+                "SELECT coalesce(r.rolname, ''), unnest(s.setconfig) FROM pg_db_role_setting s "
+                "JOIN pg_database d ON d.oid = s.setdatabase LEFT JOIN pg_roles r ON r.oid = s.setrole "
+                "WHERE d.datname = current_database()"
+            )
+        ).all()
+        assert set(settings) == {("", "statement_timeout=30s"), ("plugin_reader", "work_mem=8MB")}
+
+    templates.drop(clones)
+    with engine.connect() as conn:
+        names = conn.execute(text("SELECT datname FROM pg_database WHERE datname LIKE 'plugin_db%'")).scalars().all()
+    assert names == [templates.templates["plugin_db"]]
+
+
+def test_clone_tablespace(engine: Engine) -> None:
+    # a tablespace in the data directory, so the test doesn't need a directory on the server
+    in_place_engine = create_engine(engine.url, connect_args={"options": "-c allow_in_place_tablespaces=on"})
+    with Registry() as registry:
+        fast = Tablespace(name="plugin_fast", location="")
+        Database(name="plugin_placed_db", tablespace=fast)
+    templates = TemplateDatabases(engine=in_place_engine, registry=registry)
+    try:
+        templates.build()
+        clones = templates.clone(suffix="test")
+        statement = text(
+            "SELECT spcname FROM pg_database d JOIN pg_tablespace t ON t.oid = d.dattablespace WHERE datname=:name"
+        ).bindparams(name=clones["plugin_placed_db"].name)
+        assert Database._fetch_sql(engine=engine, statement=statement)[0][0] == "plugin_fast"
+        templates.drop(clones)
+    finally:
+        templates.drop_templates()
+        with bind_engine(in_place_engine):
+            fast._safe_drop()
+
+
+conftest = """
+import pytest
+from dbdeclare.entities import Database, Role, Schema
+from dbdeclare.registry import Registry, bind_engine
+
+pytest_plugins = ["dbdeclare.pytest_plugin"]
+
+
+@pytest.fixture(scope="session")
+def dbdeclare_registry():
+    with Registry() as registry:
+        db = Database(name="plugin_session_db")
+        Schema(name="plugin_schema", database=db)
+    return registry
+"""
+
+test_file = """
+from sqlalchemy import inspect
+
+
+def test_session(dbdeclare_databases):
+    with dbdeclare_databases["plugin_session_db"].connect() as conn:
+        assert "plugin_schema" in inspect(conn).get_schema_names()
+        assert conn.exec_driver_sql("SELECT current_database()").scalar() == "plugin_session_db_main"
+
+
+def test_isolated(dbdeclare_test_databases):
+    with dbdeclare_test_databases["plugin_session_db"].connect() as conn:
+        assert conn.exec_driver_sql("SELECT current_database()").scalar().startswith("plugin_session_db_main_t")
+"""
+
+
+def test_plugin(pytester: pytest.Pytester, monkeypatch: pytest.MonkeyPatch, engine: Engine) -> None:
+    monkeypatch.setenv("PYTHONPATH", str(Path(__file__).parents[2]))
+    pytester.makeconftest(conftest)
+    pytester.makepyfile(test_file)
+    url = engine.url.render_as_string(hide_password=False)
+    try:
+        result = pytester.runpytest_subprocess("--dbdeclare-url", url, "-p", "no:cacheprovider")
+        result.assert_outcomes(passed=2)
+    finally:
+        statement = text("SELECT datname FROM pg_database WHERE datname LIKE 'plugin_session_db_tpl_%'")
+        for name in Database._fetch_sql(engine=engine, statement=statement):
+            Database._commit_sql(
+                engine=engine,
+                statements=[text(f"ALTER DATABASE {name[0]} is_template false"), text(f"DROP DATABASE {name[0]}")],
+            )
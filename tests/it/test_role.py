@@ -3,11 +3,14 @@ from datetime import datetime, timedelta
 import pytest
 from hypothesis import HealthCheck, given, settings
 from hypothesis import strategies as st
-from sqlalchemy import Engine
+from sqlalchemy import Engine, create_engine, text
 
 from dbdeclare.controller import Controller
+from dbdeclare.data_structures import Credential
+from dbdeclare.entities.database import Database
 from dbdeclare.entities.entity import Entity
 from dbdeclare.entities.role import Role
+from dbdeclare.registry import Registry
 
 
 def test_does_not_exist(simple_role: Role) -> None:
@@ -100,3 +103,75 @@ def test_dependency_inputs(engine: Engine) -> None:
     Role(name="admin_multiple", admin=existing_roles)
     Controller.create_all(engine)
     Controller.drop_all(engine)
+
+
+@pytest.mark.order(after="test_drop")
+@pytest.mark.parametrize("processes, sessions", [(1, 1), (2, 4)])
+def test_rotate_credentials(engine: Engine, processes: int, sessions: int) -> None:
+    roles = [Role(name=f"rotated_{n}", login=True, password="it's:a=:secret") for n in range(3)]
+    Controller.create_all(engine)
+    expiry = datetime(2040, 1, 1)
+    passwords = ["plain", "p\u00e4ssw\u00f6rd", "it's:new"]
+    credentials: dict[Role | str, Credential] = {
+        role: Credential(password=password, valid_until=expiry) for role, password in zip(roles, passwords)
+    }
+    credentials["rotated_missing"] = Credential(password="nope")
+    rotations = Controller.rotate_credentials(
+        credentials, engine=engine, processes=processes, sessions=sessions, batch_size=2
+    )
+
+    assert [(r.role, r.succeeded) for r in rotations] == [
+        ("rotated_0", True),
+        ("rotated_1", True),
+        ("rotated_2", True),
+        ("rotated_missing", False),
+    ]
+    assert roles[1].password == passwords[1]
+    for role, password in zip(roles, passwords):
+        url = engine.url.set(username=role.name, password=password)
+        with create_engine(url).connect() as conn:
+            assert conn.execute(text("SELECT rolvaliduntil FROM pg_roles WHERE rolname = current_user")).scalar()
+        with engine.connect() as conn:
+            verifier = conn.execute(
+                text(f"SELECT rolpassword FROM pg_authid WHERE rolname = '{role.name}'")
+            ).scalar_one()
+            assert verifier.startswith("SCRAM-SHA-256$4096:")
+    Controller.drop_all(engine)
+
+
+@pytest.mark.order(after="test_drop")
+def test_settings(engine: Engine) -> None:
+    with Registry() as registry:
+        db = Database(name="configured_db", settings={"statement_timeout": 5000, "enable_seqscan": False})
+        role = Role(
+            name="configured_role",
+            login=True,
+            password="configured",
+            settings={"work_mem": "64MB", "search_path": ["$user", "Reporting"]},
+            database_settings={db: {"work_mem": "8MB"}},
+        )
+    changes = Controller.run_all(engine, registry=registry)
+    assert changes[2:] == [
+        "set statement_timeout=5000 for Database configured_db",
+        "set enable_seqscan=off for Database configured_db",
+        "set work_mem=64MB for Role configured_role",
+        'set search_path="$user", "Reporting" for Role configured_role',
+        "set work_mem=8MB for Role configured_role in Database configured_db",
+    ]
+    assert Controller.plan(engine, registry=registry) == []
+
+    url = engine.url.set(username=role.name, password="configured", database=db.name)
+    with create_engine(url).connect() as conn:
+        assert conn.execute(text("SHOW work_mem")).scalar() == "8MB"
+        assert conn.execute(text("SHOW statement_timeout")).scalar() == "5s"
+        assert conn.execute(text("SHOW search_path")).scalar() == '"$user", "Reporting"'
+
+    # settings that are no longer declared are reset, and those left out entirely aren't managed
+    role.settings = {"work_mem": "32MB"}
+    db.settings = None
+    assert Controller.configure_all(engine, registry=registry) == [
+        "set work_mem=32MB for Role configured_role",
+        "reset search_path for Role configured_role",
+    ]
+    assert Controller.plan(engine, registry=registry) == []
+    Controller.drop_all(engine, registry=registry)
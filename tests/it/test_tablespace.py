@@ -0,0 +1,63 @@
+import pytest
+from sqlalchemy import Engine, create_engine, text
+
+from dbdeclare.controller import Controller
+from dbdeclare.data_structures import GrantTo, Privilege, TablespaceMove
+from dbdeclare.entities import Database, DatabaseContent, Role, Schema, Tablespace
+from dbdeclare.exceptions import PostgresDeclareError
+from dbdeclare.registry import Registry
+from tests.conftest import MyBase, schema_name
+
+
+@pytest.fixture
+def in_place_engine(engine: Engine) -> Engine:
+    # tablespaces in the data directory, so tests don't need a directory on the server
+    return create_engine(engine.url, connect_args={"options": "-c allow_in_place_tablespaces=on"})
+
+
+def tablespace_of(engine: Engine, db: Database, table: str | None = None) -> str:
+    if table is None:
+        statement = text(
+            "SELECT spcname FROM pg_database d JOIN pg_tablespace t ON t.oid = d.dattablespace WHERE datname=:name"
+        ).bindparams(name=db.name)
+        return str(Database._fetch_sql(engine=engine, statement=statement)[0][0])
+    # 0 means the default tablespace of the database
+    statement = text("SELECT reltablespace FROM pg_class WHERE relname=:name").bindparams(name=table)
+    oid = Database._fetch_sql(engine=db.db_engine(), statement=statement)[0][0]
+    statement = text("SELECT spcname FROM pg_tablespace WHERE oid=:oid").bindparams(oid=oid)
+    return str(Database._fetch_sql(engine=engine, statement=statement)[0][0]) if oid else "default"
+
+
+def test_tablespaces(registry: Registry, in_place_engine: Engine) -> None:
+    user = Role(name="volume_user")
+    fast = Tablespace(name="fast", location="", grants=[GrantTo(privileges=[Privilege.CREATE], to=[user])])
+    faster = Tablespace(name="faster", location="", options={"random_page_cost": 1.1})
+    fastest = Tablespace(name="fastest", location="")
+    db = Database(name="hot_tenant", tablespace=fast)
+    schema = Schema(name=schema_name, database=db)
+    DatabaseContent(name="hot_content", sqlalchemy_base=MyBase, database=db, schemas=[schema], tablespace=faster)
+
+    try:
+        Controller.run_all(in_place_engine)
+        assert Controller.verify(in_place_engine) == []
+        assert tablespace_of(in_place_engine, db) == "fast"
+        assert tablespace_of(in_place_engine, db, table="fancy_table") == "faster"
+
+        # the table is in there already
+        with pytest.raises(PostgresDeclareError, match="relations already in faster"):
+            Controller.move_database(db, faster)
+        moves: list[TablespaceMove] = []
+
+        def decline(move: TablespaceMove) -> bool:
+            moves.append(move)
+            return False
+
+        assert not Controller.move_database(db, fastest, confirm=decline)
+        assert moves[0].source == "fast" and moves[0].size > 0
+        assert Controller.move_database(db, fastest, terminate=True)
+        assert tablespace_of(in_place_engine, db) == "fastest" and db.tablespace is fastest
+        assert tablespace_of(in_place_engine, db, table="fancy_table") == "faster"
+        assert not Controller.move_database(db, fastest)
+    finally:
+        Controller.remove_all(in_place_engine)
+    assert not fast._exists()
@@ -0,0 +1,38 @@
+from pathlib import Path
+
+from dbdeclare.checkpoint import FileCheckpoint, Progress
+
+
+def test_file_checkpoint(tmp_path: Path) -> None:
+    checkpoint = FileCheckpoint(tmp_path / "checkpoint.jsonl")
+    assert checkpoint.load("a") == set()
+    checkpoint.record("a", "create Role reader")
+    checkpoint.record("b", "create Role writer")
+    # a process that died mid-write leaves a partial line behind
+    with checkpoint.path.open("a") as file:
+        file.write('{"key": "a", "st')
+    assert checkpoint.load("a") == {"create Role reader"}
+
+    checkpoint.clear("a")
+    assert checkpoint.load("a") == set() and checkpoint.load("b") == {"create Role writer"}
+    checkpoint.clear("b")
+    assert not checkpoint.path.exists()
+
+
+def test_progress(tmp_path: Path) -> None:
+    checkpoint = FileCheckpoint(tmp_path / "checkpoint.jsonl")
+    progress = Progress(checkpoint=checkpoint, key="a", resume=False)
+    progress.done("first")
+    assert not progress.pending("first") and progress.pending("second")
+
+    assert not Progress(checkpoint=checkpoint, key="a", resume=True).pending("first")
+    # without resuming, the previous run's steps are forgotten
+    assert Progress(checkpoint=checkpoint, key="a", resume=False).pending("first")
+    assert checkpoint.load("a") == set()
+
+
+def test_progress_without_checkpoint() -> None:
+    progress = Progress(checkpoint=None, key="", resume=True)
+    progress.done("first")
+    assert progress.pending("first")
+    progress.finish()
@@ -0,0 +1,33 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from dbdeclare.cli import _load, main
+
+
+def test_cli_needs_url(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("DBDECLARE_URL", raising=False)
+    with pytest.raises(SystemExit) as exc_info:
+        main(["plan", "declarations.py"])
+    assert exc_info.value.code == 2
+
+
+def test_cli_imports_stay_lazy() -> None:
+    # the controller must be importable first, and using roles and databases must not import sqlalchemy.orm
+    code = (
+        "import sys\n"
+        "import dbdeclare.cli\n"
+        "assert 'sqlalchemy' not in sys.modules\n"
+        "import dbdeclare.controller\n"
+        "from dbdeclare.entities import Database, Role, Schema\n"
+        "assert 'sqlalchemy.orm' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_cli_loads_data_files(tmp_path: Path) -> None:
+    file = tmp_path / "declarations.jsonl"
+    file.write_text('{"kind": "database", "name": "cli_data_db"}\n{"kind": "role", "name": "cli_data_reader"}\n')
+    assert [e.name for e in _load(str(file)).entities] == ["cli_data_db", "cli_data_reader"]
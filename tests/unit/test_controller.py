@@ -0,0 +1,113 @@
+import pytest
+
+from dbdeclare.controller import Controller
+from dbdeclare.data_structures import GrantOn, Privilege, Selector
+from dbdeclare.entities import Database, Role, Schema
+from dbdeclare.registry import Registry, tagged
+
+pytestmark = pytest.mark.usefixtures("registry")
+
+
+@pytest.fixture
+def tenants(registry: Registry) -> Registry:
+    admin = Role(name="admin")
+    for tenant in ["tenant_a", "tenant_b"]:
+        with tagged(tenant):
+            owner = Role(name=f"{tenant}_owner", in_role=[admin])
+            db = Database(name=tenant, owner=owner)
+            schema = Schema(name="app", database=db)
+            Role(
+                name=f"{tenant}_reader",
+                grants=[
+                    GrantOn(privileges=[Privilege.CONNECT], on=[db]),
+                    GrantOn(privileges=[Privilege.USAGE], on=[schema]),
+                ],
+            )
+    # a shared role with grants on both tenants
+    Role(
+        name="auditor",
+        grants=[GrantOn(privileges=[Privilege.CONNECT], on=[e]) for e in registry.entities if isinstance(e, Database)],
+    )
+    return registry
+
+
+def names(registry: Registry) -> list[str]:
+    return [e._identity() for e in registry.entities]
+
+
+def grants(registry: Registry) -> set[tuple[str, str]]:
+    return {
+        (role.name, target._grant_name)
+        for role in registry.entities
+        if isinstance(role, Role)
+        for target in role.grants
+    }
+
+
+def test_select_database(tenants: Registry) -> None:
+    selection = Controller.select(Selector(databases=["tenant_a"]))
+    assert names(selection) == [
+        "Role admin",
+        "Role tenant_a_owner",
+        "Database tenant_a",
+        "Schema tenant_a.app",
+        "Role tenant_a_reader",
+        "Role auditor",
+    ]
+    assert grants(selection) == {("tenant_a_reader", "tenant_a"), ("tenant_a_reader", "app"), ("auditor", "tenant_a")}
+    # the declaration itself is untouched
+    auditor = tenants.entities[-1]
+    assert isinstance(auditor, Role) and len(auditor.grants) == 2
+    assert len(tenants.entities) == 10
+
+
+def test_select_role(tenants: Registry) -> None:
+    selection = Controller.select(Selector(roles=["auditor"]))
+    # the databases are needed for the grants, but nothing in them is
+    assert names(selection) == [
+        "Role admin",
+        "Role tenant_a_owner",
+        "Database tenant_a",
+        "Role tenant_b_owner",
+        "Database tenant_b",
+        "Role auditor",
+    ]
+    assert grants(selection) == {("auditor", "tenant_a"), ("auditor", "tenant_b")}
+
+
+def test_select_names_and_tags(tenants: Registry) -> None:
+    assert names(Controller.select(Selector(names=["*_reader"]), dependencies=False)) == [
+        "Role tenant_a_reader",
+        "Role tenant_b_reader",
+    ]
+    by_tag = Controller.select(Selector(tags=["tenant_b"]), dependencies=False)
+    assert names(by_tag) == ["Role tenant_b_owner", "Database tenant_b", "Schema tenant_b.app", "Role tenant_b_reader"]
+    assert grants(by_tag) == {("tenant_b_reader", "tenant_b"), ("tenant_b_reader", "app")}
+    assert names(Controller.select(Selector())) == []
+
+
+def test_prune_redundant_grants(registry: Registry) -> None:
+    db = Database(name="prune_db")
+    schema = Schema(name="app", database=db)
+    group = Role(name="prune_group", grants=[GrantOn(privileges=[Privilege.ALL_PRIVILEGES], on=[schema])])
+    no_inherit = Role(name="prune_no_inherit", inherit=False, in_role=[group])
+    member = Role(
+        name="prune_member",
+        in_role=[group],
+        grants=[
+            GrantOn(privileges=[Privilege.USAGE], on=[schema]),
+            GrantOn(privileges=[Privilege.CONNECT], on=[db]),
+        ],
+    )
+    no_inherit.grant(grants=[GrantOn(privileges=[Privilege.USAGE], on=[schema])])
+
+    pruned, savings = Controller.prune_redundant_grants()
+    assert grants(pruned) == {
+        ("prune_group", schema._grant_name),
+        ("prune_no_inherit", schema._grant_name),
+        ("prune_member", "prune_db"),
+    }
+    assert savings.grants == (f"grant USAGE on Schema {schema._grant_name} to prune_member",)
+    assert (savings.statements, savings.acl_entries) == (1, 1)
+    # the declaration itself is left as it was
+    assert schema in member.grants and names(pruned) == names(registry)
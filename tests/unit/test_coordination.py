@@ -0,0 +1,36 @@
+import pytest
+
+from dbdeclare.coordination import partition
+from dbdeclare.data_structures import GrantOn, Privilege
+from dbdeclare.entities import Database, Role, Schema
+from dbdeclare.registry import Registry
+
+pytestmark = pytest.mark.usefixtures("registry")
+
+
+def test_partition_keeps_links_together() -> None:
+    links = {"a": ["b"], "b": [], "c": ["shared"], "d": ["shared"], "e": []}
+    partitions = partition(list(links), key=str, links=lambda item: links[item], count=64)
+    assert ["a", "b"] in partitions and ["c", "d"] in partitions
+    assert sorted(item for p in partitions for item in p) == ["a", "b", "c", "d", "e"]
+    assert partition(list(links), key=str, links=lambda item: links[item], count=64) == partitions
+
+
+def test_partition_count() -> None:
+    partitions = partition([str(i) for i in range(100)], key=str, links=lambda item: [], count=4)
+    assert len(partitions) == 4
+
+
+def test_fingerprint() -> None:
+    def declare() -> Registry:
+        with Registry() as registry:
+            db = Database(name="fingerprinted")
+            Schema(name="inner", database=db)
+            Role(name="reader", grants=[GrantOn(privileges=[Privilege.CONNECT], on=[db])])
+        return registry
+
+    first, second = declare(), declare()
+    assert first.fingerprint() == second.fingerprint()
+    with second:
+        Role(name="writer")
+    assert first.fingerprint() != second.fingerprint()
@@ -0,0 +1,46 @@
+from base64 import b64decode
+
+import pytest
+
+from dbdeclare.credentials import _saslprep, scram_sha_256
+from dbdeclare.entities.role import Role
+
+pytestmark = pytest.mark.usefixtures("registry")
+
+
+def test_scram_sha_256() -> None:
+    verifier = scram_sha_256("pencil", salt=b"0123456789abcdef")
+    assert verifier == (
+        "SCRAM-SHA-256$4096:MDEyMzQ1Njc4OWFiY2RlZg==$nQpbZ77WudtqufPwikHXGRt6g2QJ4zns8bZLw273DRM=:"
+        "jn2amWP1q1h+jgjy0YTO14S6/F02SV7taipOeB7ef20="
+    )
+    # a new salt every time
+    first, second = scram_sha_256("pencil"), scram_sha_256("pencil")
+    assert first != second
+    assert len(b64decode(first.split("$")[1].split(":")[1])) == 16
+
+
+@pytest.mark.parametrize(
+    "password, prepared",
+    [
+        ("user", "user"),
+        ("I\u00adX", "IX"),
+        ("\u00aa", "a"),
+        ("\u2168", "IX"),
+        ("a\u00a0b", "a b"),
+        # prohibited, so used as it is
+        ("a\u0007", "a\u0007"),
+        ("\u0627\u0031", "\u0627\u0031"),
+    ],
+)
+def test_saslprep(password: str, prepared: str) -> None:
+    assert _saslprep(password) == prepared.encode()
+
+
+def test_credential_statements() -> None:
+    role = Role(name="rotated", password="it's:a=:secret")
+    [create] = role._create_statements()
+    assert str(create.compile()) == "CREATE ROLE rotated PASSWORD 'it''s:a=:secret'"
+    [alter] = role._alter_credential_statements(password="new=:one", valid_until=None)
+    assert str(alter.compile()) == "ALTER ROLE rotated PASSWORD 'new=:one'"
+    assert role._alter_credential_statements(password=None, valid_until=None) == []
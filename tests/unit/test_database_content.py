@@ -0,0 +1,53 @@
+import pytest
+from sqlalchemy import Column, Integer, Table
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from dbdeclare.entities.database import Database
+from dbdeclare.entities.database_content import DatabaseContent
+from tests.helpers import YieldFixture
+
+pytestmark = pytest.mark.usefixtures("registry")
+
+
+class LazyBase(DeclarativeBase):
+    pass
+
+
+class Alpha(LazyBase):
+    __tablename__ = "alpha"
+    id: Mapped[int] = mapped_column(primary_key=True)
+
+
+class Beta(LazyBase):
+    __tablename__ = "beta"
+    __table_args__ = {"schema": "staging"}
+    id: Mapped[int] = mapped_column(primary_key=True)
+
+
+@pytest.fixture
+def content() -> YieldFixture[DatabaseContent]:
+    yield DatabaseContent(name="lazy_content", sqlalchemy_base=LazyBase, database=Database(name="lazy_db"))
+
+
+def test_tables_created_on_access(content: DatabaseContent) -> None:
+    assert content.tables._wrappers == {}
+    beta = content.tables["beta"]
+    assert beta.schema == "staging"
+    assert content.tables["beta"] is beta
+    assert list(content.tables._wrappers) == ["beta"]
+
+
+def test_tables_mapping(content: DatabaseContent) -> None:
+    assert set(content.tables) == {"alpha", "beta"}
+    assert len(content.tables) == 2
+    assert "alpha" in content.tables
+    with pytest.raises(KeyError):
+        content.tables["gamma"]
+    assert content._metadata_tables() == {("public", "alpha"), ("staging", "beta")}
+    assert content.tables._wrappers == {}
+
+
+def test_tables_added_later(content: DatabaseContent) -> None:
+    gamma = Table("gamma", LazyBase.metadata, Column("id", Integer, primary_key=True))
+    assert content.tables["gamma"].name == "gamma"
+    LazyBase.metadata.remove(gamma)
@@ -1,6 +1,6 @@
 from dbdeclare.entities.database import Database
 from dbdeclare.entities.database_entity import DatabaseEntity
-from dbdeclare.entities.entity import Entity
+from dbdeclare.registry import Registry
 
 
 class MockDatabaseEntity(DatabaseEntity):
@@ -14,8 +14,7 @@ class MockDatabaseEntity(DatabaseEntity):
         pass
 
 
-def test_database_entity_hash_works(entity: Entity) -> None:
-    entity.entities = []
+def test_database_entity_hash_works(registry: Registry) -> None:
     db1 = Database("db1")
     db2 = Database("db2")
     mde1 = MockDatabaseEntity("mde1", database=db1)
@@ -25,8 +24,7 @@ def test_database_entity_hash_works(entity: Entity) -> None:
     assert len(myset) == 2
 
 
-def test_database_entity_eq_works(entity: Entity) -> None:
-    entity.entities = []
+def test_database_entity_eq_works(registry: Registry) -> None:
     db1 = Database("db1")
     db2 = Database("db2")
     mde1 = MockDatabaseEntity("mde1", database=db1)
@@ -0,0 +1,24 @@
+import pytest
+
+from dbdeclare.data_structures.default_object import DefaultObject
+from dbdeclare.data_structures.grant_to import GrantTo
+from dbdeclare.data_structures.privileges import Privilege
+from dbdeclare.entities.database import Database
+from dbdeclare.entities.default_privileges import DefaultPrivileges
+from dbdeclare.entities.role import Role
+from dbdeclare.registry import Registry
+
+pytestmark = pytest.mark.usefixtures("registry")
+
+
+def test_order(registry: Registry) -> None:
+    owner = Role(name="default_owner")
+    default_privileges = DefaultPrivileges(
+        name="future_tables", database=Database(name="default_db"), owner=owner, object_type=DefaultObject.TABLES
+    )
+    # a grantee declared after the default privileges still has to exist before they're granted
+    reader = Role(name="default_reader")
+    default_privileges.grant(grants=[GrantTo(privileges=[Privilege.SELECT], to=[reader, reader])])
+    assert default_privileges.depends_on == [owner, reader]
+    assert registry.entities.index(reader) < registry.entities.index(default_privileges)
+    assert registry.entities.index(owner) < registry.entities.index(default_privileges)
@@ -8,6 +8,8 @@ from dbdeclare.entities.entity import Entity
 from dbdeclare.exceptions import EntityExistsError, NoEngineError
 from tests.helpers import YieldFixture
 
+pytestmark = pytest.mark.usefixtures("registry")
+
 ########################
 # FIXTURES AND CLASSES #
 ########################
@@ -49,17 +51,11 @@ class ChildMockEntity(MockEntity):
 @pytest.fixture
 def mock_entity_exists() -> YieldFixture[MockEntity]:
     yield MockEntity("mock_exists")
-    Entity.entities = []
-    Entity.check_if_any_exist = False
-    Entity._engine = None
 
 
 @pytest.fixture
 def mock_entity_does_not_exist() -> YieldFixture[MockEntity]:
     yield MockEntity("mock_does_not_exist", mock_exists=False)
-    Entity.entities = []
-    Entity.check_if_any_exist = False
-    Entity._engine = None
 
 
 #########
@@ -1,7 +1,7 @@
 from typing import Sequence
 
 import pytest
-from sqlalchemy import Engine
+from sqlalchemy import Engine, TextClause, text
 
 from dbdeclare.controller import Controller
 from dbdeclare.data_structures.grant_to import GrantTo
@@ -10,8 +10,11 @@ from dbdeclare.entities.entity import Entity
 from dbdeclare.entities.role import Role
 from dbdeclare.exceptions import EntityExistsError, InvalidPrivilegeError
 from dbdeclare.mixins.grantable import Grantable
+from dbdeclare.registry import Registry
 from tests.helpers import YieldFixture
 
+pytestmark = pytest.mark.usefixtures("registry")
+
 
 class MockGrantable(Grantable):
     def __init__(self, name: str, grants: Sequence[GrantTo] | None = None, mock_exists: bool = True):
@@ -30,6 +33,12 @@ class MockGrantable(Grantable):
     def _revoke(self, grantee: Role, privileges: set[Privilege]) -> None:
         pass
 
+    def _acl_statement(self) -> TextClause:
+        return text("SELECT NULL")
+
+    def _fetch_acl(self) -> tuple[str, dict[str, set[Privilege]]]:
+        return "", {}
+
     @staticmethod
     def _allowed_privileges() -> set[Privilege]:
         return {Privilege.SELECT, Privilege.INSERT, Privilege.UPDATE, Privilege.DELETE, Privilege.ALL_PRIVILEGES}
@@ -59,17 +68,11 @@ class MockRole(Role):
 @pytest.fixture
 def grantable() -> YieldFixture[MockGrantable]:
     yield MockGrantable(name="mock_grantable_single")
-    Entity.entities = []
-    Entity.check_if_any_exist = False
-    Entity._engine = None
 
 
 @pytest.fixture
 def grantable_entity() -> YieldFixture[MockGrantableEntity]:
     yield MockGrantableEntity(name="mock_grantable_entity_single")
-    Entity.entities = []
-    Entity.check_if_any_exist = False
-    Entity._engine = None
 
 
 @pytest.fixture
@@ -87,9 +90,6 @@ def grantable_does_not_exist(mock_role: MockRole) -> YieldFixture[MockGrantable]
     mg = MockGrantable(name="mock_grantable_does_not_exist", mock_exists=False)
     mg.grant(grants=[GrantTo(privileges=[Privilege.SELECT], to=[mock_role])])
     yield mg
-    Entity.entities = []
-    Entity.check_if_any_exist = False
-    Entity._engine = None
 
 
 @pytest.fixture
@@ -127,12 +127,14 @@ def test_invalid_grant(grantable: MockGrantable, mock_role: MockRole, invalid_gr
         grantable.grant([invalid_grant])
 
 
-def test_order_fixing(grantable_entity: MockGrantableEntity, mock_role: MockRole, simple_grant: GrantTo) -> None:
-    assert mock_role == grantable_entity.entities[1]
-    assert grantable_entity == grantable_entity.entities[0]
+def test_order_fixing(
+    registry: Registry, grantable_entity: MockGrantableEntity, mock_role: MockRole, simple_grant: GrantTo
+) -> None:
+    assert mock_role == registry.entities[1]
+    assert grantable_entity == registry.entities[0]
     grantable_entity._fix_entity_order(grants=[simple_grant], target_entity=grantable_entity)
-    assert mock_role == grantable_entity.entities[0]
-    assert grantable_entity == grantable_entity.entities[1]
+    assert mock_role == registry.entities[0]
+    assert grantable_entity == registry.entities[1]
 
 
 def test_grant_all(grantable_with_grant: MockGrantable, engine: Engine) -> None:
@@ -165,3 +167,73 @@ def test_revoke_error_if_targets_do_not_exist(
 ) -> None:
     with pytest.raises(EntityExistsError):
         Controller.revoke_all(engine)
+
+
+def test_parse_acl() -> None:
+    assert Grantable._parse_acl("reader=rw/postgres") == ("reader", {Privilege.SELECT, Privilege.UPDATE})
+
+
+def test_parse_acl_public_with_grant_option() -> None:
+    assert Grantable._parse_acl("=r*a/postgres") == ("", {Privilege.SELECT, Privilege.INSERT})
+
+
+def test_parse_acl_skips_unknown_codes() -> None:
+    # the default ACL of a table's owner on Postgres 17 includes MAINTAIN, which can't be declared
+    assert Grantable._parse_acl("owner=arwdDxtm/owner") == (
+        "owner",
+        {
+            Privilege.INSERT,
+            Privilege.SELECT,
+            Privilege.UPDATE,
+            Privilege.DELETE,
+            Privilege.TRUNCATE,
+            Privilege.REFERENCES,
+            Privilege.TRIGGER,
+        },
+    )
+
+
+def test_expand_uncheckable_privileges(grantable: MockGrantable) -> None:
+    assert grantable._expand_privileges({Privilege.ALL_PRIVILEGES}) == {
+        Privilege.SELECT,
+        Privilege.INSERT,
+        Privilege.UPDATE,
+        Privilege.DELETE,
+    }
+    with pytest.raises(InvalidPrivilegeError, match="Cannot check ALTER SYSTEM"):
+        grantable._expand_privileges({Privilege.ALTER_SYSTEM})
+
+
+def test_parse_acl_invalid() -> None:
+    assert Grantable._parse_acl("not an acl") is None
+
+
+def test_mask_round_trip() -> None:
+    privileges = {Privilege.SELECT, Privilege.UPDATE, Privilege.CONNECT}
+    assert Grantable._unmask(Grantable._mask(privileges)) == privileges
+    assert Grantable._mask([]) == 0
+
+
+def test_acl_from_rows() -> None:
+    acls = ["owner=arw/owner", "=r/owner", "reader=r/owner", "reader=w/owner"]
+    assert Grantable._acl_from_rows(acls=acls) == {
+        "owner": {Privilege.SELECT, Privilege.INSERT, Privilege.UPDATE},
+        "PUBLIC": {Privilege.SELECT},
+        "reader": {Privilege.SELECT, Privilege.UPDATE},
+    }
+
+
+def test_acl_cached_and_skips_owner(grantable: MockGrantable, monkeypatch: pytest.MonkeyPatch) -> None:
+    reads = []
+
+    def fetch_acl() -> tuple[str, dict[str, set[Privilege]]]:
+        reads.append(1)
+        return "owner", {"owner": {Privilege.SELECT}, "reader": {Privilege.SELECT}}
+
+    monkeypatch.setattr(grantable, "_fetch_acl", fetch_acl)
+    assert grantable._acl() == {"reader": {Privilege.SELECT}}
+    assert grantable._acl(include_owner=True) == {"owner": {Privilege.SELECT}, "reader": {Privilege.SELECT}}
+    assert len(reads) == 1
+    grantable._clear_acl_cache()
+    grantable._acl()
+    assert len(reads) == 2
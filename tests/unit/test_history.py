@@ -0,0 +1,57 @@
+from pathlib import Path
+
+import pytest
+
+from dbdeclare.controller import Controller
+from dbdeclare.data_structures import GrantOn, Privilege
+from dbdeclare.entities import Database, Role, Schema
+from dbdeclare.history import TimingHistory, timed
+
+pytestmark = pytest.mark.usefixtures("registry")
+
+
+def test_estimates_average_recent_timings(tmp_path: Path) -> None:
+    history = TimingHistory(tmp_path / "history.sqlite", window=2)
+    for seconds in [10.0, 2.0, 4.0]:
+        history.record(key="Database dev", operation="create", seconds=seconds)
+    history.record(key="Database dev", operation="drop", seconds=1.0)
+    history.flush()
+    # a fresh history, like in the next run
+    history = TimingHistory(tmp_path / "history.sqlite", window=2)
+    assert history.estimates("create") == {"Database dev": 3.0}
+    assert history.estimate("Database prod", "create") == 0.0
+
+
+def test_timed(tmp_path: Path) -> None:
+    with TimingHistory(tmp_path / "history.sqlite") as history:
+        assert TimingHistory.current() is history
+        with timed("Role reader", "create"):
+            pass
+        with pytest.raises(RuntimeError):
+            with timed("Role writer", "create"):
+                raise RuntimeError()
+    assert TimingHistory.current() is None
+    assert set(TimingHistory(tmp_path / "history.sqlite").estimates("create")) == {"Role reader"}
+
+    # without a current history, nothing is recorded
+    with timed("Role reader", "create"):
+        pass
+
+
+def test_critical_path(tmp_path: Path) -> None:
+    dev = Database(name="dev")
+    Database(name="prod")
+    schema = Schema(name="logs", database=dev)
+    reader = Role(name="reader", grants=[GrantOn(privileges=[Privilege.USAGE], on=[schema])])
+    assert Controller.critical_path() == []
+
+    with TimingHistory(tmp_path / "history.sqlite") as history:
+        for key, seconds in [("Database dev", 2.0), ("Database prod", 3.0), ("Schema dev.logs", 0.5)]:
+            history.record(key=key, operation="create", seconds=seconds)
+        history.record(key=reader._grant_step(schema), operation="grant", seconds=1.0)
+        history.flush()
+        assert Controller.critical_path() == [
+            ("create Database dev", 2.0),
+            ("create Schema dev.logs", 0.5),
+            (reader._grant_step(schema), 1.0),
+        ]
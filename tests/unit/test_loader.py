@@ -0,0 +1,119 @@
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+from dbdeclare.data_structures.privileges import Privilege
+from dbdeclare.entities.database import Database
+from dbdeclare.entities.role import Role
+from dbdeclare.exceptions import InvalidPrivilegeError, PostgresDeclareError
+from dbdeclare.loader import Loader, _json_array, declare_records
+from dbdeclare.registry import Registry
+
+pytestmark = pytest.mark.usefixtures("registry")
+
+records = [
+    {"kind": "role", "name": "load_group"},
+    {"kind": "role", "name": "load_member", "login": True, "connection_limit": 3, "in_role": ["load_group"]},
+    {"kind": "database", "name": "load_db", "owner": "load_group"},
+    {"kind": "schema", "name": "load_schema", "database": "load_db"},
+    {"kind": "grant", "role": "load_member", "privileges": ["CONNECT"], "database": "load_db"},
+    {"kind": "grant", "role": "load_member", "privileges": ["usage"], "database": "load_db", "schema": "load_schema"},
+]
+
+csv_records = """kind,name,login,connection_limit,in_role,database,owner,role,privileges,schema
+role,load_group,,,,,,,,
+role,load_member,true,3,load_group,,,,,
+database,load_db,,,,,load_group,,,
+schema,load_schema,,,,load_db,,,,
+grant,,,,,load_db,,load_member,CONNECT,
+grant,,,,,load_db,,load_member,usage,load_schema
+"""
+
+yaml_records = """
+- {kind: role, name: load_group}
+- kind: role
+  name: load_member
+  login: true
+  connection_limit: 3
+  in_role: [load_group]
+- {kind: database, name: load_db, owner: load_group}
+- {kind: schema, name: load_schema, database: load_db}
+- {kind: grant, role: load_member, privileges: [CONNECT], database: load_db}
+- {kind: grant, role: load_member, privileges: [usage], database: load_db, schema: load_schema}
+"""
+
+
+@pytest.fixture(params=["jsonl", "json", "csv", "yaml"])
+def data_file(request: pytest.FixtureRequest, tmp_path: Path) -> Path:
+    file = tmp_path / f"records.{request.param}"
+    match request.param:
+        case "jsonl":
+            file.write_text("".join(f"{json.dumps(record)}\n" for record in records))
+        case "json":
+            file.write_text(json.dumps(records, indent=2))
+        case "csv":
+            file.write_text(csv_records)
+        case "yaml":
+            file.write_text(yaml_records)
+    return file
+
+
+def test_loader(data_file: Path, registry: Registry) -> None:
+    loader = Loader(data_file, chunk_size=16)
+    assert list(loader.records())[:4] == records[:4]
+    entities = {(e.__class__.__name__, e.name): e for e in loader.declare()}
+    member = entities[("Role", "load_member")]
+    db = entities[("Database", "load_db")]
+    schema = entities[("Schema", "load_schema")]
+    assert isinstance(member, Role) and isinstance(db, Database)
+    assert [r.name for r in member.in_role or []] == ["load_group"]
+    assert db.owner == entities[("Role", "load_group")]
+    assert member.grants == {db: {Privilege.CONNECT}, schema: {Privilege.USAGE}}
+    assert registry.entities == list(entities.values())
+
+
+def test_json_array_chunks() -> None:
+    text = json.dumps([{"name": "a, [b]"}, {"name": "c"}, {"nested": {"list": [1, 2]}}])
+    for chunk_size in (1, 3, 1000):
+        assert list(_json_array(io.StringIO(text), chunk_size=chunk_size)) == json.loads(text)
+    with pytest.raises(PostgresDeclareError):
+        list(_json_array(io.StringIO('[{"name": "a"}'), chunk_size=4))
+
+
+def test_refers_to_declared(registry: Registry) -> None:
+    db = Database(name="load_db")
+    role = Role(name="load_reader")
+    declare_records([{"kind": "grant", "role": "load_reader", "privileges": ["CONNECT"], "database": "load_db"}])
+    assert role.grants == {db: {Privilege.CONNECT}}
+
+
+@pytest.mark.parametrize(
+    "record, error",
+    [
+        (
+            {"kind": "grant", "role": "load_reader", "privileges": ["SELECT"], "database": "load_db"},
+            InvalidPrivilegeError,
+        ),
+        (
+            {"kind": "grant", "role": "load_reader", "privileges": ["NOPE"], "database": "load_db"},
+            InvalidPrivilegeError,
+        ),
+        ({"kind": "grant", "role": "nobody", "privileges": ["CONNECT"], "database": "load_db"}, PostgresDeclareError),
+        ({"kind": "schema", "name": "load_schema", "database": "missing"}, PostgresDeclareError),
+        ({"kind": "role", "name": "load_reader"}, PostgresDeclareError),
+        ({"kind": "role", "name": "load_other", "unknown": 1}, PostgresDeclareError),
+        ({"kind": "table", "name": "load_table"}, PostgresDeclareError),
+    ],
+)
+def test_invalid_records(record: dict[str, object], error: type[Exception]) -> None:
+    Database(name="load_db")
+    Role(name="load_reader")
+    with pytest.raises(error, match="record 2"):
+        declare_records([{"kind": "role", "name": "load_first"}, record])
+
+
+def test_unknown_format() -> None:
+    with pytest.raises(PostgresDeclareError):
+        Loader("records.txt")
@@ -0,0 +1,67 @@
+import pytest
+
+from dbdeclare.data_structures import GrantOn, Privilege
+from dbdeclare.entities import Database, Role, Schema
+from dbdeclare.privilege_index import PrivilegeIndex
+from dbdeclare.registry import Registry
+
+pytestmark = pytest.mark.usefixtures("registry")
+
+
+@pytest.fixture
+def declared(registry: Registry) -> dict[str, object]:
+    db = Database(name="idx_db")
+    schema = Schema(name="analytics", database=db)
+    readers = Role(name="idx_readers", grants=[GrantOn(privileges=[Privilege.USAGE], on=[schema])])
+    writers = Role(
+        name="idx_writers", in_role=[readers], grants=[GrantOn(privileges=[Privilege.ALL_PRIVILEGES], on=[db])]
+    )
+    alice = Role(name="idx_alice", in_role=[writers])
+    bob = Role(name="idx_bob", in_role=[writers], inherit=False)
+    owner = Role(name="idx_owner", role=[bob])
+    owned = Schema(name="owned", database=db, owner=owner)
+    root = Role(name="idx_root", superuser=True)
+    return locals()
+
+
+def test_direct(declared: dict[str, object]) -> None:
+    index = PrivilegeIndex()
+    schema, db = declared["schema"], declared["db"]
+    assert isinstance(schema, Schema) and isinstance(db, Database)
+    assert index.grants("idx_readers") == {schema: {Privilege.USAGE}}
+    assert index.grants("nobody") == {}
+    assert index.grantees(schema) == {"idx_readers": {Privilege.USAGE}}
+    assert index.grantees(db) == {"idx_writers": {Privilege.ALL_PRIVILEGES}}
+
+
+def test_memberships(declared: dict[str, object]) -> None:
+    index = PrivilegeIndex()
+    assert index.memberships("idx_alice") == {"idx_writers", "idx_readers"}
+    assert index.inherited("idx_alice") == {"idx_alice", "idx_writers", "idx_readers"}
+    # bob doesn't inherit, but is still a member
+    assert index.memberships("idx_bob") == {"idx_writers", "idx_readers", "idx_owner"}
+    assert index.inherited("idx_bob") == {"idx_bob"}
+
+
+def test_effective(declared: dict[str, object]) -> None:
+    index = PrivilegeIndex()
+    schema, db, owned = declared["schema"], declared["db"], declared["owned"]
+    assert isinstance(schema, Schema) and isinstance(db, Database) and isinstance(owned, Schema)
+    assert index.privileges("idx_alice", db) == {Privilege.CREATE, Privilege.CONNECT, Privilege.TEMPORARY}
+    assert index.can("idx_alice", Privilege.USAGE, schema)
+    assert index.can("idx_alice", Privilege.ALL_PRIVILEGES, db)
+    assert not index.can("idx_alice", Privilege.CREATE, schema)
+    assert not index.can("idx_bob", Privilege.USAGE, schema)
+    assert index.can("idx_owner", Privilege.CREATE, owned)
+    assert index.can("idx_root", Privilege.CREATE, schema)
+    assert index.who_can(Privilege.USAGE, schema) == {"idx_readers", "idx_writers", "idx_alice", "idx_root"}
+    assert index.who_can(Privilege.CREATE, db) == {"idx_writers", "idx_alice", "idx_root"}
+    # everyone can connect to a database by default
+    assert index.can("idx_bob", Privilege.CONNECT, db)
+    assert len(index.who_can(Privilege.CONNECT, db)) == 6
+    assert PrivilegeIndex(public_defaults=False).who_can(Privilege.CONNECT, db) == {
+        "idx_writers",
+        "idx_alice",
+        "idx_root",
+    }
+    assert index.who_can(Privilege.CREATE, owned) == {"idx_owner", "idx_root"}
@@ -0,0 +1,114 @@
+from typing import Optional
+
+import pytest
+from sqlalchemy import String
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from dbdeclare.data_structures.grant_on import GrantOn
+from dbdeclare.data_structures.privileges import Privilege
+from dbdeclare.entities.database import Database
+from dbdeclare.entities.database_content import DatabaseContent, SchemaTables
+from dbdeclare.entities.role import Role
+from dbdeclare.exceptions import PostgresDeclareError
+from tests.helpers import YieldFixture
+
+pytestmark = pytest.mark.usefixtures("registry")
+
+
+class CollapseBase(DeclarativeBase):
+    pass
+
+
+class First(CollapseBase):
+    __tablename__ = "first"
+    __table_args__ = {"schema": "reporting"}
+    id: Mapped[int] = mapped_column(primary_key=True)
+
+
+class Second(CollapseBase):
+    __tablename__ = "second"
+    __table_args__ = {"schema": "reporting"}
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[Optional[str]] = mapped_column(String(30))
+
+
+class Third(CollapseBase):
+    __tablename__ = "third"
+    id: Mapped[int] = mapped_column(primary_key=True)
+
+
+@pytest.fixture
+def content() -> YieldFixture[DatabaseContent]:
+    yield DatabaseContent(
+        name="collapse_content",
+        sqlalchemy_base=CollapseBase,
+        database=Database(name="collapse_db"),
+        collapse_grants=True,
+    )
+
+
+def test_collapse_every_table_in_schema(content: DatabaseContent) -> None:
+    role = Role(
+        name="reporter",
+        grants=[GrantOn(privileges=[Privilege.SELECT], on=[content.tables["first"], content.tables["second"]])],
+    )
+    collapsed = role._collapsed_grants()
+    assert collapsed == {content._schema_group("reporting"): {Privilege.SELECT}}
+    assert isinstance(list(collapsed)[0], SchemaTables)
+
+
+def test_no_collapse_for_some_tables_in_schema(content: DatabaseContent) -> None:
+    role = Role(name="reporter", grants=[GrantOn(privileges=[Privilege.SELECT], on=[content.tables["first"]])])
+    assert role._collapsed_grants() == {content.tables["first"]: {Privilege.SELECT}}
+
+
+def test_no_collapse_for_different_privileges(content: DatabaseContent) -> None:
+    role = Role(
+        name="reporter",
+        grants=[
+            GrantOn(privileges=[Privilege.SELECT], on=[content.tables["first"], content.tables["second"]]),
+            GrantOn(privileges=[Privilege.INSERT], on=[content.tables["second"]]),
+        ],
+    )
+    assert role._collapsed_grants() == role.grants
+
+
+def test_collapse_default_schema(content: DatabaseContent) -> None:
+    role = Role(name="reporter", grants=[GrantOn(privileges=[Privilege.SELECT], on=[content.tables["third"]])])
+    assert role._collapsed_grants() == {content._schema_group(None): {Privilege.SELECT}}
+
+
+def test_no_collapse_by_default() -> None:
+    content = DatabaseContent(name="plain_content", sqlalchemy_base=CollapseBase, database=Database(name="plain_db"))
+    role = Role(name="reporter", grants=[GrantOn(privileges=[Privilege.SELECT], on=[content.tables["third"]])])
+    assert role._collapsed_grants() == role.grants
+
+
+def test_settings_statements() -> None:
+    db = Database(name="reporting_db", settings={"Statement_Timeout": 5000})
+    role = Role(
+        name="reporter",
+        settings={"search_path": ["$user", "public"], "jit": False, "application_name": "it's:here"},
+        database_settings={db: {}},
+    )
+    assert [str(s) for s in role._create_statements()] == ["CREATE ROLE reporter"]
+    assert [str(s) for s in db._create_statements()] == ["CREATE DATABASE reporting_db"]
+    assert db._declared_settings() == {("", "reporting_db"): {"statement_timeout": 5000}}
+    assert role._declared_settings() == {("reporter", ""): role.settings, ("reporter", "reporting_db"): {}}
+    statements = role._settings_statements("", {**(role.settings or {}), "work_mem": None})
+    assert [s.text for s in statements] == [
+        "ALTER ROLE reporter SET search_path TO '$user', 'public'",
+        "ALTER ROLE reporter SET jit TO 'off'",
+        "ALTER ROLE reporter SET application_name TO 'it''s\\:here'",
+        "ALTER ROLE reporter RESET work_mem",
+    ]
+    assert [s.text for s in role._settings_statements("reporting_db", {"work_mem": "8MB"})] == [
+        "ALTER ROLE reporter IN DATABASE reporting_db SET work_mem TO '8MB'"
+    ]
+    assert role._stored_setting(["$user", "public", "My Schema"]) == '"$user", public, "My Schema"'
+    assert role._stored_setting(1.5) == "1.5"
+
+
+def test_invalid_setting_name() -> None:
+    with pytest.raises(PostgresDeclareError):
+        Role(name="reporter", settings={"work_mem; DROP ROLE x": "1MB"})
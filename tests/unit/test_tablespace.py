@@ -0,0 +1,47 @@
+from typing import Any
+
+import pytest
+
+from dbdeclare.data_structures import GrantTo, Privilege, TablespaceMove
+from dbdeclare.entities import Database, Role, Tablespace
+from dbdeclare.exceptions import InvalidPrivilegeError, PostgresDeclareError
+
+pytestmark = pytest.mark.usefixtures("registry")
+
+
+def test_create_statements() -> None:
+    owner = Role(name="volume_owner")
+    fast = Tablespace(name="fast", location="/mnt/nvme0/pg", owner=owner, options={"random_page_cost": 1.1})
+    [create] = fast._create_statements()
+    assert str(create.compile()) == (
+        "CREATE TABLESPACE fast OWNER volume_owner LOCATION '/mnt/nvme0/pg' WITH (random_page_cost=1.1)"
+    )
+    [create] = Database(name="hot_tenant", owner=owner, tablespace=fast)._create_statements()
+    assert str(create) == "CREATE DATABASE hot_tenant OWNER=volume_owner TABLESPACE=fast"
+
+
+def test_options() -> None:
+    fast = Tablespace(name="fast", location="/mnt/nvme0/pg", options={"Effective_IO_Concurrency": 200})
+    assert fast.options == {"effective_io_concurrency": 200}
+    with pytest.raises(PostgresDeclareError, match="not a tablespace option"):
+        Tablespace(name="sneaky", location="/mnt/nvme0/pg", options={"seq_page_cost=1) LOCATION '/tmp' --": 1})
+    with pytest.raises(PostgresDeclareError, match="must be a number"):
+        options: dict[str, Any] = {"random_page_cost": "1.1); DROP ROLE admin --"}
+        Tablespace(name="wordy", location="/mnt/nvme0/pg", options=options)
+
+
+def test_grants() -> None:
+    role = Role(name="volume_user")
+    fast = Tablespace(name="fast", location="/mnt/nvme0/pg", grants=[GrantTo(privileges=[Privilege.CREATE], to=[role])])
+    assert role.grants == {fast: {Privilege.CREATE}}
+    with pytest.raises(InvalidPrivilegeError):
+        fast.grant(grants=[GrantTo(privileges=[Privilege.CONNECT], to=[role])])
+
+
+def test_tablespace_move() -> None:
+    move = TablespaceMove(database="hot_tenant", source="pg_default", target="fast", size=3 * 2**20, connections=2)
+    assert move.needed
+    assert str(move) == (
+        "move Database hot_tenant from Tablespace pg_default to fast: 3.0 MiB to copy, 2 connections to close"
+    )
+    assert not TablespaceMove(database="hot_tenant", source="fast", target="fast").needed